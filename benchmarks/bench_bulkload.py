@@ -0,0 +1,70 @@
+"""Compares the rows/s of the ORM (bulk_create) and native SQLite ingest backends.
+
+Usage: python benchmarks/bench_bulkload.py [--rows N] [--cameras N] [--batch-size N]
+
+Runs against a throw-away SQLite database, inserting fresh rows and then upserting them with overwrite.
+"""
+
+import argparse
+import logging
+import os
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT / "cctv_api"))
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "cctv_core.settings")
+os.environ["SQLITE_DB_PATH"] = str(Path(tempfile.mkdtemp()) / "bench.sqlite3")
+
+import django  # noqa: E402
+
+django.setup()
+
+from django.core.management import call_command  # noqa: E402
+
+from cctv_records.utils import REPORT_SPECS, ReportType, ReportWriter, batched  # noqa: E402
+
+
+def decoded_rows(n_rows, n_cameras):
+    """TF2 rows laid out like the ReportDecoder output, one capture per camera every 10 minutes."""
+    start = datetime(2025, 1, 1, tzinfo=timezone.utc)
+    for i in range(n_rows):
+        camera, step = divmod(i, n_rows // n_cameras + 1)
+        yield (f"cam{camera:04d}", start + timedelta(minutes=10 * step), i % 7, i % 5, i % 3, 0, 1, 0, i % 2 == 0)
+
+
+def run(backend, rows, overwrite, batch_size):
+    spec = REPORT_SPECS[ReportType.TF2]
+    writer = ReportWriter(spec, overwrite=overwrite, batch_size=batch_size, backend=backend)
+    start = time.perf_counter()
+    with writer.session():
+        for batch in batched(rows, batch_size):
+            writer.write(batch)
+    return time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=200_000)
+    parser.add_argument("--cameras", type=int, default=100)
+    parser.add_argument("--batch-size", type=int, default=1000)
+    args = parser.parse_args()
+
+    logging.disable(logging.WARNING)
+    call_command("migrate", verbosity=0)
+    db_model = REPORT_SPECS[ReportType.TF2]["db_model"]
+    rows = list(decoded_rows(args.rows, args.cameras))
+
+    print(f"{'backend':<8} {'insert rows/s':>14} {'upsert rows/s':>14}")
+    for backend in ("orm", "sqlite"):
+        db_model.objects.all().delete()
+        insert = run(backend, rows, False, args.batch_size)
+        upsert = run(backend, rows, True, args.batch_size)
+        print(f"{backend:<8} {len(rows) / insert:>14,.0f} {len(rows) / upsert:>14,.0f}")
+
+
+if __name__ == "__main__":
+    main()
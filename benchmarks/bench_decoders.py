@@ -0,0 +1,76 @@
+"""Compares the pydantic report parser with the fast-path ReportDecoder.
+
+Usage: python benchmarks/bench_decoders.py [--repeat N] [report.csv.gz ...]
+
+Defaults to the sample reports under tests/test_mgmt_cmds/test_files.
+"""
+
+import argparse
+import csv
+import gzip
+import os
+import sys
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT / "cctv_api"))
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "cctv_core.settings")
+
+import django  # noqa: E402
+
+django.setup()
+
+from cctv_records.schemas import ReportDecoder  # noqa: E402
+from cctv_records.utils import REPORT_SPECS, ReportType  # noqa: E402
+
+SAMPLE_REPORTS = sorted((ROOT / "tests" / "test_mgmt_cmds" / "test_files").glob("cctv-report-v2-*.csv.gz"))
+
+
+def pydantic_path(header, rows, spec):
+    """The per-row path the ingest used before the decoder: dict -> pydantic model -> properties."""
+    parser = spec["parser"]
+    fields = spec["update_fields"]
+    for row in rows:
+        values = {k: None if v == "None" else v for k, v in zip(header, row)}
+        record = parser(**values)
+        (record.camera_id, record.image_capt, *(getattr(record, f) for f in fields))
+
+
+def decoder_path(header, rows, spec):
+    decoder = ReportDecoder(spec["parser"], header, spec["count_columns"])
+    for row in rows:
+        decoder.decode(row)
+
+
+def best_of(fn, repeat, *args):
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn(*args)
+        timings.append(time.perf_counter() - start)
+    return min(timings)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("reports", nargs="*", type=Path, default=SAMPLE_REPORTS)
+    parser.add_argument("--repeat", type=int, default=5, help="Runs per decoder, the best one is reported")
+    args = parser.parse_args()
+
+    print(f"{'report':<40} {'rows':>7} {'pydantic rows/s':>16} {'decoder rows/s':>16} {'speedup':>8}")
+    for path in args.reports:
+        with gzip.open(path, "rt") as stream:
+            header, *rows = list(csv.reader(stream))
+        model_name = rows[0][header.index("model_name")].strip().upper()
+        spec = REPORT_SPECS[ReportType[model_name]]
+
+        slow = best_of(pydantic_path, args.repeat, header, rows, spec)
+        fast = best_of(decoder_path, args.repeat, header, rows, spec)
+        print(
+            f"{path.name:<40} {len(rows):>7} {len(rows) / slow:>16,.0f} {len(rows) / fast:>16,.0f} {slow / fast:>7.1f}x"
+        )
+
+
+if __name__ == "__main__":
+    main()
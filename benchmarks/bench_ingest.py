@@ -0,0 +1,203 @@
+"""Times every stage of the report ingest at increasing report sizes and saves the results as JSON.
+
+Usage: python benchmarks/bench_ingest.py [--rows 10000 1000000 10000000] [--model tf2|yolo]
+                                         [--cameras N] [--interval MINUTES] [--backend auto|orm|sqlite]
+                                         [--output results.json] [--compare previous.json]
+
+Synthetic reports (see generate_reports.py) are ingested into a throw-away SQLite database. The stages
+are timed one after the other over the same files:
+
+    decompress  gunzip the reports
+    sniff       read the header and find the report type
+    parse       csv rows -> decoded rows (ReportDecoder)
+    cameras     resolve the camera references of the reports, creating the cameras
+    insert      write the decoded rows (ReportWriter), without the parse time
+    end_to_end  process_uploaded_report on the gzipped reports in a fresh database, as uploads run
+
+Results are written to benchmarks/results/ingest-<commit>.json by default, together with the commit,
+Python and SQLite versions; --compare prints the speed-up of each stage against an earlier result file.
+"""
+
+import argparse
+import gzip
+import json
+import logging
+import os
+import platform
+import shutil
+import sqlite3
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT / "cctv_api"))
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "cctv_core.settings")
+os.environ["SQLITE_DB_PATH"] = str(Path(tempfile.mkdtemp()) / "bench.sqlite3")
+
+import django  # noqa: E402
+
+django.setup()
+
+from django.core.management import call_command  # noqa: E402
+
+from cctv_records.models import Cameras  # noqa: E402
+from cctv_records.schemas import ReportDecoder  # noqa: E402
+from cctv_records.utils import (  # noqa: E402
+    DEFAULT_BATCH_SIZE,
+    REPORT_SPECS,
+    ReportWriter,
+    batched,
+    discover_report_type,
+    process_uploaded_report,
+)
+from generate_reports import generate_reports  # noqa: E402
+
+STAGES = ["decompress", "sniff", "parse", "cameras", "insert", "end_to_end"]
+
+
+def reset_database():
+    for spec in REPORT_SPECS.values():
+        spec["db_model"].objects.all().delete()
+    Cameras.objects.all().delete()
+
+
+def time_stages(reports, plain_dir, backend, batch_size):
+    """Times the ingest stages over the reports one after the other; returns seconds per stage."""
+    timings = dict.fromkeys(STAGES, 0.0)
+    reset_database()
+    for path, _ in reports:
+        plain = plain_dir / path.name.removesuffix(".gz")
+        start = time.perf_counter()
+        with gzip.open(path, "rb") as src, plain.open("wb") as dst:
+            shutil.copyfileobj(src, dst, 1 << 20)
+        timings["decompress"] += time.perf_counter() - start
+
+        with plain.open(newline="") as f:
+            start = time.perf_counter()
+            report_type, header, rows = discover_report_type(f)
+            spec = REPORT_SPECS[report_type]
+            timings["sniff"] += time.perf_counter() - start
+
+            start = time.perf_counter()
+            decode = ReportDecoder(spec["parser"], header, spec["count_columns"]).decode
+            camera_refs = {decode(row)[0] for row in rows}
+            timings["parse"] += time.perf_counter() - start
+
+        writer = ReportWriter(spec, batch_size=batch_size, backend=backend)
+        start = time.perf_counter()
+        writer.cameras.resolve(camera_refs)
+        timings["cameras"] += time.perf_counter() - start
+
+        with plain.open(newline="") as f, writer.session():
+            _, header, rows = discover_report_type(f)
+            decode = ReportDecoder(spec["parser"], header, spec["count_columns"]).decode
+            for batch in batched(map(decode, rows), batch_size):
+                start = time.perf_counter()
+                writer.write(batch)
+                timings["insert"] += time.perf_counter() - start
+        plain.unlink()
+
+    reset_database()
+    for path, _ in reports:
+        start = time.perf_counter()
+        with gzip.open(path, "rt") as f:
+            process_uploaded_report(f, streaming=True, batch_size=batch_size)
+        timings["end_to_end"] += time.perf_counter() - start
+    return timings
+
+
+def git_commit():
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], cwd=ROOT, capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+
+def compare(results, previous_path):
+    previous = {run["rows"]: run for run in json.loads(Path(previous_path).read_text())["runs"]}
+    print(f"\nspeed-up against {previous_path} (> 1 is faster)")
+    print(f"{'rows':>10} " + " ".join(f"{stage:>10}" for stage in STAGES))
+    for run in results["runs"]:
+        before = previous.get(run["rows"])
+        if before is None:
+            continue
+        ratios = [before["seconds"][s] / run["seconds"][s] if run["seconds"][s] else 0 for s in STAGES]
+        print(f"{run['rows']:>10} " + " ".join(f"{r:>9.2f}x" for r in ratios))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, nargs="+", default=[10_000, 1_000_000, 10_000_000])
+    parser.add_argument("--model", choices=["tf2", "yolo"], default="tf2")
+    parser.add_argument("--cameras", type=int, default=200)
+    parser.add_argument("--interval", type=float, default=10, help="Minutes between two captures of a camera")
+    parser.add_argument("--backend", choices=["auto", "orm", "sqlite"], default="auto")
+    parser.add_argument("--batch-size", type=int, default=DEFAULT_BATCH_SIZE)
+    parser.add_argument("--output", type=Path, help="Default: benchmarks/results/ingest-<commit>.json")
+    parser.add_argument("--compare", type=Path, help="Earlier result file to compare with")
+    args = parser.parse_args()
+
+    logging.disable(logging.WARNING)
+    call_command("migrate", verbosity=0)
+    commit = git_commit()
+    results = {
+        "benchmark": "ingest",
+        "commit": commit,
+        "created_at": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "sqlite": sqlite3.sqlite_version,
+        "machine": platform.machine(),
+        "settings": {
+            "model": args.model,
+            "cameras": args.cameras,
+            "interval": args.interval,
+            "backend": args.backend,
+            "batch_size": args.batch_size,
+        },
+        "runs": [],
+    }
+
+    print(f"{'rows':>10} " + " ".join(f"{stage:>10}" for stage in STAGES) + f" {'rows/s':>10}")
+    for n_rows in args.rows:
+        with tempfile.TemporaryDirectory() as tmp:
+            reports = generate_reports(
+                Path(tmp) / "reports",
+                model=args.model,
+                cameras=args.cameras,
+                days=None,
+                interval=args.interval,
+                max_rows=n_rows,
+            )
+            plain_dir = Path(tmp) / "plain"
+            plain_dir.mkdir()
+            seconds = time_stages(reports, plain_dir, args.backend, args.batch_size)
+        n_rows = sum(n for _, n in reports)
+        run = {
+            "rows": n_rows,
+            "files": len(reports),
+            "seconds": {stage: round(s, 4) for stage, s in seconds.items()},
+            "rows_per_second": {stage: round(n_rows / s) if s else None for stage, s in seconds.items()},
+        }
+        results["runs"].append(run)
+        print(
+            f"{n_rows:>10} "
+            + " ".join(f"{seconds[stage]:>9.2f}s" for stage in STAGES)
+            + f" {run['rows_per_second']['end_to_end']:>10,}"
+        )
+
+    output = args.output or ROOT / "benchmarks" / "results" / f"ingest-{commit}.json"
+    output.parent.mkdir(parents=True, exist_ok=True)
+    output.write_text(json.dumps(results, indent=2) + "\n")
+    print(f"results written to {output}")
+    if args.compare:
+        compare(results, args.compare)
+
+
+if __name__ == "__main__":
+    main()
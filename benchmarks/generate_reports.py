@@ -0,0 +1,169 @@
+"""Writes synthetic TF2/YOLO reports laid out like the reports the detection pipeline uploads.
+
+Usage: python benchmarks/generate_reports.py OUTPUT_DIR [--model tf2|yolo] [--cameras N] [--days N]
+                                             [--interval MINUTES] [--start YYYY-MM-DD] [--seed N]
+
+Writes one cctv-report-v2-<model>-<YYYYMMDD>.csv.gz per day. Every camera is captured once per interval
+(with some jitter), counts follow a day/night profile and a few captures carry warnings, so the reports
+exercise the same code paths as real ones. Only needs the standard library.
+"""
+
+import argparse
+import csv
+import gzip
+import itertools
+import math
+import random
+from collections.abc import Iterator
+from datetime import date, datetime, timedelta, timezone
+from pathlib import Path
+
+COUNT_COLUMNS = {
+    "tf2": ["car", "person", "bicycle", "motorcycle", "bus", "truck"],
+    "yolo": ["car", "pedestrian", "cyclist", "motorcycle", "bus", "lorry", "van", "taxi"],
+}
+# average count of each class at the busiest time of day
+PEAK_COUNTS = {
+    "car": 6.0,
+    "person": 3.0,
+    "pedestrian": 3.0,
+    "bicycle": 0.4,
+    "cyclist": 0.4,
+    "motorcycle": 0.2,
+    "bus": 0.8,
+    "truck": 0.5,
+    "lorry": 0.5,
+    "van": 1.0,
+    "taxi": 0.7,
+}
+CAMERA_PREFIXES = ["A", "C", "E", "G", "PD", "T"]
+
+
+def camera_refs(n: int, seed: int = 0) -> list[str]:
+    """Camera references such as A33 or PD1P1, unique and stable for a given seed."""
+    rng = random.Random(seed)
+    refs: set[str] = set()
+    while len(refs) < n:
+        ref = f"{rng.choice(CAMERA_PREFIXES)}{rng.randint(1, 999)}"
+        if rng.random() < 0.2:
+            ref += f"P{rng.randint(1, 4)}"
+        refs.add(ref)
+    return sorted(refs)
+
+
+def report_rows(
+    model: str,
+    cameras: list[str],
+    day: date,
+    interval: float = 10,
+    rng: random.Random | None = None,
+) -> Iterator[list]:
+    """Rows of the report of one day, ordered by capture time."""
+    rng = rng or random.Random(0)
+    columns = COUNT_COLUMNS[model]
+    start = datetime(day.year, day.month, day.day, tzinfo=timezone.utc)
+    captures = int(24 * 60 / interval)
+    # cameras that are offline for the whole day, and cameras reporting warnings
+    offline = {c for c in cameras if rng.random() < 0.02}
+    faulty = {c for c in cameras if rng.random() < 0.1}
+    for capture in range(captures):
+        slot = start + timedelta(minutes=capture * interval)
+        # 0 at night, 1 at the busiest hour of the afternoon
+        hour = (slot.hour + slot.minute / 60) / 24
+        activity = max(0.05, math.sin(math.pi * hour) ** 2)
+        for camera in cameras:
+            if camera in offline:
+                continue
+            image_capt = slot + timedelta(seconds=rng.uniform(0, interval * 60 * 0.9))
+            image_proc = image_capt + timedelta(seconds=rng.uniform(60, 900))
+            if camera in faulty and rng.random() < 0.5:
+                warnings = rng.choice(["1", "3", "4", "5"])
+                counts = [0] * len(columns)
+            else:
+                warnings = "None" if rng.random() < 0.001 else "0"
+                counts = [_poisson(rng, PEAK_COUNTS[c] * activity) for c in columns]
+            yield [
+                image_proc.isoformat(sep=" ", timespec="seconds"),
+                image_capt.isoformat(sep=" ", timespec="seconds"),
+                camera,
+                model,
+                *counts,
+                warnings,
+            ]
+
+
+def _poisson(rng: random.Random, mean: float) -> int:
+    # Knuth's method, fine for the small means of per-image counts
+    threshold, k, p = math.exp(-mean), 0, 1.0
+    while True:
+        p *= rng.random()
+        if p <= threshold:
+            return k
+        k += 1
+
+
+def write_report(path: Path, rows: Iterator[list], model: str) -> int:
+    """Writes the rows as a gzipped report and returns the number of rows written."""
+    n = 0
+    with gzip.open(path, "wt", newline="", compresslevel=6) as f:
+        writer = csv.writer(f, lineterminator="\n")
+        writer.writerow(["image_proc", "image_capt", "camera_ref", "model_name", *COUNT_COLUMNS[model], "warnings"])
+        for row in rows:
+            writer.writerow(row)
+            n += 1
+    return n
+
+
+def generate_reports(
+    output_dir: Path,
+    model: str = "tf2",
+    cameras: int = 100,
+    days: int | None = 1,
+    interval: float = 10,
+    start: date = date(2025, 1, 1),
+    seed: int = 0,
+    max_rows: int | None = None,
+) -> list[tuple[Path, int]]:
+    """Writes a report per day and returns the `(path, rows)` of each.
+
+    Stops after `max_rows` rows; with `days=None` as many days as needed for `max_rows` are written.
+    """
+    output_dir.mkdir(parents=True, exist_ok=True)
+    rng = random.Random(seed)
+    refs = camera_refs(cameras, seed)
+    written = []
+    remaining = max_rows
+    for offset in itertools.count() if days is None else range(days):
+        day = start + timedelta(days=offset)
+        rows = report_rows(model, refs, day, interval, rng)
+        if remaining is not None:
+            rows = (row for _, row in zip(range(remaining), rows))
+        path = output_dir / f"cctv-report-v2-{model}-{day:%Y%m%d}.csv.gz"
+        n = write_report(path, rows, model)
+        written.append((path, n))
+        if remaining is not None:
+            remaining -= n
+            if remaining <= 0:
+                break
+    return written
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("output_dir", type=Path)
+    parser.add_argument("--model", choices=sorted(COUNT_COLUMNS), default="tf2")
+    parser.add_argument("--cameras", type=int, default=100)
+    parser.add_argument("--days", type=int, default=1)
+    parser.add_argument("--interval", type=float, default=10, help="Minutes between two captures of a camera")
+    parser.add_argument("--start", type=date.fromisoformat, default=date(2025, 1, 1))
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    for path, n in generate_reports(
+        args.output_dir, args.model, args.cameras, args.days, args.interval, args.start, args.seed
+    ):
+        print(f"{path}: {n} rows")
+
+
+if __name__ == "__main__":
+    main()
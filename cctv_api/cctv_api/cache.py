@@ -0,0 +1,187 @@
+import hashlib
+import os
+import sqlite3
+import threading
+import time
+from functools import lru_cache
+from logging import getLogger
+from pathlib import Path
+
+from django.conf import settings
+
+logger = getLogger(__name__)
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS responses (key TEXT PRIMARY KEY, content BLOB NOT NULL, size INTEGER NOT NULL,
+    used_at REAL NOT NULL);
+CREATE INDEX IF NOT EXISTS responses_used_at_idx ON responses (used_at);
+CREATE TABLE IF NOT EXISTS counters (name TEXT PRIMARY KEY, value INTEGER NOT NULL);
+INSERT OR IGNORE INTO counters VALUES ('hits', 0), ('misses', 0), ('evictions', 0), ('bytes', 0);
+"""
+
+
+class ResponseCache:
+    """A size-bounded LRU cache of rendered responses, in a SQLite file shared by the workers of the API.
+
+    Entries are evicted least recently used first once their contents exceed `max_bytes`. Nothing is ever
+    invalidated in place: keys carry the data version they were computed for (see `response_cache_key`), so
+    entries of older data are no longer asked for and age out. Hits and misses are counted in the file.
+
+    The cache never fails a request: lookups are plain reads, and a SQLite error, such as the file being
+    locked by another worker past the short `timeout`, is logged and taken as a miss or a skipped store.
+    Counts and the LRU order of hits are kept in memory and written at most every `flush_interval`
+    seconds, when the file is not busy.
+
+    path: The SQLite file, created with its directory when first used.
+    max_bytes: Total size of the cached contents.
+    """
+
+    # seconds to wait for the write lock of the file held by another worker
+    timeout = 0.05
+    flush_interval = 1.0
+
+    def __init__(self, path: Path | str, max_bytes: int):
+        self.path = Path(path)
+        self.max_bytes = max_bytes
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._counts = {"hits": 0, "misses": 0}
+        self._used: dict[str, float] = {}
+        self._flushed_at = 0.0
+
+    @property
+    def connection(self) -> sqlite3.Connection:
+        """A connection per thread and per process, in autocommit mode with explicit write transactions."""
+        local = self._local
+        if getattr(local, "pid", None) != os.getpid():
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            connection = sqlite3.connect(self.path, timeout=self.timeout, isolation_level=None, check_same_thread=False)
+            connection.execute("PRAGMA journal_mode=WAL")
+            connection.execute("PRAGMA synchronous=NORMAL")
+            connection.executescript(SCHEMA)
+            local.connection, local.pid = connection, os.getpid()
+        return local.connection
+
+    def get(self, key: str) -> bytes | None:
+        try:
+            row = self.connection.execute("SELECT content FROM responses WHERE key = ?", (key,)).fetchone()
+        except (sqlite3.Error, OSError) as e:
+            logger.warning("response cache lookup failed: %s", e)
+            row = None
+        with self._lock:
+            self._counts["hits" if row else "misses"] += 1
+            if row:
+                self._used[key] = time.time()
+        self.flush()
+        return row[0] if row else None
+
+    def set(self, key: str, content: bytes) -> None:
+        size = len(content)
+        if size > self.max_bytes:
+            return
+        try:
+            self._store(key, content, size)
+        except (sqlite3.Error, OSError) as e:
+            logger.warning("response cache store failed: %s", e)
+
+    def _store(self, key: str, content: bytes, size: int) -> None:
+        connection = self.connection
+        with connection:
+            connection.execute("BEGIN IMMEDIATE")
+            replaced = connection.execute("SELECT size FROM responses WHERE key = ?", (key,)).fetchone()
+            connection.execute("REPLACE INTO responses VALUES (?, ?, ?, ?)", (key, content, size, time.time()))
+            total = self._add_bytes(size - (replaced[0] if replaced else 0))
+            if total > self.max_bytes:
+                self._evict(total - self.max_bytes)
+
+    def flush(self, force: bool = False) -> None:
+        """Writes the counts and LRU order kept in memory, unless they were written recently or the file is busy."""
+        now = time.time()
+        with self._lock:
+            if not force and now - self._flushed_at < self.flush_interval:
+                return
+            counts, used = self._counts, self._used
+            self._counts, self._used = {"hits": 0, "misses": 0}, {}
+            self._flushed_at = now
+        try:
+            with self.connection as connection:
+                connection.execute("BEGIN IMMEDIATE")
+                connection.executemany(
+                    "UPDATE counters SET value = value + ? WHERE name = ?", [(n, name) for name, n in counts.items()]
+                )
+                connection.executemany(
+                    "UPDATE responses SET used_at = ? WHERE key = ?", [(used_at, key) for key, used_at in used.items()]
+                )
+        except (sqlite3.Error, OSError) as e:
+            logger.debug("response cache counts not written: %s", e)
+            # kept for the next flush
+            with self._lock:
+                for name, n in counts.items():
+                    self._counts[name] += n
+                self._used = {**used, **self._used}
+
+    def _add_bytes(self, size: int) -> int:
+        connection = self.connection
+        connection.execute("UPDATE counters SET value = value + ? WHERE name = 'bytes'", (size,))
+        return connection.execute("SELECT value FROM counters WHERE name = 'bytes'").fetchone()[0]
+
+    def _evict(self, excess: int) -> None:
+        """Deletes the least recently used entries holding at least `excess` bytes."""
+        keys, freed = [], 0
+        for key, size in self.connection.execute("SELECT key, size FROM responses ORDER BY used_at"):
+            keys.append(key)
+            freed += size
+            if freed >= excess:
+                break
+        self.connection.executemany("DELETE FROM responses WHERE key = ?", [(key,) for key in keys])
+        self.connection.execute("UPDATE counters SET value = value + ? WHERE name = 'evictions'", (len(keys),))
+        self._add_bytes(-freed)
+        logger.debug("evicted %s responses, %s bytes", len(keys), freed)
+
+    def stats(self) -> dict:
+        """hits, misses, evictions, bytes and entries, and the hit rate."""
+        self.flush(force=True)
+        connection = self.connection
+        stats = dict(connection.execute("SELECT name, value FROM counters"))
+        with self._lock:
+            # counts the flush could not write
+            for name, n in self._counts.items():
+                stats[name] += n
+        stats["entries"] = connection.execute("SELECT COUNT(*) FROM responses").fetchone()[0]
+        lookups = stats["hits"] + stats["misses"]
+        stats["hit_rate"] = round(stats["hits"] / lookups, 4) if lookups else None
+        return stats
+
+    def clear(self) -> None:
+        """Deletes every entry and resets the counters."""
+        with self._lock:
+            self._counts, self._used = {"hits": 0, "misses": 0}, {}
+        with self.connection as connection:
+            connection.execute("BEGIN IMMEDIATE")
+            connection.execute("DELETE FROM responses")
+            connection.execute("UPDATE counters SET value = 0")
+
+
+@lru_cache
+def _response_cache(path: str, max_bytes: int) -> ResponseCache:
+    return ResponseCache(path, max_bytes)
+
+
+def get_response_cache() -> ResponseCache | None:
+    """The cache of settings.RESPONSE_CACHE_PATH, None when it is disabled."""
+    if not settings.RESPONSE_CACHE_PATH:
+        return None
+    return _response_cache(str(settings.RESPONSE_CACHE_PATH), settings.RESPONSE_CACHE_MAX_BYTES)
+
+
+def response_cache_key(url: str, params: dict[str, list[str]], media_type: str, data_version: str) -> str:
+    """Key of a response: the URL without its query, the query normalised and the version of the data.
+
+    Parameters are sorted, as are the values of repeated ones, and empty ones are left out, so that
+    `?page=1&camera_id=3` and `?camera_id=3&date_after=&page=1` share an entry.
+    """
+    query = sorted((name, sorted(values)) for name, values in params.items() if any(values))
+    return hashlib.sha256(repr((url, query, media_type, data_version)).encode()).hexdigest()
+
+
+__all__ = ["ResponseCache", "get_response_cache", "response_cache_key"]
@@ -0,0 +1,50 @@
+import hashlib
+from datetime import datetime
+
+from django.views.decorators.http import condition
+
+from cctv_records.models import DataWatermark
+
+
+class WatermarkConditionMixin:
+    """Sends ETag and Last-Modified headers derived from the data watermarks the view depends on.
+
+    The watermarks are read with a single query before the view runs; a request whose If-None-Match or
+    If-Modified-Since still matches them is answered with a 304 without running the view, so polling clients
+    cost nothing until new data is ingested. Only successful responses carry the validators, and the ETag is
+    scoped to the URL, so an error such as a bad cursor is never turned into a 304.
+    """
+
+    # the names of the DataWatermark the responses depend on
+    watermarks: list[str] = DataWatermark.NAMES
+
+    def get_watermarks(self) -> list[str]:
+        return self.watermarks
+
+    def dispatch(self, request, *args, **kwargs):
+        conditional = condition(etag_func=self.watermark_etag, last_modified_func=self.watermark_last_modified)
+        response = conditional(super().dispatch)(request, *args, **kwargs)
+        if not (200 <= response.status_code < 300 or response.status_code == 304):
+            # an error is no version of the data
+            for header in ("ETag", "Last-Modified"):
+                if header in response:
+                    del response[header]
+        return response
+
+    def data_version(self, request) -> tuple[str, datetime | None]:
+        """The version of the data of the view and when it last changed, read once per request."""
+        if not hasattr(request, "_data_version"):
+            request._data_version = DataWatermark.current(self.get_watermarks())
+        return request._data_version
+
+    def watermark_etag(self, request, *args, **kwargs) -> str:
+        version, _ = self.data_version(request)
+        # the ETag of one URL must not validate another, nor another negotiated format of it
+        scope = f"{request.get_full_path()}|{request.headers.get('Accept', '')}"
+        return hashlib.sha1(f"{version}|{scope}".encode()).hexdigest()
+
+    def watermark_last_modified(self, request, *args, **kwargs) -> datetime | None:
+        return self.data_version(request)[1]
+
+
+__all__ = ["WatermarkConditionMixin"]
@@ -0,0 +1,101 @@
+import csv
+import io
+import json
+from collections.abc import AsyncIterator, Iterable, Iterator
+
+from asgiref.sync import sync_to_async
+from django.utils.text import compress_sequence
+from rest_framework.renderers import BaseRenderer
+
+try:
+    import brotli
+except ImportError:  # installed with whitenoise[brotli]; without it exports are gzipped
+    brotli = None
+
+
+class CSVRenderer(BaseRenderer):
+    media_type = "text/csv"
+    format = "csv"
+    charset = "utf-8"
+
+    def stream(self, chunks: Iterable[list[dict]]) -> Iterator[bytes]:
+        """Encodes chunks of records as csv, a header line first; yields a bytes block per chunk."""
+        buffer = io.StringIO()
+        writer = None
+        for records in chunks:
+            if writer is None and records:
+                writer = csv.DictWriter(buffer, fieldnames=list(records[0]), lineterminator="\n")
+                writer.writeheader()
+            if writer is not None:
+                writer.writerows(records)
+            yield buffer.getvalue().encode()
+            buffer.seek(0)
+            buffer.truncate()
+
+    def render(self, data, accepted_media_type=None, renderer_context=None) -> bytes:
+        records = data if isinstance(data, list) else [data]
+        return b"".join(self.stream([records]))
+
+
+class NDJSONRenderer(BaseRenderer):
+    """Newline delimited JSON, one record per line."""
+
+    media_type = "application/x-ndjson"
+    format = "ndjson"
+    charset = "utf-8"
+
+    def stream(self, chunks: Iterable[list[dict]]) -> Iterator[bytes]:
+        for records in chunks:
+            yield "".join(json.dumps(record, separators=(",", ":")) + "\n" for record in records).encode()
+
+    def render(self, data, accepted_media_type=None, renderer_context=None) -> bytes:
+        records = data if isinstance(data, list) else [data]
+        return b"".join(self.stream([records]))
+
+
+def negotiate_encoding(accept_encoding: str) -> str | None:
+    """The content encoding to compress with given an Accept-Encoding header: br, gzip or None."""
+    accepted = set()
+    for coding in accept_encoding.split(","):
+        name, _, params = coding.partition(";")
+        key, _, quality = params.replace(" ", "").partition("=")
+        try:
+            if key == "q" and float(quality) == 0:
+                continue
+        except ValueError:
+            continue
+        accepted.add(name.strip().lower())
+    if brotli is not None and "br" in accepted:
+        return "br"
+    if "gzip" in accepted:
+        return "gzip"
+    return None
+
+
+def compress_stream(blocks: Iterable[bytes], encoding: str | None) -> Iterator[bytes]:
+    """Compresses `blocks` on the fly with `encoding`, as given by `negotiate_encoding`."""
+    if encoding == "gzip":
+        yield from compress_sequence(blocks)
+    elif encoding == "br":
+        compressor = brotli.Compressor()
+        for block in blocks:
+            if compressed := compressor.process(block):
+                yield compressed
+        yield compressor.finish()
+    else:
+        yield from blocks
+
+
+async def aiter_blocks(blocks: Iterable[bytes]) -> AsyncIterator[bytes]:
+    """Serves `blocks` to an ASGI server a block at a time.
+
+    Django consumes a sync iterator whole before sending it over ASGI; each block is fetched in the thread
+    of the view instead, where the database connection of the records cursor lives.
+    """
+    iterator = iter(blocks)
+    fetch = sync_to_async(next, thread_sensitive=True)
+    while (block := await fetch(iterator, None)) is not None:
+        yield block
+
+
+__all__ = ["CSVRenderer", "NDJSONRenderer", "aiter_blocks", "compress_stream", "negotiate_encoding"]
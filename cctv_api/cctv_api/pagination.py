@@ -1,6 +1,112 @@
+import base64
+import binascii
+from datetime import datetime
+
+from django.db.models import Q, QuerySet
+from rest_framework.exceptions import NotFound
 from rest_framework.pagination import PageNumberPagination
+from rest_framework.response import Response
+from rest_framework.utils.urls import remove_query_param, replace_query_param
+
+from cctv_records.models import Cameras, RecordCommonFields
 
 
 class StandardPagination(PageNumberPagination):
+    """Page numbers by default; records can also be walked with a cursor (`?pagination=cursor`).
+
+    The cursor mode seeks past the last record of the previous page in the records order, `-timestamp`
+    then `camera`, instead of counting the records and skipping `OFFSET` rows, so deep pages cost the
+    same as the first one. It only goes forward and has no `count`; follow `next` until it is null.
+    """
+
     page_size_query_param = "page_size"
     max_page_size = 1000
+    pagination_query_param = "pagination"
+    cursor_query_param = "cursor"
+    invalid_cursor_message = "Invalid cursor"
+
+    def use_cursor(self, queryset: QuerySet, request) -> bool:
+        if not issubclass(queryset.model, RecordCommonFields):
+            return False
+        params = request.query_params
+        return params.get(self.pagination_query_param) == "cursor" or self.cursor_query_param in params
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.cursor_mode = self.use_cursor(queryset, request)
+        if not self.cursor_mode:
+            return super().paginate_queryset(queryset, request, view)
+
+        page_size = self.get_page_size(request)
+        if not page_size:
+            return None
+        self.request = request
+        self.display_page_controls = False
+
+        # camera orders by the camera reference, see Cameras.Meta.ordering
+        queryset = queryset.order_by("-timestamp", "camera__camera_id")
+        cursor = request.query_params.get(self.cursor_query_param)
+        if cursor:
+            timestamp, camera_ref = self.decode_cursor(cursor)
+            queryset = queryset.filter(
+                Q(timestamp__lt=timestamp) | Q(timestamp=timestamp, camera__camera_id__gt=camera_ref)
+            )
+        records = list(queryset[: page_size + 1])
+        self.next_record = records[page_size - 1] if len(records) > page_size else None
+        return records[:page_size]
+
+    def encode_cursor(self, record: RecordCommonFields | dict) -> str:
+        """Cursor of the page after `record`, a record or its `.values()`."""
+        if isinstance(record, dict):
+            timestamp, camera_pk = record["timestamp"], record["camera_id"]
+        else:
+            timestamp, camera_pk = record.timestamp, record.camera_id
+        # the camera pk stands for its reference, which is not published
+        position = f"{timestamp.isoformat()}|{camera_pk}"
+        return base64.urlsafe_b64encode(position.encode()).decode()
+
+    def decode_cursor(self, cursor: str) -> tuple[datetime, str]:
+        try:
+            timestamp, camera_pk = base64.urlsafe_b64decode(cursor.encode()).decode().split("|")
+            timestamp = datetime.fromisoformat(timestamp)
+            camera_ref = Cameras.objects.filter(pk=int(camera_pk)).values_list("camera_id", flat=True).first()
+        except (binascii.Error, UnicodeDecodeError, ValueError):
+            raise NotFound(self.invalid_cursor_message)
+        if camera_ref is None:
+            raise NotFound(self.invalid_cursor_message)
+        return timestamp, camera_ref
+
+    def get_next_link(self):
+        if not self.cursor_mode:
+            return super().get_next_link()
+        if self.next_record is None:
+            return None
+        url = remove_query_param(self.request.build_absolute_uri(), self.page_query_param)
+        return replace_query_param(url, self.cursor_query_param, self.encode_cursor(self.next_record))
+
+    def get_paginated_response(self, data):
+        if not self.cursor_mode:
+            return super().get_paginated_response(data)
+        return Response({"next": self.get_next_link(), "results": data})
+
+    def get_schema_operation_parameters(self, view):
+        parameters = super().get_schema_operation_parameters(view)
+        if not issubclass(view.get_queryset().model, RecordCommonFields):
+            return parameters
+        return [
+            *parameters,
+            {
+                "name": self.pagination_query_param,
+                "required": False,
+                "in": "query",
+                "description": "`cursor` to walk the records with cursors instead of page numbers, "
+                "which keeps deep pages fast; the response then has no `count` and `next` carries the cursor.",
+                "schema": {"type": "string", "enum": ["page", "cursor"]},
+            },
+            {
+                "name": self.cursor_query_param,
+                "required": False,
+                "in": "query",
+                "description": "The cursor of the page, as given by `next`.",
+                "schema": {"type": "string"},
+            },
+        ]
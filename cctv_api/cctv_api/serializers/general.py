@@ -2,7 +2,7 @@ from zoneinfo import ZoneInfo
 
 from rest_framework import serializers
 
-from cctv_records.models import Cameras
+from cctv_records.models import CameraCoverage, Cameras
 from cctv_records.utils import get_cameras_that_have_records
 
 UTC = ZoneInfo("UTC")
@@ -10,10 +10,18 @@ UTC = ZoneInfo("UTC")
 
 class VersionSerializer(serializers.Serializer):
     version = serializers.CharField()
-    latest_data_update = serializers.DateTimeField()
+    latest_data_update = serializers.DateTimeField(allow_null=True, default_timezone=UTC)
+
+
+class CameraCoverageSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = CameraCoverage
+        fields = ["model", "records", "first_timestamp", "last_timestamp"]
 
 
 class CameraSerializer(serializers.ModelSerializer):
+    coverage = CameraCoverageSerializer(many=True, read_only=True, help_text="The records of the camera per model")
+
     class Meta:
         model = Cameras
         # fields = "__all__"
@@ -23,3 +31,9 @@ class CameraSerializer(serializers.ModelSerializer):
 class DateValueSerializer(serializers.Serializer):
     date = serializers.DateField(read_only=True, format="%Y-%m-%d")
     value = serializers.FloatField()
+
+
+class DateTimeValueSerializer(DateValueSerializer):
+    """For buckets shorter than a day."""
+
+    date = serializers.DateTimeField(read_only=True, default_timezone=UTC)
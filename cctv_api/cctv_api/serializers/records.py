@@ -0,0 +1,85 @@
+from collections.abc import Iterable
+
+from rest_framework import serializers
+from rest_framework.reverse import reverse
+from rest_framework.settings import api_settings
+from rest_framework.utils.urls import remove_query_param
+
+from cctv_records.utils import AGGREGATION_METHODS, AGGREGATION_UNITS
+
+# pk reversed into the camera detail URL, then swapped for the pk of each record
+_CAMERA_PK = 999_999_937
+
+# fields whose `.values()` value is already their representation
+_PASSTHROUGH_FIELDS = (serializers.IntegerField, serializers.BooleanField, serializers.CharField)
+
+
+class RecordValuesSerializer:
+    """Serializes records fetched with `.values()` into the same data as their `ModelSerializer`.
+
+    Skips model instantiation and resolves the camera detail URL once: it is reversed for a placeholder pk
+    and the pk of each record is put in its place.
+
+    serializer_class: TF2RecordSerialzer or YOLORecordSerialzer, giving the fields and their order.
+    context: The serializer context of the view, for the request and format of the URLs.
+    preserve_format: Keep the `?format=` of the request in the camera URLs, as `reverse` does.
+    """
+
+    def __init__(
+        self, serializer_class: type[serializers.ModelSerializer], context: dict, preserve_format: bool = True
+    ):
+        # (name, `.values()` key, field converting the value or None), the camera detail URL having no key
+        self.fields: list[tuple[str, str | None, serializers.Field | None]] = []
+        for name, field in serializer_class(context=context).fields.items():
+            if name == "camera_detail":
+                self.fields.append((name, None, None))
+                continue
+            key = "camera_id" if field.source == "camera.id" else field.source
+            self.fields.append((name, key, None if isinstance(field, _PASSTHROUGH_FIELDS) else field))
+
+        url = reverse(
+            "cctv-api:general:cameras-detail",
+            kwargs={"pk": _CAMERA_PK},
+            request=context.get("request"),
+            format=context.get("format"),
+        )
+        if not preserve_format:
+            url = remove_query_param(url, api_settings.URL_FORMAT_OVERRIDE)
+        self.camera_url = url.rpartition(str(_CAMERA_PK))[::2]
+
+    @property
+    def values_fields(self) -> list[str]:
+        """The fields to fetch with `.values()`."""
+        return list(dict.fromkeys([*(key for _, key, _ in self.fields if key), "camera_id"]))
+
+    def serialize(self, rows: Iterable[dict]) -> list[dict]:
+        fields = self.fields
+        prefix, suffix = self.camera_url
+        data = []
+        for row in rows:
+            record = {}
+            for name, key, convert in fields:
+                if key is None:
+                    record[name] = f"{prefix}{row['camera_id']}{suffix}"
+                    continue
+                value = row[key]
+                record[name] = value if convert is None or value is None else convert.to_representation(value)
+            data.append(record)
+        return data
+
+
+class RecordsAggregateQuerySerializer(serializers.Serializer):
+    """Query parameters of the aggregate endpoints, besides the filters of the records endpoints.
+
+    The count fields to choose from are given with the `fields` context.
+    """
+
+    unit = serializers.ChoiceField(choices=AGGREGATION_UNITS, default="day", help_text="Length of the buckets")
+    method = serializers.ChoiceField(
+        choices=list(AGGREGATION_METHODS), default="sum", help_text="How the counts of a bucket are aggregated"
+    )
+    field = serializers.ChoiceField(choices=[], default="cars", help_text="The count to aggregate")
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.fields["field"].choices = self.context.get("fields", [])
@@ -16,4 +16,4 @@ class TF2RecordSerialzer(serializers.ModelSerializer):
 
     class Meta:
         model = TF2Records
-        exclude = ["camera"]
+        exclude = ["camera", "is_hidden"]
@@ -21,4 +21,4 @@ class YOLORecordSerialzer(serializers.ModelSerializer):
 
     class Meta:
         model = YOLORecords
-        exclude = ["camera"]
+        exclude = ["camera", "is_hidden"]
@@ -24,6 +24,7 @@ general_urls = (
             general_views.CameraViewDetail.as_view(),
             name="cameras-detail",
         ),
+        path("version/", general_views.VersionView.as_view(), name="version"),
     ],
     "general",
 )
@@ -33,6 +34,8 @@ tf2_urls = (
     [
         path("records", lambda r: redirect(to="cctv-api:tf2:records-list")),
         path("records/", tf2_api_views.TF2RecordsViewSet.as_view(), name="records-list"),
+        path("export/", tf2_api_views.TF2RecordsExportView.as_view(), name="records-export"),
+        path("aggregate/", tf2_api_views.TF2RecordsAggregateView.as_view(), name="records-aggregate"),
     ],
     "tf2",
 )
@@ -40,6 +43,8 @@ yolo_urls = (
     [
         path("records", lambda r: redirect(to="cctv-api:yolo:records-list")),
         path("records/", yolo_records_viewset.as_view(), name="records-list"),
+        path("export/", yolo_api_views.YOLORecordsExportView.as_view(), name="records-export"),
+        path("aggregate/", yolo_api_views.YOLORecordsAggregateView.as_view(), name="records-aggregate"),
     ],
     "yolo",
 )
@@ -0,0 +1,158 @@
+from django.core.handlers.asgi import ASGIRequest
+from django.db.models import QuerySet
+from django.http import HttpResponse, StreamingHttpResponse
+from django.utils.cache import patch_vary_headers
+from django_filters.rest_framework import DjangoFilterBackend
+from django_filters.utils import translate_validation
+from drf_spectacular.utils import extend_schema
+from rest_framework import generics
+from rest_framework.renderers import JSONRenderer
+from rest_framework.response import Response
+
+from cctv_api.cache import get_response_cache, response_cache_key
+from cctv_api.conditional import WatermarkConditionMixin
+from cctv_api.export import CSVRenderer, NDJSONRenderer, aiter_blocks, compress_stream, negotiate_encoding
+from cctv_api.serializers.general import DateTimeValueSerializer, DateValueSerializer
+from cctv_api.serializers.records import RecordsAggregateQuerySerializer, RecordValuesSerializer
+from cctv_records.models import DataWatermark, RecordCommonFields
+from cctv_records.rollups import aggregate_rollups, model_name_of, rollups_for
+from cctv_records.utils import aggregate_records, batched
+
+
+class RecordsListAPIView(WatermarkConditionMixin, generics.ListAPIView):
+    """Lists records with `.values()` and `RecordValuesSerializer` instead of model instances.
+
+    The response is the same as `serializer_class` would give, without building a model and reversing the
+    camera URL for every record. Responses are conditional on the watermarks of the model and the cameras.
+
+    JSON responses are kept in the response cache (settings.RESPONSE_CACHE_PATH), keyed by the normalised
+    query and the version of the data, so a page many clients ask for is computed once per data change.
+    """
+
+    def get_watermarks(self) -> list[str]:
+        return [model_name_of(self.get_queryset().model), DataWatermark.CAMERAS]
+
+    def get_cache_key(self, request) -> str | None:
+        """The response cache key of the request, None when it is not cached."""
+        if get_response_cache() is None or request.accepted_renderer.format != "json":
+            return None
+        version, latest_data_update = self.data_version(request._request)
+        return response_cache_key(
+            request.build_absolute_uri(request.path),
+            dict(request.query_params.lists()),
+            request.accepted_media_type,
+            f"{version}@{latest_data_update and latest_data_update.isoformat()}",
+        )
+
+    def list(self, request, *args, **kwargs):
+        self.cache_key = self.get_cache_key(request)
+        if self.cache_key is not None and (content := get_response_cache().get(self.cache_key)) is not None:
+            response = HttpResponse(content, content_type=request.accepted_media_type)
+            response["X-Cache"] = "HIT"
+            return response
+
+        serializer = RecordValuesSerializer(self.get_serializer_class(), self.get_serializer_context())
+        rows = self.filter_queryset(self.get_queryset()).values(*serializer.values_fields)
+
+        page = self.paginate_queryset(rows)
+        if page is not None:
+            return self.get_paginated_response(serializer.serialize(page))
+        return Response(serializer.serialize(rows))
+
+    def finalize_response(self, request, response, *args, **kwargs):
+        response = super().finalize_response(request, response, *args, **kwargs)
+        cache_key = getattr(self, "cache_key", None)
+        if cache_key is not None and isinstance(response, Response) and response.status_code == 200:
+            get_response_cache().set(cache_key, response.render().content)
+            response["X-Cache"] = "MISS"
+        return response
+
+
+class RecordsExportMixin:
+    """Streams every record the list endpoint filters to, as csv or NDJSON (`?format=` or Accept).
+
+    Records are read with a server-side chunked iterator and encoded a chunk at a time, compressed with
+    brotli or gzip as negotiated with Accept-Encoding, so memory stays flat whatever the size of the export.
+    Under ASGI the blocks are handed over with an async iterator, see `aiter_blocks`.
+    """
+
+    renderer_classes = [CSVRenderer, NDJSONRenderer]
+    pagination_class = None
+    export_chunk_size = 2000
+
+    def list(self, request, *args, **kwargs):
+        # the format is the one of the export, not of the camera URLs
+        serializer = RecordValuesSerializer(
+            self.get_serializer_class(), self.get_serializer_context(), preserve_format=False
+        )
+        rows = self.filter_queryset(self.get_queryset()).values(*serializer.values_fields)
+        chunks = map(serializer.serialize, batched(rows.iterator(self.export_chunk_size), self.export_chunk_size))
+
+        renderer = request.accepted_renderer
+        encoding = negotiate_encoding(request.META.get("HTTP_ACCEPT_ENCODING", ""))
+        blocks = compress_stream(renderer.stream(chunks), encoding)
+        response = StreamingHttpResponse(
+            aiter_blocks(blocks) if isinstance(request._request, ASGIRequest) else blocks,
+            content_type=f"{renderer.media_type}; charset={renderer.charset}",
+        )
+        if encoding:
+            response["Content-Encoding"] = encoding
+        patch_vary_headers(response, ["Accept", "Accept-Encoding"])
+        file_name = f"{self.get_queryset().model._meta.db_table}.{renderer.format}"
+        response["Content-Disposition"] = f'attachment; filename="{file_name}"'
+        return response
+
+    def handle_exception(self, exc):
+        # errors, such as invalid filters, are reported as JSON rather than as a csv of the error
+        self.request.accepted_renderer = JSONRenderer()
+        self.request.accepted_media_type = JSONRenderer.media_type
+        return super().handle_exception(exc)
+
+
+class RecordsAggregateMixin:
+    """Aggregates a count of the records the list endpoint filters to over time buckets, in the database.
+
+    Returns a `[{"date": ..., "value": ...}]` series in date order, a bucket per `unit` that has records.
+    Series are read from the hourly or daily rollups, unless they are filtered on `camera_ok`, which is
+    not rolled up.
+    """
+
+    pagination_class = None
+
+    @extend_schema(parameters=[RecordsAggregateQuerySerializer], responses=DateValueSerializer(many=True))
+    def get(self, request, *args, **kwargs):
+        return super().get(request, *args, **kwargs)
+
+    def list(self, request, *args, **kwargs):
+        # the filterset is kept for its cleaned filters, which the rollups are filtered with too
+        filterset = DjangoFilterBackend().get_filterset(request, self.get_queryset(), self)
+        if not filterset.is_valid():
+            raise translate_validation(filterset.errors)
+        records = filterset.qs
+        params = RecordsAggregateQuerySerializer(
+            data=request.query_params, context={"fields": records.model.count_fields()}
+        )
+        params.is_valid(raise_exception=True)
+        rollups = self.filter_rollups(records.model, params.validated_data["unit"], filterset.form.cleaned_data)
+        if rollups is not None:
+            series = aggregate_rollups(rollups, **params.validated_data)
+        else:
+            series = aggregate_records(records, **params.validated_data)
+        serializer_class = DateTimeValueSerializer if params.validated_data["unit"] == "hour" else DateValueSerializer
+        return Response(serializer_class(series, many=True).data)
+
+    def filter_rollups(self, db_model: type[RecordCommonFields], unit: str, filters: dict) -> QuerySet | None:
+        """The rollups matching the cleaned `filters` of the records, None when they cannot answer them."""
+        if filters.get("camera_ok"):
+            return None
+
+        rollups = rollups_for(unit).objects.filter(model=model_name_of(db_model), camera__is_complete=True)
+        if filters.get("camera_id"):
+            rollups = rollups.filter(camera__in=filters["camera_id"])
+        # the date range is whole days, as are the buckets of the rollups
+        if date_range := filters.get("date"):
+            if date_range.start:
+                rollups = rollups.filter(bucket__gte=date_range.start)
+            if date_range.stop:
+                rollups = rollups.filter(bucket__lte=date_range.stop)
+        return rollups
@@ -1,12 +1,12 @@
 from django.db.models.query import QuerySet
-from rest_framework import generics
 
 from cctv_api.filters import TF2RecordsFilter
 from cctv_api.serializers.tf2 import TF2RecordSerialzer
-from cctv_records.models import RecordsFilter, TF2Records
+from cctv_api.views.api.records import RecordsAggregateMixin, RecordsExportMixin, RecordsListAPIView
+from cctv_records.models import TF2Records
 
 
-class TF2RecordsViewSet(generics.ListAPIView):
+class TF2RecordsViewSet(RecordsListAPIView):
     """
     ##  Tensorflow-v2 Records
 
@@ -32,16 +32,36 @@ class TF2RecordsViewSet(generics.ListAPIView):
     filterset_class = TF2RecordsFilter
 
     def get_queryset(self) -> QuerySet:
-        prohibited_dateranges = RecordsFilter.get_exclusion_intervals(model_name="tf2")
-
         queryset = TF2Records.objects.filter(camera__is_complete=True)
-
-        for interval_entry in prohibited_dateranges:
-            camera_id = interval_entry["camera_id"]
-            exclusion_intervals = interval_entry["exclusion_intervals"]
-            for exclusion_interval in exclusion_intervals:
-                starting_datetime = exclusion_interval[0]
-                ending_datetime = exclusion_interval[1]
-                queryset = queryset.exclude(camera_id=camera_id, timestamp__range=(starting_datetime, ending_datetime))
+        queryset = queryset.filter(is_hidden=False)
 
         return queryset
+
+
+class TF2RecordsExportView(RecordsExportMixin, TF2RecordsViewSet):
+    """
+    ##  Tensorflow-v2 Records Export
+
+    Streams all the Tensorflow-v2 records matching the filters of the records endpoint in a single response,
+    in the same order and with the same fields, instead of page after page.
+
+    #### Parameters
+    - format: `csv` (default) or `ndjson`, one JSON record per line. The Accept header works too.
+
+    The response is compressed with brotli or gzip when the client accepts it (Accept-Encoding).
+    """
+
+
+class TF2RecordsAggregateView(RecordsAggregateMixin, TF2RecordsViewSet):
+    """
+    ##  Tensorflow-v2 Records Aggregates
+
+    A count of the Tensorflow-v2 records matching the filters of the records endpoint, aggregated over time
+    buckets, e.g. the daily sum of cars of a camera.
+
+    #### Parameters
+    - unit: Length of the buckets: hour, day (default), week, month, quarter or year. Buckets start at
+      the start of the unit in UTC; weeks start on Monday.
+    - method: sum (default), average, max or min of the counts of the records of a bucket.
+    - field: The count to aggregate, e.g. cars (default).
+    """
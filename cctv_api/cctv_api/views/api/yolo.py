@@ -1,31 +1,51 @@
 from django.db.models.query import QuerySet
-from rest_framework import generics
 
 from cctv_api.filters import YOLORecordsFilter
 from cctv_api.serializers.yolo import YOLORecordSerialzer
-from cctv_records.models import RecordsFilter, YOLORecords
+from cctv_api.views.api.records import RecordsAggregateMixin, RecordsExportMixin, RecordsListAPIView
+from cctv_records.models import YOLORecords
 
 
-class YOLORecordsViewSet(generics.ListAPIView):
+class YOLORecordsViewSet(RecordsListAPIView):
     http_method_names = [
         "get",
         "options",
     ]
 
     def get_queryset(self) -> QuerySet:
-        prohibited_dateranges = RecordsFilter.get_exclusion_intervals(model_name="yolo")
-
         queryset = YOLORecords.objects.filter(camera__is_complete=True)
-
-        for interval_entry in prohibited_dateranges:
-            camera_id = interval_entry["camera_id"]
-            exclusion_intervals = interval_entry["exclusion_intervals"]
-            for exclusion_interval in exclusion_intervals:
-                starting_datetime = exclusion_interval[0]
-                ending_datetime = exclusion_interval[1]
-                queryset = queryset.exclude(camera_id=camera_id, timestamp__range=(starting_datetime, ending_datetime))
+        queryset = queryset.filter(is_hidden=False)
 
         return queryset
 
     serializer_class = YOLORecordSerialzer
     filterset_class = YOLORecordsFilter
+
+
+class YOLORecordsExportView(RecordsExportMixin, YOLORecordsViewSet):
+    """
+    ##  YOLO Records Export
+
+    Streams all the YOLO records matching the filters of the records endpoint in a single response,
+    in the same order and with the same fields, instead of page after page.
+
+    #### Parameters
+    - format: `csv` (default) or `ndjson`, one JSON record per line. The Accept header works too.
+
+    The response is compressed with brotli or gzip when the client accepts it (Accept-Encoding).
+    """
+
+
+class YOLORecordsAggregateView(RecordsAggregateMixin, YOLORecordsViewSet):
+    """
+    ##  YOLO Records Aggregates
+
+    A count of the YOLO records matching the filters of the records endpoint, aggregated over time
+    buckets, e.g. the daily sum of cars of a camera.
+
+    #### Parameters
+    - unit: Length of the buckets: hour, day (default), week, month, quarter or year. Buckets start at
+      the start of the unit in UTC; weeks start on Monday.
+    - method: sum (default), average, max or min of the counts of the records of a bucket.
+    - field: The count to aggregate, e.g. cars (default).
+    """
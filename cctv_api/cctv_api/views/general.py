@@ -1,15 +1,18 @@
 from rest_framework import generics
-from cctv_api.serializers.general import CameraSerializer
+from rest_framework.response import Response
+
+from cctv_api.conditional import WatermarkConditionMixin
+from cctv_api.serializers.general import CameraSerializer, VersionSerializer
 from cctv_records.utils import get_cameras_that_have_records
 
 
-class CameraViewSet(generics.ListAPIView):
+class CameraViewSet(WatermarkConditionMixin, generics.ListAPIView):
     """
     ##  Camera Locations
     """
 
     # schema = AutoSchema(tags=["general"])
-    queryset = get_cameras_that_have_records()
+    queryset = get_cameras_that_have_records().prefetch_related("coverage")
     serializer_class = CameraSerializer
     pagination_class = None
     http_method_names = [
@@ -18,7 +21,7 @@ class CameraViewSet(generics.ListAPIView):
     ]
 
 
-class CameraViewDetail(generics.RetrieveAPIView):
+class CameraViewDetail(WatermarkConditionMixin, generics.RetrieveAPIView):
     """
     ##  Camera Detail
     """
@@ -28,5 +31,26 @@ class CameraViewDetail(generics.RetrieveAPIView):
         "options",
     ]
     # schema = AutoSchema(tags=["general"])
-    queryset = get_cameras_that_have_records()
+    queryset = get_cameras_that_have_records().prefetch_related("coverage")
     serializer_class = CameraSerializer
+
+
+class VersionView(WatermarkConditionMixin, generics.GenericAPIView):
+    """
+    ##  Data Version
+
+    The version of the data the API serves and when it last changed. It changes whenever reports are
+    ingested or cameras and record filters are synced; poll it, or send the ETag of a previous response
+    in If-None-Match to any endpoint, to tell whether there is anything new. Unchanged data is answered
+    with a 304 Not Modified.
+    """
+
+    http_method_names = [
+        "get",
+        "options",
+    ]
+    serializer_class = VersionSerializer
+
+    def get(self, request, *args, **kwargs):
+        version, latest_data_update = self.data_version(request)
+        return Response(self.get_serializer({"version": version, "latest_data_update": latest_data_update}).data)
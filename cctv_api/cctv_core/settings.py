@@ -7,6 +7,24 @@ APP_DIR = DJANGO_PROJ_DIR.parent
 STATIC_DIR = Path(os.getenv("STATIC_DIR", APP_DIR / "staticfiles"))
 SECRET_KEY = '@cv5wb5BH<Lh0>Xbe4ZA&5~zJ0:cITE%bMHD3f}"yIFNjG!r}?'
 UPLOAD_REPORT_PIN = os.getenv("UPLOAD_REPORT_PIN", "123")
+# Threads decoding uploaded reports concurrently; database writes stay on the request thread.
+INGEST_WORKERS = int(os.getenv("INGEST_WORKERS", "4"))
+# How report rows are written: "sqlite" (raw executemany upserts), "orm" (bulk_create) or "auto".
+INGEST_BACKEND = os.getenv("INGEST_BACKEND", "auto")
+# Applied by the sqlite ingest backend for the duration of a report, then restored.
+INGEST_SQLITE_PRAGMAS = {
+    "synchronous": "NORMAL",
+    "cache_size": -64000,  # KiB
+    "temp_store": "MEMORY",
+}
+# Where queued uploads wait for the process_ingest_jobs worker.
+INGEST_SPOOL_DIR = Path(os.getenv("INGEST_SPOOL_DIR", APP_DIR / "data" / "ingest"))
+# Bytes of a non-seekable report kept in memory before it is spooled to a temporary file.
+INGEST_SPOOL_MEMORY = int(os.getenv("INGEST_SPOOL_MEMORY", str(8 * 1024 * 1024)))
+# SQLite file caching the responses of the records endpoints across workers; empty to disable the cache.
+RESPONSE_CACHE_PATH = os.getenv("RESPONSE_CACHE_PATH", str(APP_DIR / "data" / "response_cache.sqlite3"))
+# Size of the cached responses, beyond which the least recently used ones are evicted.
+RESPONSE_CACHE_MAX_BYTES = int(os.getenv("RESPONSE_CACHE_MAX_BYTES", str(64 * 1024 * 1024)))
 DEBUG = os.getenv("DJANGO_DEBUG", "False").lower() == "true"
 ALLOWED_HOSTS = ["*"]
 DEFAULT_AUTO_FIELD = "django.db.models.AutoField"
@@ -1,6 +1,6 @@
 from django.contrib import admin
 
-from .models import Cameras
+from .models import Cameras, IngestJob, RejectedRow, ReportUpload, WatchedReport
 
 admin.site.empty_value_display = "(None)"
 
@@ -13,3 +13,55 @@ class CameraAdmin(admin.ModelAdmin):
 
 
 admin.site.register(Cameras, CameraAdmin)
+
+
+class IngestJobAdmin(admin.ModelAdmin):
+    list_filter = ["status"]
+    list_display = [
+        "__str__",
+        "rows_parsed",
+        "rows_inserted",
+        "rows_rejected",
+        "conflicts",
+        "created_at",
+        "finished_at",
+    ]
+    readonly_fields = [
+        "rows_parsed",
+        "rows_inserted",
+        "rows_rejected",
+        "conflicts",
+        "error",
+        "started_at",
+        "finished_at",
+    ]
+
+
+admin.site.register(IngestJob, IngestJobAdmin)
+
+
+class ReportUploadAdmin(admin.ModelAdmin):
+    list_filter = ["model"]
+    list_display = ["file_name", "model", "rows", "inserted", "conflicts", "times_skipped", "ingested_at"]
+    search_fields = ["file_name", "content_hash"]
+
+
+admin.site.register(ReportUpload, ReportUploadAdmin)
+
+
+class RejectedRowAdmin(admin.ModelAdmin):
+    list_filter = ["model"]
+    list_display = ["rejects_id", "line", "error", "created_at"]
+    search_fields = ["=rejects_id"]
+
+
+admin.site.register(RejectedRow, RejectedRowAdmin)
+
+
+class WatchedReportAdmin(admin.ModelAdmin):
+    list_filter = ["status", "source"]
+    list_display = ["name", "source", "status", "rows", "inserted", "processed_at"]
+    search_fields = ["name"]
+
+
+admin.site.register(WatchedReport, WatchedReportAdmin)
@@ -0,0 +1,83 @@
+import gzip
+import io
+import tempfile
+from collections.abc import Iterator
+from logging import getLogger
+from pathlib import PurePosixPath
+from typing import IO, Any
+from zipfile import ZipFile, ZipInfo
+
+from django.conf import settings
+
+logger = getLogger(__name__)
+
+ZIP_MAGIC = bytes.fromhex("504B0304")
+GZIP_MAGIC = bytes.fromhex("1F8B")
+COPY_CHUNK_SIZE = 1 << 20
+
+
+def spool(f: Any) -> IO[bytes]:
+    """Returns `f` if it can be seeked, otherwise a copy of it in a temporary file.
+
+    The copy is made chunk by chunk and stays in memory only up to settings.INGEST_SPOOL_MEMORY bytes,
+    after which it is moved to disk. Django uploads are already seekable: anything larger than
+    FILE_UPLOAD_MAX_MEMORY_SIZE is streamed to a temporary file by the upload handler.
+    """
+    try:
+        if f.seekable():
+            return f
+    except AttributeError:
+        pass
+
+    spooled = tempfile.SpooledTemporaryFile(max_size=settings.INGEST_SPOOL_MEMORY)
+    chunks = f.chunks() if hasattr(f, "chunks") else iter(lambda: f.read(COPY_CHUNK_SIZE), b"")
+    for chunk in chunks:
+        spooled.write(chunk)
+    spooled.seek(0)
+    return spooled
+
+
+def is_report_member(info: ZipInfo) -> bool:
+    path = PurePosixPath(info.filename)
+    if info.is_dir() or path.parts[0] == "__MACOSX" or path.name.startswith("."):
+        return False
+    return path.name.lower().endswith((".csv", ".csv.gz"))
+
+
+def iter_report_members(f: IO[bytes]) -> Iterator[tuple[str | None, IO[bytes]]]:
+    """Yields a `(member name, decompressed binary stream)` pair for every report in a gzip or zip file.
+
+    A gzip file is a single report and is yielded with `None` as member name. Every csv (or csv.gz)
+    member of a zip archive is yielded in name order, so an archive with several days of reports is
+    ingested oldest first when the names carry the date. Members are decompressed incrementally while
+    they are read, so each stream has to be consumed before moving on to the next one.
+    """
+    head = f.read(4)
+    f.seek(0)
+    if head.startswith(ZIP_MAGIC):
+        logger.info("is_zip")
+        with ZipFile(f) as archive:
+            members = sorted((i for i in archive.infolist() if is_report_member(i)), key=lambda i: i.filename)
+            if not members:
+                raise ValueError("Zip file does not contain any csv report")
+            for info in members:
+                logger.info(f"Extracting {info.filename}.")
+                with archive.open(info) as raw:
+                    if info.filename.lower().endswith(".gz"):
+                        yield info.filename, gzip.GzipFile(fileobj=raw)
+                    else:
+                        yield info.filename, raw
+    elif head.startswith(GZIP_MAGIC):
+        logger.info("is_gz")
+        # decompresses lazily as the report is read
+        yield None, gzip.GzipFile(fileobj=f)
+    else:
+        raise ValueError("File is not a zip or gzip file")
+
+
+def open_text(stream: IO[bytes], encoding: str = "utf8") -> IO[str]:
+    """Decodes a report stream yielded by `iter_report_members`."""
+    return io.TextIOWrapper(stream, encoding=encoding)
+
+
+__all__ = ["iter_report_members", "open_text", "spool"]
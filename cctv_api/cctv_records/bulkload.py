@@ -0,0 +1,95 @@
+from collections.abc import Iterable, Iterator
+from contextlib import contextmanager
+from logging import getLogger
+
+from django.conf import settings
+from django.db import OperationalError, connection
+from django.db.models import Model
+
+logger = getLogger(__name__)
+
+
+@contextmanager
+def ingest_pragmas(pragmas: dict[str, str | int] | None = None) -> Iterator[None]:
+    """Applies ingest-time PRAGMAs to the SQLite connection and restores the previous values afterwards.
+
+    PRAGMAs SQLite refuses to change at this point (e.g. `synchronous` inside an open transaction) are
+    left as they are.
+    """
+    pragmas = settings.INGEST_SQLITE_PRAGMAS if pragmas is None else pragmas
+    if connection.vendor != "sqlite":
+        yield
+        return
+
+    previous = {}
+    with connection.cursor() as cursor:
+        for name, value in pragmas.items():
+            cursor.execute(f"PRAGMA {name}")
+            current = cursor.fetchone()[0]
+            try:
+                cursor.execute(f"PRAGMA {name} = {value}")
+            except OperationalError as e:
+                logger.debug("leaving PRAGMA %s at %s: %s", name, current, e)
+                continue
+            previous[name] = current
+    try:
+        yield
+    finally:
+        with connection.cursor() as cursor:
+            for name, value in previous.items():
+                try:
+                    cursor.execute(f"PRAGMA {name} = {value}")
+                except OperationalError as e:
+                    logger.warning("could not restore PRAGMA %s to %s: %s", name, value, e)
+
+
+class SQLiteBulkLoader:
+    """Loads records straight into a records table with `executemany` and a native SQLite upsert.
+
+    The statement is prepared once per report; rows skip model instantiation and go in as
+    `(camera pk, timestamp, *fields)` tuples. Columns the report does not carry get their model default.
+
+    db_model: TF2Records or YOLORecords.
+    fields: The fields carried by the rows, after camera and timestamp.
+    overwrite: `DO UPDATE` the fields of existing rows instead of `DO NOTHING`.
+    """
+
+    def __init__(self, db_model: type[Model], fields: list[str], overwrite: bool = False):
+        self.db_model = db_model
+        self.fields = fields
+        self.overwrite = overwrite
+
+        opts = db_model._meta
+        quote = connection.ops.quote_name
+        row_fields = ["camera", "timestamp", *fields]
+        defaults = [f for f in opts.concrete_fields if not f.primary_key and f.name not in row_fields]
+        self.defaults = tuple(f.get_db_prep_save(f.get_default(), connection) for f in defaults)
+
+        columns = [opts.get_field(f).column for f in row_fields] + [f.column for f in defaults]
+        unique = [opts.get_field(f).column for f in ("timestamp", "camera")]
+        if overwrite:
+            on_conflict = "DO UPDATE SET " + ", ".join(
+                f"{quote(c)} = excluded.{quote(c)}" for c in columns[2 : 2 + len(fields)]
+            )
+        else:
+            on_conflict = "DO NOTHING"
+        self.sql = (
+            f"INSERT INTO {quote(opts.db_table)} ({', '.join(map(quote, columns))}) "
+            f"VALUES ({', '.join(['%s'] * len(columns))}) "
+            f"ON CONFLICT ({', '.join(map(quote, unique))}) {on_conflict}"
+        )
+
+    def write(self, rows: Iterable[tuple]) -> int:
+        """Writes `(camera pk, timestamp, *fields)` rows and returns the number of rows changed.
+
+        Without overwrite that is the number of rows inserted; with overwrite it also counts updates.
+        """
+        adapt_datetime = connection.ops.adapt_datetimefield_value
+        defaults = self.defaults
+        params = [(r[0], adapt_datetime(r[1]), *r[2:], *defaults) for r in rows]
+        with connection.cursor() as cursor:
+            cursor.executemany(self.sql, params)
+            return cursor.rowcount
+
+
+__all__ = ["SQLiteBulkLoader", "ingest_pragmas"]
@@ -1,28 +1,122 @@
+import glob
+import time
+from pathlib import Path
+
 from django.core.management.base import BaseCommand, CommandError
-from cctv_records.utils import process_uploaded_report
-import gzip
 
-from pathlib import Path
+from cctv_records.stats import IngestStats
+from cctv_records.utils import DEFAULT_BATCH_SIZE, ingest_report_paths
+
+REPORT_SUFFIXES = {".gz", ".zip"}
 
 
 class Command(BaseCommand):
-    help = "Import records from a CSV file into a Django model."
+    help = (
+        "Import reports into the database. Takes report files (.csv.gz or .zip), directories of reports "
+        "and glob patterns; several files are decoded in parallel and written one after another."
+    )
 
     def add_arguments(self, parser):
-        parser.add_argument("csv_file", help="Path to the CSV file")
+        parser.add_argument(
+            "csv_file",
+            nargs="+",
+            help="Report files, directories or glob patterns such as 'archive/cctv-report-v2-*-2025*.csv.gz'",
+        )
         parser.add_argument(
             "--encoding",
             default="utf-8",
             help="File encoding (default: utf-8)",
         )
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=DEFAULT_BATCH_SIZE,
+            help=f"Number of rows inserted per batch (default: {DEFAULT_BATCH_SIZE})",
+        )
+        parser.add_argument(
+            "--overwrite",
+            action="store_true",
+            help="Update existing records, and ingest the files even if they were ingested before",
+        )
+        parser.add_argument(
+            "--tolerant",
+            action="store_true",
+            help="Reject invalid rows and ingest the valid ones instead of failing the report",
+        )
+        parser.add_argument(
+            "--workers",
+            type=int,
+            help="Processes decoding reports in parallel (default: one per CPU, 1 for a single file)",
+        )
 
-    def handle(self, *args, **options):
-        csv_path: Path = Path(options["csv_file"])
+    def report_paths(self, patterns: list[str]) -> list[Path]:
+        """Expands the arguments into report files, in name order within each argument and without duplicates."""
+        paths: dict[Path, None] = {}
+        for pattern in patterns:
+            path = Path(pattern)
+            if path.is_dir():
+                matches = sorted(p for p in path.rglob("*") if p.is_file() and p.suffix.lower() in REPORT_SUFFIXES)
+            elif path.is_file():
+                if path.suffix.lower() not in REPORT_SUFFIXES:
+                    raise CommandError(f"Invalid file format {path}. Please provide .gz or .zip files.")
+                matches = [path]
+            else:
+                matches = sorted(
+                    Path(p) for p in glob.glob(pattern, recursive=True) if Path(p).suffix.lower() in REPORT_SUFFIXES
+                )
+                if not matches:
+                    raise CommandError(f"No report matches {pattern}.")
+            paths.update(dict.fromkeys(matches))
+        return list(paths)
 
-        if csv_path.suffix.lower() not in {".gz"}:
-            raise CommandError("Invalid file format. Please provide a .gz file.")
+    def handle(self, *args, **options):
+        paths = self.report_paths(options["csv_file"])
+        workers = options["workers"] or (1 if len(paths) == 1 else None)
 
-        with gzip.open(csv_path, "rt") as stream:
-            process_uploaded_report(stream)
+        started = time.perf_counter()
+        rows = inserted = conflicts = imported = skipped = failed = 0
+        results = ingest_report_paths(
+            paths,
+            overwrite=options["overwrite"],
+            batch_size=options["batch_size"],
+            workers=workers,
+            encoding=options["encoding"],
+            tolerant=options["tolerant"],
+        )
+        for i, result in enumerate(results, 1):
+            progress = f"[{i}/{len(paths)}] {result['file']}"
+            if result["status"] != "ok":
+                failed += 1
+                self.stderr.write(self.style.ERROR(f"{progress}: {result['message']}"))
+                for member in result.get("members", []):
+                    if member["status"] != "ok":
+                        self.stderr.write(self.style.ERROR(f"  {member['member']}: {member['message']}"))
+                continue
+            if result.get("skipped"):
+                skipped += 1
+                self.stdout.write(
+                    self.style.WARNING(f"{progress}: file was already ingested on {result['ingested_at']}, skipped.")
+                )
+                continue
+            imported += 1
+            rows += result["rows"]
+            inserted += result["inserted"]
+            conflicts += result["conflicts"]
+            rejected = f", {result['rejected']} rejected" if result["rejected"] else ""
+            timings = result["timings"]
+            self.stdout.write(
+                f"{progress}: {result['rows']} rows, {result['inserted']} inserted, {result['conflicts']} conflicts"
+                f"{rejected} in {timings['total']:.2f}s ({result['rows_per_second'] or 0:,} rows/s)\n"
+                f"    {', '.join(f'{stage} {timings[stage]:.2f}s' for stage in IngestStats.STAGES)},"
+                f" process peak memory {result['process_peak_rss_mb']} MiB"
+            )
 
-        self.stdout.write(self.style.SUCCESS("file imported successfully."))
+        elapsed = time.perf_counter() - started
+        self.stdout.write(
+            f"{rows} rows ({inserted} inserted, {conflicts} conflicts) from {imported} files in {elapsed:.1f}s,"
+            f" {rows / elapsed if elapsed else 0:,.0f} rows/s"
+        )
+        if failed:
+            raise CommandError(f"{failed} of {len(paths)} files failed, {imported} imported, {skipped} skipped.")
+        if imported:
+            self.stdout.write(self.style.SUCCESS(f"{imported} file(s) imported successfully, {skipped} skipped."))
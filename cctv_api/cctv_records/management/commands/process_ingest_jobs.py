@@ -0,0 +1,61 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from cctv_records.models import IngestJob
+from cctv_records.utils import DEFAULT_BATCH_SIZE, run_ingest_job
+
+
+class Command(BaseCommand):
+    help = "Work through the queued report uploads. Runs until stopped unless --once is given."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--once",
+            action="store_true",
+            help="Exit once the queue is empty",
+        )
+        parser.add_argument(
+            "--poll-interval",
+            type=float,
+            default=5,
+            help="Seconds to wait before checking an empty queue again (default: 5)",
+        )
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=DEFAULT_BATCH_SIZE,
+            help=f"Number of rows inserted per batch (default: {DEFAULT_BATCH_SIZE})",
+        )
+        parser.add_argument(
+            "--requeue-running",
+            action="store_true",
+            help="Put jobs left running by a worker that died back in the queue before starting",
+        )
+
+    def handle(self, *args, **options):
+        if options["requeue_running"]:
+            requeued = IngestJob.objects.filter(status=IngestJob.Status.RUNNING).update(
+                status=IngestJob.Status.QUEUED, started_at=None
+            )
+            self.stdout.write(self.style.WARNING(f"Requeued {requeued} running jobs"))
+
+        while True:
+            job = IngestJob.claim_next()
+            if job is None:
+                if options["once"]:
+                    break
+                time.sleep(options["poll_interval"])
+                continue
+
+            self.stdout.write(f"Processing {job}")
+            run_ingest_job(job, batch_size=options["batch_size"])
+            if job.status == IngestJob.Status.DONE:
+                self.stdout.write(
+                    self.style.SUCCESS(
+                        f"{job}: {job.rows_parsed} rows parsed, {job.rows_inserted} inserted,"
+                        f" {job.conflicts} conflicts in {job.duration:.1f}s"
+                    )
+                )
+            else:
+                self.stdout.write(self.style.ERROR(f"{job}: {job.error}"))
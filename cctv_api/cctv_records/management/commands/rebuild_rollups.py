@@ -0,0 +1,31 @@
+from django.core.management.base import BaseCommand
+
+from cctv_records.models import DailyRollup, DataWatermark, ModelChoices
+from cctv_records.rollups import refresh_coverage, refresh_rollups
+
+
+class Command(BaseCommand):
+    help = (
+        "Recompute from scratch the hourly and daily rollups the aggregate endpoints read, and the record "
+        "coverage of the cameras. They are kept up to date when reports are ingested and when filters are "
+        "saved or deleted; run this after writing or deleting records any other way, e.g. with a queryset "
+        "delete or raw SQL."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--model",
+            choices=ModelChoices.values,
+            action="append",
+            help="Only rebuild the rollups of this model (default: all models)",
+        )
+
+    def handle(self, *args, **options):
+        for model_name in options["model"] or ModelChoices.values:
+            hours = refresh_rollups(model_name)
+            cameras = refresh_coverage(model_name)
+            DataWatermark.bump(model_name)
+            days = DailyRollup.objects.filter(model=model_name).count()
+            self.stdout.write(
+                self.style.SUCCESS(f"{model_name}: {hours} hourly and {days} daily rollups, {cameras} cameras covered.")
+            )
@@ -0,0 +1,30 @@
+from django.core.management.base import BaseCommand
+
+from cctv_records.models import DataWatermark, ModelChoices, RecordsFilter
+from cctv_records.rollups import refresh_rollups
+
+
+class Command(BaseCommand):
+    help = (
+        "Recompute from scratch which records are hidden by the record filters. The flag is kept up to date "
+        "when filters are saved or deleted and when reports are ingested; run this after changing filters "
+        "without signals, e.g. with bulk_create or raw SQL. The rollups of a model are rebuilt when any of "
+        "its records changed."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--model",
+            choices=ModelChoices.values,
+            action="append",
+            help="Only rebuild the records of this model (default: all models)",
+        )
+
+    def handle(self, *args, **options):
+        for model_name in options["model"] or ModelChoices.values:
+            changed = RecordsFilter.update_visibility(model_name)
+            if changed:
+                refresh_rollups(model_name)
+                DataWatermark.bump(model_name)
+            hidden = RecordsFilter.record_model(model_name).objects.filter(is_hidden=True).count()
+            self.stdout.write(self.style.SUCCESS(f"{model_name}: {hidden} records hidden, {changed} changed."))
@@ -0,0 +1,31 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from cctv_api.cache import get_response_cache
+
+
+class Command(BaseCommand):
+    help = "Show the hit and miss counts of the response cache of the records endpoints, or clear it."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--clear",
+            action="store_true",
+            help="Delete every cached response and reset the counts",
+        )
+
+    def handle(self, *args, **options):
+        cache = get_response_cache()
+        if cache is None:
+            raise CommandError("The response cache is disabled, RESPONSE_CACHE_PATH is empty.")
+        if options["clear"]:
+            cache.clear()
+            self.stdout.write(self.style.SUCCESS(f"Cleared {cache.path}."))
+            return
+
+        stats = cache.stats()
+        hit_rate = f"{stats['hit_rate']:.1%}" if stats["hit_rate"] is not None else "n/a"
+        self.stdout.write(
+            f"{cache.path}: {stats['entries']} responses, {stats['bytes'] / 1024 / 1024:.1f} of "
+            f"{cache.max_bytes / 1024 / 1024:.0f} MiB\n"
+            f"{stats['hits']} hits, {stats['misses']} misses ({hit_rate} hit rate), {stats['evictions']} evictions"
+        )
@@ -0,0 +1,145 @@
+import posixpath
+import time
+from datetime import datetime, timedelta
+from fnmatch import fnmatch
+from pathlib import Path
+
+from django.core.files.storage import FileSystemStorage, Storage, storages
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+
+from cctv_records.models import WatchedReport
+from cctv_records.utils import DEFAULT_BATCH_SIZE, handle_uploaded_report_file
+
+
+class Command(BaseCommand):
+    help = (
+        "Watch a directory, or a configured storage, for new reports and ingest them in name order. "
+        "Ingested files are checkpointed so a restart only picks up new or changed files."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "path",
+            nargs="?",
+            default="",
+            help="Directory to watch, or the prefix within the storage given with --storage",
+        )
+        parser.add_argument(
+            "--storage",
+            help="Alias of a storage in settings.STORAGES to watch instead of a local directory",
+        )
+        parser.add_argument(
+            "--pattern",
+            default="cctv-report-v2-*.csv.gz",
+            help="Glob the file names have to match (default: cctv-report-v2-*.csv.gz)",
+        )
+        parser.add_argument(
+            "--poll-interval",
+            type=float,
+            default=60,
+            help="Seconds between two scans (default: 60)",
+        )
+        parser.add_argument(
+            "--settle",
+            type=float,
+            default=30,
+            help="Seconds a file must be left unmodified before it is ingested, so files still being "
+            "copied are not picked up (default: 30)",
+        )
+        parser.add_argument(
+            "--once",
+            action="store_true",
+            help="Scan once and exit",
+        )
+        parser.add_argument(
+            "--retry-failed",
+            action="store_true",
+            help="Ingest files that failed before again even if they did not change",
+        )
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=DEFAULT_BATCH_SIZE,
+            help=f"Number of rows inserted per batch (default: {DEFAULT_BATCH_SIZE})",
+        )
+
+    def handle(self, *args, **options):
+        prefix = options["path"]
+        if options["storage"]:
+            try:
+                storage = storages[options["storage"]]
+            except Exception as e:
+                raise CommandError(f"Unknown storage {options['storage']!r}: {e}") from e
+            source = f"{options['storage']}:{prefix}"
+            prefix = prefix.strip("/")
+        else:
+            if not prefix or not Path(prefix).is_dir():
+                raise CommandError(f"{prefix!r} is not a directory.")
+            source = str(Path(prefix).resolve())
+            storage = FileSystemStorage(location=source)
+            prefix = ""
+
+        self.stdout.write(f"Watching {source} for {options['pattern']}")
+        while True:
+            for name, size, modified_at in self.pending_reports(storage, source, prefix, options):
+                self.ingest(storage, source, name, size, modified_at, options)
+            if options["once"]:
+                break
+            time.sleep(options["poll_interval"])
+
+    def pending_reports(
+        self, storage: Storage, source: str, prefix: str, options: dict
+    ) -> list[tuple[str, int, datetime]]:
+        """Lists the `(name, size, modified_at)` of the matching files that are new or changed, in name order."""
+        checkpoints = {
+            c.name: c for c in WatchedReport.objects.filter(source=source).only("name", "size", "modified_at", "status")
+        }
+        settled_before = timezone.now() - timedelta(seconds=options["settle"])
+        pending = []
+        for file_name in sorted(storage.listdir(prefix)[1]):
+            if not fnmatch(file_name, options["pattern"]):
+                continue
+            name = posixpath.join(prefix, file_name) if prefix else file_name
+            size, modified_at = storage.size(name), storage.get_modified_time(name)
+            if modified_at > settled_before:
+                continue
+            checkpoint = checkpoints.get(name)
+            if checkpoint is not None and (checkpoint.size, checkpoint.modified_at) == (size, modified_at):
+                if checkpoint.status == WatchedReport.Status.DONE or not options["retry_failed"]:
+                    continue
+            pending.append((name, size, modified_at))
+        return pending
+
+    def ingest(self, storage: Storage, source: str, name: str, size: int, modified_at: datetime, options: dict) -> None:
+        self.stdout.write(f"Ingesting {name}")
+        defaults = {"size": size, "modified_at": modified_at}
+        try:
+            with storage.open(name, "rb") as f:
+                result = handle_uploaded_report_file(f, streaming=True, batch_size=options["batch_size"])
+            if result["status"] != "ok":
+                raise ValueError(result["message"])
+        except Exception as e:
+            WatchedReport.objects.update_or_create(
+                source=source,
+                name=name,
+                defaults=dict(defaults, status=WatchedReport.Status.FAILED, rows=0, inserted=0, error=str(e)),
+            )
+            self.stderr.write(self.style.ERROR(f"{name}: {e}"))
+            return
+
+        WatchedReport.objects.update_or_create(
+            source=source,
+            name=name,
+            defaults=dict(
+                defaults,
+                status=WatchedReport.Status.DONE,
+                rows=result["rows"],
+                inserted=result["inserted"],
+                error="",
+            ),
+        )
+        if result.get("skipped"):
+            self.stdout.write(self.style.WARNING(f"{name}: already ingested on {result['ingested_at']}, skipped."))
+        else:
+            self.stdout.write(self.style.SUCCESS(f"{name}: {result['rows']} rows, {result['inserted']} inserted"))
@@ -0,0 +1,47 @@
+# Generated by Django 4.2.30 on 2026-10-18 06:55
+
+import cctv_records.models
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("cctv_records", "0005_alter_recordsfilter_model_delete_tf1records"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="IngestJob",
+            fields=[
+                ("id", models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name="ID")),
+                (
+                    "file",
+                    models.FileField(
+                        max_length=255, storage=cctv_records.models.ingest_job_storage, upload_to="jobs/%Y%m%d"
+                    ),
+                ),
+                ("file_name", models.TextField(help_text="Name of the uploaded file")),
+                ("overwrite", models.BooleanField(default=False)),
+                (
+                    "status",
+                    models.CharField(
+                        choices=[("queued", "Queued"), ("running", "Running"), ("done", "Done"), ("failed", "Failed")],
+                        db_index=True,
+                        default="queued",
+                        max_length=10,
+                    ),
+                ),
+                ("rows_parsed", models.IntegerField(default=0)),
+                ("rows_inserted", models.IntegerField(default=0)),
+                ("conflicts", models.IntegerField(default=0, help_text="Rows that were already stored")),
+                ("error", models.TextField(blank=True, default="")),
+                ("created_at", models.DateTimeField(auto_now_add=True)),
+                ("started_at", models.DateTimeField(null=True)),
+                ("finished_at", models.DateTimeField(null=True)),
+            ],
+            options={
+                "db_table": "ingest_jobs",
+                "ordering": ["pk"],
+            },
+        ),
+    ]
@@ -0,0 +1,31 @@
+# Generated by Django 4.2.30 on 2026-10-18 06:56
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("cctv_records", "0006_ingestjob"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="ReportUpload",
+            fields=[
+                ("id", models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name="ID")),
+                ("content_hash", models.CharField(help_text="sha256 of the report file", max_length=64, unique=True)),
+                ("file_name", models.TextField(help_text="Name of the file when it was last ingested")),
+                ("model", models.CharField(choices=[("tf2", "TF2"), ("yolo", "YOLO")], max_length=10)),
+                ("rows", models.IntegerField(default=0)),
+                ("inserted", models.IntegerField(default=0)),
+                ("conflicts", models.IntegerField(default=0, help_text="Rows that were already stored")),
+                ("times_skipped", models.IntegerField(default=0, help_text="Re-uploads that were skipped")),
+                ("created_at", models.DateTimeField(auto_now_add=True)),
+                ("ingested_at", models.DateTimeField(help_text="When the content was last ingested")),
+            ],
+            options={
+                "db_table": "report_uploads",
+                "ordering": ["-ingested_at"],
+            },
+        ),
+    ]
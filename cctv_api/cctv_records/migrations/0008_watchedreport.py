@@ -0,0 +1,35 @@
+# Generated by Django 4.2.30 on 2026-10-18 07:03
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("cctv_records", "0007_reportupload"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="WatchedReport",
+            fields=[
+                ("id", models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name="ID")),
+                ("source", models.TextField(help_text="Watched directory or storage alias")),
+                ("name", models.TextField(help_text="Name of the file within the source")),
+                ("size", models.BigIntegerField()),
+                ("modified_at", models.DateTimeField()),
+                ("status", models.CharField(choices=[("done", "Done"), ("failed", "Failed")], max_length=10)),
+                ("rows", models.IntegerField(default=0)),
+                ("inserted", models.IntegerField(default=0)),
+                ("error", models.TextField(blank=True, default="")),
+                ("processed_at", models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                "db_table": "watched_reports",
+                "ordering": ["source", "name"],
+            },
+        ),
+        migrations.AddConstraint(
+            model_name="watchedreport",
+            constraint=models.UniqueConstraint(fields=("source", "name"), name="unique_watched_report"),
+        ),
+    ]
@@ -0,0 +1,38 @@
+# Generated by Django 4.2.30 on 2026-10-18 07:07
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("cctv_records", "0008_watchedreport"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="RejectedRow",
+            fields=[
+                ("id", models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name="ID")),
+                ("rejects_id", models.UUIDField(db_index=True, help_text="Shared by the rejected rows of one report")),
+                ("model", models.CharField(choices=[("tf2", "TF2"), ("yolo", "YOLO")], max_length=10)),
+                ("line", models.IntegerField(help_text="Line of the row in the report, the header being line 1")),
+                ("row", models.TextField(help_text="The row as it appeared in the report")),
+                ("error", models.TextField()),
+                ("created_at", models.DateTimeField(auto_now_add=True)),
+            ],
+            options={
+                "db_table": "rejected_rows",
+                "ordering": ["rejects_id", "line"],
+            },
+        ),
+        migrations.AddField(
+            model_name="ingestjob",
+            name="rows_rejected",
+            field=models.IntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name="ingestjob",
+            name="tolerant",
+            field=models.BooleanField(default=False, help_text="Reject invalid rows instead of failing the report"),
+        ),
+    ]
@@ -0,0 +1,45 @@
+# Generated by Django 4.2.30 on 2026-10-18 07:14
+
+from django.db import migrations, models
+
+
+def hide_filtered_records(apps, schema_editor):
+    RecordsFilter = apps.get_model("cctv_records", "RecordsFilter")
+    for model_name, db_model in (("tf2", "TF2Records"), ("yolo", "YOLORecords")):
+        hidden = models.Exists(
+            RecordsFilter.objects.filter(
+                model=model_name,
+                camera_id=models.OuterRef("camera_id"),
+                from_datetime__lte=models.OuterRef("timestamp"),
+                to_datetime__gte=models.OuterRef("timestamp"),
+            )
+        )
+        apps.get_model("cctv_records", db_model).objects.filter(hidden).update(is_hidden=True)
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("cctv_records", "0009_rejectedrow"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="tf2records",
+            name="is_hidden",
+            field=models.BooleanField(
+                default=False,
+                editable=False,
+                help_text="Falls in a RecordsFilter interval of its camera and model; kept up to date by the signals.",
+            ),
+        ),
+        migrations.AddField(
+            model_name="yolorecords",
+            name="is_hidden",
+            field=models.BooleanField(
+                default=False,
+                editable=False,
+                help_text="Falls in a RecordsFilter interval of its camera and model; kept up to date by the signals.",
+            ),
+        ),
+        migrations.RunPython(hide_filtered_records, migrations.RunPython.noop),
+    ]
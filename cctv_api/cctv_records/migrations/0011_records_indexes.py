@@ -0,0 +1,77 @@
+# Generated by Django 4.2.30 on 2026-10-18 08:36
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("cctv_records", "0010_records_is_hidden"),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name="tf2records",
+            name="camera",
+            field=models.ForeignKey(
+                db_index=False,
+                help_text="Camera Location",
+                on_delete=django.db.models.deletion.PROTECT,
+                related_name="%(app_label)s_%(class)s_cameras",
+                related_query_name="%(app_label)s_%(class)s_cameras",
+                to="cctv_records.cameras",
+            ),
+        ),
+        migrations.AlterField(
+            model_name="yolorecords",
+            name="camera",
+            field=models.ForeignKey(
+                db_index=False,
+                help_text="Camera Location",
+                on_delete=django.db.models.deletion.PROTECT,
+                related_name="%(app_label)s_%(class)s_cameras",
+                related_query_name="%(app_label)s_%(class)s_cameras",
+                to="cctv_records.cameras",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="tf2records",
+            index=models.Index(fields=["camera", "-timestamp"], name="tf2_records_camera_ts_idx"),
+        ),
+        migrations.AddIndex(
+            model_name="tf2records",
+            index=models.Index(
+                condition=models.Q(("is_hidden", False)),
+                fields=["-timestamp", "camera"],
+                name="tf2_records_visible_ts_idx",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="tf2records",
+            index=models.Index(
+                condition=models.Q(("is_hidden", False), ("camera_ok", True)),
+                fields=["-timestamp", "camera"],
+                name="tf2_records_ok_ts_idx",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="yolorecords",
+            index=models.Index(fields=["camera", "-timestamp"], name="yolo_records_camera_ts_idx"),
+        ),
+        migrations.AddIndex(
+            model_name="yolorecords",
+            index=models.Index(
+                condition=models.Q(("is_hidden", False)),
+                fields=["-timestamp", "camera"],
+                name="yolo_records_visible_ts_idx",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="yolorecords",
+            index=models.Index(
+                condition=models.Q(("is_hidden", False), ("camera_ok", True)),
+                fields=["-timestamp", "camera"],
+                name="yolo_records_ok_ts_idx",
+            ),
+        ),
+    ]
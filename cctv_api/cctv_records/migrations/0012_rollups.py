@@ -0,0 +1,196 @@
+# Generated by Django 4.2.30 on 2026-10-18 07:25
+
+from datetime import timezone
+
+from django.db import migrations, models
+from django.db.models.functions import Trunc
+import django.db.models.deletion
+
+
+def roll_up_records(apps, schema_editor):
+    for model_name, db_model in (("tf2", "TF2Records"), ("yolo", "YOLORecords")):
+        Records = apps.get_model("cctv_records", db_model)
+        fields = [
+            f.name for f in Records._meta.concrete_fields if isinstance(f, models.IntegerField) and not f.primary_key
+        ]
+        for rollup_model, unit in (("HourlyRollup", "hour"), ("DailyRollup", "day")):
+            Rollup = apps.get_model("cctv_records", rollup_model)
+            rows = (
+                Records.objects.filter(is_hidden=False)
+                .order_by()
+                .annotate(start=Trunc("timestamp", unit, tzinfo=timezone.utc))
+                .values("camera_id", "start")
+                .annotate(
+                    n=models.Count("pk"),
+                    **{f"sum_{f}": models.Sum(f) for f in fields},
+                    **{f"count_{f}": models.Count(f) for f in fields},
+                    **{f"min_{f}": models.Min(f) for f in fields},
+                    **{f"max_{f}": models.Max(f) for f in fields},
+                )
+            )
+            Rollup.objects.bulk_create(
+                (
+                    Rollup(
+                        camera_id=row["camera_id"],
+                        model=model_name,
+                        bucket=row["start"],
+                        records=row["n"],
+                        **{
+                            f"{f}_{stat}": row[f"{stat}_{f}"] for f in fields for stat in ("sum", "count", "min", "max")
+                        },
+                    )
+                    for row in rows.iterator()
+                ),
+                batch_size=500,
+            )
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("cctv_records", "0011_records_indexes"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="DailyRollup",
+            fields=[
+                ("id", models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name="ID")),
+                ("model", models.CharField(choices=[("tf2", "TF2"), ("yolo", "YOLO")], max_length=10)),
+                ("bucket", models.DateTimeField(help_text="Start of the bucket, in UTC")),
+                ("records", models.IntegerField(help_text="Visible records in the bucket")),
+                ("cars_sum", models.BigIntegerField(null=True)),
+                ("cars_count", models.IntegerField(null=True)),
+                ("cars_min", models.IntegerField(null=True)),
+                ("cars_max", models.IntegerField(null=True)),
+                ("persons_sum", models.BigIntegerField(null=True)),
+                ("persons_count", models.IntegerField(null=True)),
+                ("persons_min", models.IntegerField(null=True)),
+                ("persons_max", models.IntegerField(null=True)),
+                ("bicycles_sum", models.BigIntegerField(null=True)),
+                ("bicycles_count", models.IntegerField(null=True)),
+                ("bicycles_min", models.IntegerField(null=True)),
+                ("bicycles_max", models.IntegerField(null=True)),
+                ("trucks_sum", models.BigIntegerField(null=True)),
+                ("trucks_count", models.IntegerField(null=True)),
+                ("trucks_min", models.IntegerField(null=True)),
+                ("trucks_max", models.IntegerField(null=True)),
+                ("motorcycles_sum", models.BigIntegerField(null=True)),
+                ("motorcycles_count", models.IntegerField(null=True)),
+                ("motorcycles_min", models.IntegerField(null=True)),
+                ("motorcycles_max", models.IntegerField(null=True)),
+                ("buses_sum", models.BigIntegerField(null=True)),
+                ("buses_count", models.IntegerField(null=True)),
+                ("buses_min", models.IntegerField(null=True)),
+                ("buses_max", models.IntegerField(null=True)),
+                ("pedestrians_sum", models.BigIntegerField(null=True)),
+                ("pedestrians_count", models.IntegerField(null=True)),
+                ("pedestrians_min", models.IntegerField(null=True)),
+                ("pedestrians_max", models.IntegerField(null=True)),
+                ("cyclists_sum", models.BigIntegerField(null=True)),
+                ("cyclists_count", models.IntegerField(null=True)),
+                ("cyclists_min", models.IntegerField(null=True)),
+                ("cyclists_max", models.IntegerField(null=True)),
+                ("lorries_sum", models.BigIntegerField(null=True)),
+                ("lorries_count", models.IntegerField(null=True)),
+                ("lorries_min", models.IntegerField(null=True)),
+                ("lorries_max", models.IntegerField(null=True)),
+                ("vans_sum", models.BigIntegerField(null=True)),
+                ("vans_count", models.IntegerField(null=True)),
+                ("vans_min", models.IntegerField(null=True)),
+                ("vans_max", models.IntegerField(null=True)),
+                ("taxis_sum", models.BigIntegerField(null=True)),
+                ("taxis_count", models.IntegerField(null=True)),
+                ("taxis_min", models.IntegerField(null=True)),
+                ("taxis_max", models.IntegerField(null=True)),
+                (
+                    "camera",
+                    models.ForeignKey(
+                        db_index=False, on_delete=django.db.models.deletion.CASCADE, to="cctv_records.cameras"
+                    ),
+                ),
+            ],
+            options={
+                "db_table": "rollups_daily",
+            },
+        ),
+        migrations.CreateModel(
+            name="HourlyRollup",
+            fields=[
+                ("id", models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name="ID")),
+                ("model", models.CharField(choices=[("tf2", "TF2"), ("yolo", "YOLO")], max_length=10)),
+                ("bucket", models.DateTimeField(help_text="Start of the bucket, in UTC")),
+                ("records", models.IntegerField(help_text="Visible records in the bucket")),
+                ("cars_sum", models.BigIntegerField(null=True)),
+                ("cars_count", models.IntegerField(null=True)),
+                ("cars_min", models.IntegerField(null=True)),
+                ("cars_max", models.IntegerField(null=True)),
+                ("persons_sum", models.BigIntegerField(null=True)),
+                ("persons_count", models.IntegerField(null=True)),
+                ("persons_min", models.IntegerField(null=True)),
+                ("persons_max", models.IntegerField(null=True)),
+                ("bicycles_sum", models.BigIntegerField(null=True)),
+                ("bicycles_count", models.IntegerField(null=True)),
+                ("bicycles_min", models.IntegerField(null=True)),
+                ("bicycles_max", models.IntegerField(null=True)),
+                ("trucks_sum", models.BigIntegerField(null=True)),
+                ("trucks_count", models.IntegerField(null=True)),
+                ("trucks_min", models.IntegerField(null=True)),
+                ("trucks_max", models.IntegerField(null=True)),
+                ("motorcycles_sum", models.BigIntegerField(null=True)),
+                ("motorcycles_count", models.IntegerField(null=True)),
+                ("motorcycles_min", models.IntegerField(null=True)),
+                ("motorcycles_max", models.IntegerField(null=True)),
+                ("buses_sum", models.BigIntegerField(null=True)),
+                ("buses_count", models.IntegerField(null=True)),
+                ("buses_min", models.IntegerField(null=True)),
+                ("buses_max", models.IntegerField(null=True)),
+                ("pedestrians_sum", models.BigIntegerField(null=True)),
+                ("pedestrians_count", models.IntegerField(null=True)),
+                ("pedestrians_min", models.IntegerField(null=True)),
+                ("pedestrians_max", models.IntegerField(null=True)),
+                ("cyclists_sum", models.BigIntegerField(null=True)),
+                ("cyclists_count", models.IntegerField(null=True)),
+                ("cyclists_min", models.IntegerField(null=True)),
+                ("cyclists_max", models.IntegerField(null=True)),
+                ("lorries_sum", models.BigIntegerField(null=True)),
+                ("lorries_count", models.IntegerField(null=True)),
+                ("lorries_min", models.IntegerField(null=True)),
+                ("lorries_max", models.IntegerField(null=True)),
+                ("vans_sum", models.BigIntegerField(null=True)),
+                ("vans_count", models.IntegerField(null=True)),
+                ("vans_min", models.IntegerField(null=True)),
+                ("vans_max", models.IntegerField(null=True)),
+                ("taxis_sum", models.BigIntegerField(null=True)),
+                ("taxis_count", models.IntegerField(null=True)),
+                ("taxis_min", models.IntegerField(null=True)),
+                ("taxis_max", models.IntegerField(null=True)),
+                (
+                    "camera",
+                    models.ForeignKey(
+                        db_index=False, on_delete=django.db.models.deletion.CASCADE, to="cctv_records.cameras"
+                    ),
+                ),
+            ],
+            options={
+                "db_table": "rollups_hourly",
+                "indexes": [models.Index(fields=["model", "bucket"], name="rollups_hourly_bucket_idx")],
+            },
+        ),
+        migrations.AddConstraint(
+            model_name="hourlyrollup",
+            constraint=models.UniqueConstraint(
+                fields=("camera", "model", "bucket"), name="rollups_hourly_unique_bucket"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="dailyrollup",
+            index=models.Index(fields=["model", "bucket"], name="rollups_daily_bucket_idx"),
+        ),
+        migrations.AddConstraint(
+            model_name="dailyrollup",
+            constraint=models.UniqueConstraint(
+                fields=("camera", "model", "bucket"), name="rollups_daily_unique_bucket"
+            ),
+        ),
+        migrations.RunPython(roll_up_records, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,25 @@
+# Generated by Django 4.2.30 on 2026-10-18 07:42
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("cctv_records", "0012_rollups"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="DataWatermark",
+            fields=[
+                ("id", models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name="ID")),
+                ("name", models.CharField(max_length=10, unique=True)),
+                ("version", models.PositiveBigIntegerField(default=0)),
+                ("updated_at", models.DateTimeField()),
+            ],
+            options={
+                "db_table": "data_watermarks",
+                "ordering": ["name"],
+            },
+        ),
+    ]
@@ -0,0 +1,62 @@
+# Generated by Django 4.2.30 on 2026-10-18 07:49
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+def cover_cameras(apps, schema_editor):
+    CameraCoverage = apps.get_model("cctv_records", "CameraCoverage")
+    for model_name, db_model in (("tf2", "TF2Records"), ("yolo", "YOLORecords")):
+        rows = (
+            apps.get_model("cctv_records", db_model)
+            .objects.order_by()
+            .values("camera_id")
+            .annotate(n=models.Count("pk"), first=models.Min("timestamp"), last=models.Max("timestamp"))
+        )
+        CameraCoverage.objects.bulk_create(
+            CameraCoverage(
+                camera_id=row["camera_id"],
+                model=model_name,
+                records=row["n"],
+                first_timestamp=row["first"],
+                last_timestamp=row["last"],
+            )
+            for row in rows
+        )
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("cctv_records", "0013_data_watermarks"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="CameraCoverage",
+            fields=[
+                ("id", models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name="ID")),
+                ("model", models.CharField(choices=[("tf2", "TF2"), ("yolo", "YOLO")], max_length=10)),
+                ("records", models.BigIntegerField(help_text="Records of the camera, hidden ones included")),
+                ("first_timestamp", models.DateTimeField(help_text="Timestamp of the first record")),
+                ("last_timestamp", models.DateTimeField(help_text="Timestamp of the last record")),
+                (
+                    "camera",
+                    models.ForeignKey(
+                        db_index=False,
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="coverage",
+                        to="cctv_records.cameras",
+                    ),
+                ),
+            ],
+            options={
+                "db_table": "camera_coverage",
+                "ordering": ["camera_id", "model"],
+            },
+        ),
+        migrations.AddConstraint(
+            model_name="cameracoverage",
+            constraint=models.UniqueConstraint(fields=("camera", "model"), name="unique_camera_coverage"),
+        ),
+        migrations.RunPython(cover_cameras, migrations.RunPython.noop),
+    ]
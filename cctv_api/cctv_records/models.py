@@ -1,8 +1,12 @@
 import logging
+import os
+from collections.abc import Iterable
 from datetime import datetime
 from typing import Annotated, Any
 
+from django.conf import settings
 from django.core.exceptions import ValidationError
+from django.core.files.storage import FileSystemStorage
 from django.db import models
 from django.utils.functional import cached_property
 from django.utils.text import slugify
@@ -41,6 +45,51 @@ class RecordsFilter(models.Model):
         self.full_clean()
         return super().save(*args, **kwargs)
 
+    @classmethod
+    def hides_record(cls, model_name: str) -> models.Exists:
+        """Correlated subquery matching the filters that hide the outer record of `model_name`.
+
+        Used as `records.filter(~RecordsFilter.hides_record("tf2"))`, which excludes every filtered
+        interval with a single NOT EXISTS, whatever the number of filters. Overlapping filters need no
+        merging and, like `timestamp__range`, both ends of an interval are hidden.
+        """
+        assert model_name in ModelChoices.values
+        return models.Exists(
+            cls.objects.filter(
+                model=model_name,
+                camera_id=models.OuterRef("camera_id"),
+                from_datetime__lte=models.OuterRef("timestamp"),
+                to_datetime__gte=models.OuterRef("timestamp"),
+            )
+        )
+
+    @classmethod
+    def record_model(cls, model_name: str) -> type["RecordCommonFields"]:
+        return {ModelChoices.TF2: TF2Records, ModelChoices.YOLO: YOLORecords}[ModelChoices(model_name)]
+
+    @classmethod
+    def update_visibility(
+        cls,
+        model_name: str,
+        camera_ids: Iterable[int] | None = None,
+        start: datetime | None = None,
+        end: datetime | None = None,
+    ) -> int:
+        """Recomputes `is_hidden` of the records of `model_name`, optionally only for some cameras and a time range.
+
+        Two ranged bulk updates, touching only the records whose flag changes; returns how many did.
+        """
+        records = cls.record_model(model_name).objects.all()
+        if camera_ids is not None:
+            records = records.filter(camera_id__in=list(camera_ids))
+        if start is not None:
+            records = records.filter(timestamp__gte=start)
+        if end is not None:
+            records = records.filter(timestamp__lte=end)
+        hidden = cls.hides_record(model_name)
+        shown = records.filter(is_hidden=True).filter(~hidden).update(is_hidden=False)
+        return shown + records.filter(is_hidden=False).filter(hidden).update(is_hidden=True)
+
     @classmethod
     def get_exclusion_intervals(cls, model_name: str | None = None, camera: "Cameras | str | None" = None) -> list[Any]:
         "Returns a list of datetime intervals where the records should be hidden"
@@ -131,6 +180,12 @@ class Cameras(models.Model):
         return f"CCTVCamera({pk}-{camera_ref})"
 
 
+# the records served by the API; an index limited to them matches the `is_hidden=False` filter of the views
+VISIBLE = models.Q(is_hidden=False)
+# visible records of a camera reported as working; SQLite only uses an index on a boolean when it is partial
+VISIBLE_OK = VISIBLE & models.Q(camera_ok=True)
+
+
 class RecordCommonFields(models.Model):
     """Common Fields for all Record Models"""
 
@@ -145,11 +200,17 @@ class RecordCommonFields(models.Model):
     camera = models.ForeignKey(
         "cctv_records.Cameras",
         on_delete=models.PROTECT,
+        db_index=False,  # led by the camera indexes of the records tables
         related_name="%(app_label)s_%(class)s_cameras",
         help_text="Camera Location",
         related_query_name="%(app_label)s_%(class)s_cameras",
     )
     timestamp = models.DateTimeField(help_text="Datetime of the capture.", null=False)
+    is_hidden = models.BooleanField(
+        default=False,
+        editable=False,
+        help_text="Falls in a RecordsFilter interval of its camera and model; kept up to date by the signals.",
+    )
     camera_ok = models.BooleanField(
         null=True,
         choices=IsCameraOkChoices.choices,
@@ -158,6 +219,11 @@ class RecordCommonFields(models.Model):
         " capture. null values mean it was unknown. ",
     )
 
+    @classmethod
+    def count_fields(cls) -> list[str]:
+        """The object count fields of the model, e.g. cars."""
+        return [f.name for f in cls._meta.concrete_fields if isinstance(f, models.IntegerField) and not f.primary_key]
+
 
 class TF2Records(RecordCommonFields):
     cars = models.IntegerField(help_text="Number of cars", default=None, null=True)
@@ -181,6 +247,11 @@ class TF2Records(RecordCommonFields):
                 name="tf2_unique_timestamp_camera",
             ),
         )
+        indexes = (
+            models.Index(fields=["camera", "-timestamp"], name="tf2_records_camera_ts_idx"),
+            models.Index(fields=["-timestamp", "camera"], condition=VISIBLE, name="tf2_records_visible_ts_idx"),
+            models.Index(fields=["-timestamp", "camera"], condition=VISIBLE_OK, name="tf2_records_ok_ts_idx"),
+        )
         verbose_name_plural = "TF2Records"
 
 
@@ -207,11 +278,280 @@ class YOLORecords(RecordCommonFields):
                 name="yolo_unique_timestamp_camera",
             ),
         )
+        indexes = (
+            models.Index(fields=["camera", "-timestamp"], name="yolo_records_camera_ts_idx"),
+            models.Index(fields=["-timestamp", "camera"], condition=VISIBLE, name="yolo_records_visible_ts_idx"),
+            models.Index(fields=["-timestamp", "camera"], condition=VISIBLE_OK, name="yolo_records_ok_ts_idx"),
+        )
         verbose_name_plural = "YOLORecords"
 
 
+class RecordsRollup(models.Model):
+    """Count statistics of the visible records of a camera and model over a time bucket.
+
+    For every count field of the records (the fields of both models, see ROLLUP_FIELDS) a rollup keeps
+    `<field>_sum`, `<field>_count` (records with a value), `<field>_min` and `<field>_max`; the fields of
+    the other model stay null. Kept up to date by the ingest and the record filter signals, see
+    cctv_records.rollups.
+    """
+
+    unit: str
+
+    camera = models.ForeignKey("cctv_records.Cameras", on_delete=models.CASCADE, db_index=False)
+    model = models.CharField(choices=ModelChoices.choices, max_length=10)
+    bucket = models.DateTimeField(help_text="Start of the bucket, in UTC")
+    records = models.IntegerField(help_text="Visible records in the bucket")
+
+    class Meta:
+        abstract = True
+
+
+ROLLUP_FIELDS = tuple(dict.fromkeys([*TF2Records.count_fields(), *YOLORecords.count_fields()]))
+for _name in ROLLUP_FIELDS:
+    RecordsRollup.add_to_class(f"{_name}_sum", models.BigIntegerField(null=True))
+    RecordsRollup.add_to_class(f"{_name}_count", models.IntegerField(null=True))
+    RecordsRollup.add_to_class(f"{_name}_min", models.IntegerField(null=True))
+    RecordsRollup.add_to_class(f"{_name}_max", models.IntegerField(null=True))
+del _name
+
+
+class HourlyRollup(RecordsRollup):
+    unit = "hour"
+
+    class Meta:
+        db_table = "rollups_hourly"
+        constraints = (
+            models.UniqueConstraint(fields=["camera", "model", "bucket"], name="rollups_hourly_unique_bucket"),
+        )
+        indexes = (models.Index(fields=["model", "bucket"], name="rollups_hourly_bucket_idx"),)
+
+
+class DailyRollup(RecordsRollup):
+    unit = "day"
+
+    class Meta:
+        db_table = "rollups_daily"
+        constraints = (
+            models.UniqueConstraint(fields=["camera", "model", "bucket"], name="rollups_daily_unique_bucket"),
+        )
+        indexes = (models.Index(fields=["model", "bucket"], name="rollups_daily_bucket_idx"),)
+
+
+class CameraCoverage(models.Model):
+    """How many records of a model a camera has and over which period, kept up to date by the ingest.
+
+    Cameras with records are the ones with a coverage, which spares the camera endpoints scanning the
+    records tables; see cctv_records.rollups.update_coverage and refresh_coverage.
+    """
+
+    camera = models.ForeignKey("Cameras", on_delete=models.CASCADE, related_name="coverage", db_index=False)
+    model = models.CharField(choices=ModelChoices.choices, max_length=10)
+    records = models.BigIntegerField(help_text="Records of the camera, hidden ones included")
+    first_timestamp = models.DateTimeField(help_text="Timestamp of the first record")
+    last_timestamp = models.DateTimeField(help_text="Timestamp of the last record")
+
+    class Meta:
+        db_table = "camera_coverage"
+        ordering = ["camera_id", "model"]
+        constraints = (models.UniqueConstraint(fields=["camera", "model"], name="unique_camera_coverage"),)
+
+    def __str__(self):
+        return f"CameraCoverage({self.camera_id}-{self.model})"
+
+
+class IngestSpoolStorage(FileSystemStorage):
+    """Local storage for queued uploads, rooted at settings.INGEST_SPOOL_DIR when it is accessed."""
+
+    @property
+    def base_location(self):
+        return settings.INGEST_SPOOL_DIR
+
+    @property
+    def location(self):
+        return os.path.abspath(self.base_location)
+
+
+def ingest_job_storage():
+    return IngestSpoolStorage()
+
+
+class IngestJob(models.Model):
+    """An uploaded report waiting for, or going through, the background ingest worker."""
+
+    class Status(models.TextChoices):
+        QUEUED = ("queued", "Queued")
+        RUNNING = ("running", "Running")
+        DONE = ("done", "Done")
+        FAILED = ("failed", "Failed")
+
+    file = models.FileField(upload_to="jobs/%Y%m%d", storage=ingest_job_storage, max_length=255)
+    file_name = models.TextField(help_text="Name of the uploaded file")
+    overwrite = models.BooleanField(default=False)
+    tolerant = models.BooleanField(default=False, help_text="Reject invalid rows instead of failing the report")
+    status = models.CharField(choices=Status.choices, default=Status.QUEUED, max_length=10, db_index=True)
+    rows_parsed = models.IntegerField(default=0)
+    rows_inserted = models.IntegerField(default=0)
+    rows_rejected = models.IntegerField(default=0)
+    conflicts = models.IntegerField(default=0, help_text="Rows that were already stored")
+    error = models.TextField(blank=True, default="")
+    created_at = models.DateTimeField(auto_now_add=True)
+    started_at = models.DateTimeField(null=True)
+    finished_at = models.DateTimeField(null=True)
+
+    class Meta:
+        db_table = "ingest_jobs"
+        ordering = ["pk"]
+
+    @property
+    def duration(self) -> float | None:
+        """Seconds the job has been running for, or took."""
+        from django.utils import timezone
+
+        if self.started_at is None:
+            return None
+        return ((self.finished_at or timezone.now()) - self.started_at).total_seconds()
+
+    @classmethod
+    def claim_next(cls) -> "IngestJob | None":
+        """Marks the oldest queued job as running and returns it. Safe with several workers."""
+        from django.utils import timezone
+
+        while job := cls.objects.filter(status=cls.Status.QUEUED).order_by("pk").first():
+            claimed = cls.objects.filter(pk=job.pk, status=cls.Status.QUEUED).update(
+                status=cls.Status.RUNNING, started_at=timezone.now()
+            )
+            if claimed:
+                job.refresh_from_db()
+                return job
+        return None
+
+    def __str__(self):
+        return f"IngestJob({self.pk}-{self.file_name}-{self.status})"
+
+
+class ReportUpload(models.Model):
+    """Ledger of ingested report files, keyed by the sha256 of their content."""
+
+    content_hash = models.CharField(max_length=64, unique=True, help_text="sha256 of the report file")
+    file_name = models.TextField(help_text="Name of the file when it was last ingested")
+    model = models.CharField(choices=ModelChoices.choices, max_length=10)
+    rows = models.IntegerField(default=0)
+    inserted = models.IntegerField(default=0)
+    conflicts = models.IntegerField(default=0, help_text="Rows that were already stored")
+    times_skipped = models.IntegerField(default=0, help_text="Re-uploads that were skipped")
+    created_at = models.DateTimeField(auto_now_add=True)
+    ingested_at = models.DateTimeField(help_text="When the content was last ingested")
+
+    class Meta:
+        db_table = "report_uploads"
+        ordering = ["-ingested_at"]
+
+    def __str__(self):
+        return f"ReportUpload({self.pk}-{self.file_name})"
+
+
+class RejectedRow(models.Model):
+    """A report row that failed validation while the report was ingested in tolerant mode."""
+
+    rejects_id = models.UUIDField(db_index=True, help_text="Shared by the rejected rows of one report")
+    model = models.CharField(choices=ModelChoices.choices, max_length=10)
+    line = models.IntegerField(help_text="Line of the row in the report, the header being line 1")
+    row = models.TextField(help_text="The row as it appeared in the report")
+    error = models.TextField()
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        db_table = "rejected_rows"
+        ordering = ["rejects_id", "line"]
+
+    def __str__(self):
+        return f"RejectedRow({self.rejects_id}-{self.line})"
+
+
+class WatchedReport(models.Model):
+    """Checkpoint of a report file picked up by the `watch_reports` command.
+
+    A file is identified by its source and name; its size and modification time tell whether it changed
+    since it was last seen, in which case it is ingested again.
+    """
+
+    class Status(models.TextChoices):
+        DONE = ("done", "Done")
+        FAILED = ("failed", "Failed")
+
+    source = models.TextField(help_text="Watched directory or storage alias")
+    name = models.TextField(help_text="Name of the file within the source")
+    size = models.BigIntegerField()
+    modified_at = models.DateTimeField()
+    status = models.CharField(choices=Status.choices, max_length=10)
+    rows = models.IntegerField(default=0)
+    inserted = models.IntegerField(default=0)
+    error = models.TextField(blank=True, default="")
+    processed_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        db_table = "watched_reports"
+        ordering = ["source", "name"]
+        constraints = (models.UniqueConstraint(fields=["source", "name"], name="unique_watched_report"),)
+
+    def __str__(self):
+        return f"WatchedReport({self.source}:{self.name}-{self.status})"
+
+
+class DataWatermark(models.Model):
+    """Version of a part of the data the API serves, bumped whenever that part changes.
+
+    There is a watermark per record model (tf2, yolo), bumped by the ingest and by record filter changes,
+    and one for the cameras. The API derives its ETag and Last-Modified headers from them, so a request for
+    unchanged data is answered without querying the data itself.
+    """
+
+    CAMERAS = "cameras"
+    NAMES = [*ModelChoices.values, CAMERAS]
+
+    name = models.CharField(max_length=10, unique=True)
+    version = models.PositiveBigIntegerField(default=0)
+    updated_at = models.DateTimeField()
+
+    class Meta:
+        db_table = "data_watermarks"
+        ordering = ["name"]
+
+    def __str__(self):
+        return f"DataWatermark({self.name}-{self.version})"
+
+    @classmethod
+    def bump(cls, *names: str) -> None:
+        """Moves the watermarks of `names` on, creating the ones that do not exist yet."""
+        from django.utils import timezone
+
+        assert set(names) <= set(cls.NAMES)
+        now = timezone.now()
+        bumped = cls.objects.filter(name__in=names).update(version=models.F("version") + 1, updated_at=now)
+        if bumped < len(names):
+            created = [cls(name=name, version=1, updated_at=now) for name in names]
+            cls.objects.bulk_create(created, ignore_conflicts=True)
+
+    @classmethod
+    def current(cls, names: Iterable[str]) -> tuple[str, datetime | None]:
+        """The version of the data of `names`, e.g. `tf2.12-cameras.3`, and when the latest of them changed."""
+        names = list(names)
+        rows = cls.objects.filter(name__in=names).values_list("name", "version", "updated_at")
+        watermarks = {name: (version, updated_at) for name, version, updated_at in rows}
+        version = "-".join(f"{name}.{watermarks.get(name, (0, None))[0]}" for name in names)
+        return version, max((updated_at for _, updated_at in watermarks.values()), default=None)
+
+
 __all__ = [
+    "CameraCoverage",
     "Cameras",
+    "DailyRollup",
+    "DataWatermark",
+    "HourlyRollup",
+    "IngestJob",
+    "RejectedRow",
+    "ReportUpload",
+    "WatchedReport",
     "TF2Records",
     "YOLORecords",
 ]
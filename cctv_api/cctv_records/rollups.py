@@ -0,0 +1,212 @@
+from collections.abc import Iterable
+from datetime import datetime, time, timedelta
+from datetime import timezone as dt_timezone
+from logging import getLogger
+
+from django.db import connection
+from django.db.models import Count, DateField, DateTimeField, FloatField, Max, Min, QuerySet, Sum
+from django.db.models.functions import Cast, NullIf, Trunc
+from django.utils.dateparse import parse_datetime
+
+from cctv_records.models import (
+    CameraCoverage,
+    DailyRollup,
+    HourlyRollup,
+    RecordCommonFields,
+    RecordsFilter,
+    RecordsRollup,
+)
+
+logger = getLogger(__name__)
+
+
+def model_name_of(db_model: type[RecordCommonFields]) -> str:
+    """tf2 or yolo, for TF2Records or YOLORecords."""
+    return db_model._meta.get_field("model_name").default
+
+
+def _day_start(dt: datetime | str) -> datetime:
+    # records and filters created with ISO strings still hold them after save
+    if isinstance(dt, str):
+        dt = parse_datetime(dt)
+    dt = dt.astimezone(dt_timezone.utc)
+    return datetime.combine(dt.date(), time.min, tzinfo=dt_timezone.utc)
+
+
+def refresh_rollups(
+    model_name: str,
+    camera_ids: Iterable[int] | None = None,
+    start: datetime | None = None,
+    end: datetime | None = None,
+) -> int:
+    """Recomputes the hourly and daily rollups of `model_name`, optionally only for some cameras and a time range.
+
+    The range is widened to whole UTC days. The rollups of the range are deleted and computed again, the
+    hourly ones from the visible records and the daily ones from the hourly ones, so late, overwritten and
+    newly hidden records are all accounted for. Returns the number of hourly rollups written.
+    """
+    db_model = RecordsFilter.record_model(model_name)
+    records = db_model.objects.filter(is_hidden=False)
+    hourly = HourlyRollup.objects.filter(model=model_name)
+    daily = DailyRollup.objects.filter(model=model_name)
+    if camera_ids is not None:
+        camera_ids = list(camera_ids)
+        records = records.filter(camera_id__in=camera_ids)
+        hourly = hourly.filter(camera_id__in=camera_ids)
+        daily = daily.filter(camera_id__in=camera_ids)
+    if start is not None:
+        start = _day_start(start)
+        records = records.filter(timestamp__gte=start)
+        hourly = hourly.filter(bucket__gte=start)
+        daily = daily.filter(bucket__gte=start)
+    if end is not None:
+        end = _day_start(end) + timedelta(days=1)
+        records = records.filter(timestamp__lt=end)
+        hourly = hourly.filter(bucket__lt=end)
+        daily = daily.filter(bucket__lt=end)
+    hourly.delete()
+    daily.delete()
+
+    fields = db_model.count_fields()
+    hourly_rows = (
+        records.order_by()
+        .annotate(start=Trunc("timestamp", "hour", tzinfo=dt_timezone.utc))
+        .values("camera_id", "start")
+        .annotate(
+            n=Count("pk"),
+            **{f"sum_{f}": Sum(f) for f in fields},
+            **{f"count_{f}": Count(f) for f in fields},
+            **{f"min_{f}": Min(f) for f in fields},
+            **{f"max_{f}": Max(f) for f in fields},
+        )
+    )
+    written = _store(HourlyRollup, model_name, fields, hourly_rows)
+
+    daily_rows = (
+        hourly.order_by()
+        .annotate(start=Trunc("bucket", "day", tzinfo=dt_timezone.utc))
+        .values("camera_id", "start")
+        .annotate(
+            n=Sum("records"),
+            **{f"sum_{f}": Sum(f"{f}_sum") for f in fields},
+            **{f"count_{f}": Sum(f"{f}_count") for f in fields},
+            **{f"min_{f}": Min(f"{f}_min") for f in fields},
+            **{f"max_{f}": Max(f"{f}_max") for f in fields},
+        )
+    )
+    _store(DailyRollup, model_name, fields, daily_rows)
+    logger.debug("refreshed %s rollups of %s from %s to %s: %s hours", model_name, camera_ids, start, end, written)
+    return written
+
+
+def _store(rollup_model: type[RecordsRollup], model_name: str, fields: list[str], rows: QuerySet) -> int:
+    """Inserts the aggregated `rows` with a single INSERT ... SELECT, the rows never leaving the database."""
+    quote = connection.ops.quote_name
+    stats = [(f, stat) for f in fields for stat in ("sum", "count", "min", "max")]
+    # the `<stat>_<field>` annotations go in the `<field>_<stat>` columns, named apart to not clash
+    columns = ["camera_id", "model", "bucket", "records", *(f"{f}_{stat}" for f, stat in stats)]
+    selected = [quote("camera_id"), "%s", quote("start"), quote("n"), *(quote(f"{stat}_{f}") for f, stat in stats)]
+    sql, params = rows.query.sql_with_params()
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f"INSERT INTO {quote(rollup_model._meta.db_table)} ({', '.join(map(quote, columns))}) "
+            f"SELECT {', '.join(selected)} FROM ({sql}) rollup_rows",
+            (model_name, *params),
+        )
+        return cursor.rowcount
+
+
+def refresh_coverage(model_name: str, camera_ids: Iterable[int] | None = None) -> int:
+    """Recomputes the CameraCoverage of `model_name`, optionally only for some cameras.
+
+    Ingests move the coverage forward with `update_coverage`; this is for rebuilds and migrations.
+
+    A count, min and max per camera over the (camera, timestamp) index of the records, upserted in one
+    statement; cameras left without records lose their coverage. Returns the number of cameras covered.
+    """
+    records = RecordsFilter.record_model(model_name).objects.all()
+    coverage = CameraCoverage.objects.filter(model=model_name)
+    if camera_ids is not None:
+        camera_ids = list(camera_ids)
+        records = records.filter(camera_id__in=camera_ids)
+        coverage = coverage.filter(camera_id__in=camera_ids)
+    rows = records.order_by().values("camera_id").annotate(n=Count("pk"), first=Min("timestamp"), last=Max("timestamp"))
+    covered = [
+        CameraCoverage(
+            camera_id=row["camera_id"],
+            model=model_name,
+            records=row["n"],
+            first_timestamp=row["first"],
+            last_timestamp=row["last"],
+        )
+        for row in rows
+    ]
+    coverage.exclude(camera_id__in=[c.camera_id for c in covered]).delete()
+    CameraCoverage.objects.bulk_create(
+        covered,
+        update_conflicts=True,
+        unique_fields=["camera", "model"],
+        update_fields=["records", "first_timestamp", "last_timestamp"],
+    )
+    return len(covered)
+
+
+def update_coverage(model_name: str, added: dict[int, tuple[int, datetime, datetime]]) -> None:
+    """Moves the CameraCoverage of `model_name` forward by the records just added to some cameras.
+
+    `added` holds, per camera pk, how many records were inserted and the first and last of the timestamps
+    written; the counts are added and the span widened, without going over the records already stored.
+    """
+    added = {camera_id: coverage for camera_id, coverage in added.items() if coverage[0]}
+    stored = CameraCoverage.objects.filter(model=model_name, camera_id__in=added)
+    current = {c.camera_id: c for c in stored.only("camera_id", "records", "first_timestamp", "last_timestamp")}
+    covered = []
+    for camera_id, (records, first, last) in added.items():
+        if camera_id in current:
+            coverage = current[camera_id]
+            records += coverage.records
+            first, last = min(first, coverage.first_timestamp), max(last, coverage.last_timestamp)
+        covered.append(
+            CameraCoverage(
+                camera_id=camera_id, model=model_name, records=records, first_timestamp=first, last_timestamp=last
+            )
+        )
+    CameraCoverage.objects.bulk_create(
+        covered,
+        update_conflicts=True,
+        unique_fields=["camera", "model"],
+        update_fields=["records", "first_timestamp", "last_timestamp"],
+    )
+
+
+def rollups_for(unit: str) -> type[RecordsRollup]:
+    """The rollups to aggregate buckets of `unit` from: hourly ones for hours, daily ones otherwise."""
+    return HourlyRollup if unit == "hour" else DailyRollup
+
+
+def aggregate_rollups(rollups: QuerySet, unit: str, method: str, field: str) -> QuerySet:
+    """Same as `cctv_records.utils.aggregate_records` over the records of `rollups`, from `rollups_for(unit)`."""
+    output_field = DateTimeField() if unit == "hour" else DateField()
+    value = {
+        "sum": Sum(f"{field}_sum"),
+        "average": Cast(Sum(f"{field}_sum"), FloatField()) / NullIf(Sum(f"{field}_count"), 0),
+        "max": Max(f"{field}_max"),
+        "min": Min(f"{field}_min"),
+    }[method]
+    return (
+        rollups.order_by()
+        .annotate(date=Trunc("bucket", unit, output_field=output_field, tzinfo=dt_timezone.utc))
+        .values("date")
+        .annotate(value=value)
+        .order_by("date")
+    )
+
+
+__all__ = [
+    "aggregate_rollups",
+    "model_name_of",
+    "refresh_coverage",
+    "refresh_rollups",
+    "rollups_for",
+    "update_coverage",
+]
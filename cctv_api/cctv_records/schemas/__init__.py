@@ -1 +1,2 @@
 from .remote import TF2ReportRecord, YOLOReportRecord  # noqa
+from .decoders import DecodedRow, ReportDecoder  # noqa
@@ -0,0 +1,89 @@
+from collections.abc import Callable
+from datetime import datetime
+from logging import getLogger
+from operator import itemgetter
+
+from pydantic import BaseModel
+
+logger = getLogger(__name__)
+
+# (camera_ref, timestamp, *counts, camera_ok) in the order of the decoder's `fields`
+DecodedRow = tuple
+
+
+class ReportDecoder:
+    """Decodes csv rows of a report straight into typed tuples.
+
+    The decoder is compiled once per report from its header: column positions are resolved up front
+    and every row goes through a single closure that casts the counts to int, parses the timestamps
+    with `datetime.fromisoformat` and turns `warnings` into `camera_ok`. Rows the fast path cannot
+    decode (missing values, unusual timestamp formats, ...) are handed to the pydantic schema, so a
+    bad row still fails with the usual ValidationError.
+
+    schema: The pydantic report schema used as fallback.
+    header: The csv header of the report.
+    count_columns: Maps the db count fields to the csv columns they are read from.
+    """
+
+    def __init__(self, schema: type[BaseModel], header: list[str], count_columns: dict[str, str]):
+        self.schema = schema
+        self.header = header
+        self.count_columns = count_columns
+        self.fields = [*count_columns, "camera_ok"]
+        self.fast_rows = 0
+        self.fallback_rows = 0
+        try:
+            self._fast_decode = self._compile()
+        except ValueError:
+            logger.warning("Report header %s has an unexpected layout, using %s for every row", header, schema)
+            self._fast_decode = None
+
+    def _compile(self) -> Callable[[list[str]], DecodedRow]:
+        position = self.header.index
+        n_columns = len(self.header)
+        proc_idx = position("image_proc")
+        capt_idx = position("image_capt")
+        ref_idx = position("camera_ref")
+        position("model_name")  # required by the schema even though it is not stored
+        warnings_idx = position("warnings")
+        counts = itemgetter(*(position(c) for c in self.count_columns.values()))
+        parse_datetime = datetime.fromisoformat
+
+        def decode(row: list[str]) -> DecodedRow:
+            if len(row) != n_columns:
+                raise ValueError("row does not match the header")
+            warnings = row[warnings_idx]
+            parse_datetime(row[proc_idx])
+            return (
+                row[ref_idx].strip().lower(),
+                parse_datetime(row[capt_idx]),
+                *map(int, counts(row)),
+                None if warnings == "None" else not int(warnings),
+            )
+
+        return decode
+
+    def decode(self, row: list[str]) -> DecodedRow:
+        if self._fast_decode is not None:
+            try:
+                decoded = self._fast_decode(row)
+                self.fast_rows += 1
+                return decoded
+            except (ValueError, TypeError, AttributeError):
+                pass
+        self.fallback_rows += 1
+        return self.from_record(self.validate(row))
+
+    def validate(self, row: list[str]) -> BaseModel:
+        """Runs the full pydantic validation of a row."""
+        values = {k: None if v == "None" else v for k, v in zip(self.header, row)}
+        for k in self.header[len(row) :]:
+            values[k] = None
+        return self.schema(**values)
+
+    def from_record(self, record: BaseModel) -> DecodedRow:
+        """Lays a validated report record out the same way as the fast path."""
+        return (record.camera_id, record.image_capt, *(getattr(record, f) for f in self.fields))  # type: ignore
+
+
+__all__ = ["DecodedRow", "ReportDecoder"]
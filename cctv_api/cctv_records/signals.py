@@ -1 +1,42 @@
-# add signals here
+from django.db.models.signals import post_delete, post_save, pre_save
+from django.dispatch import receiver
+
+from cctv_records.models import Cameras, DataWatermark, RecordsFilter
+from cctv_records.rollups import refresh_rollups
+
+
+@receiver(pre_save, sender=RecordsFilter)
+def remember_filter_interval(sender, instance: RecordsFilter, **kwargs):
+    """Keeps the interval an edited filter had, so the records it no longer covers are shown again."""
+    instance._previous = None
+    if instance.pk is not None:
+        stored = sender.objects.filter(pk=instance.pk)
+        instance._previous = stored.values_list("camera_id", "model", "from_datetime", "to_datetime").first()
+
+
+@receiver(post_save, sender=RecordsFilter)
+def hide_filtered_records(sender, instance: RecordsFilter, **kwargs):
+    previous = getattr(instance, "_previous", None)
+    if previous is not None:
+        camera_id, model, from_datetime, to_datetime = previous
+        RecordsFilter.update_visibility(model, [camera_id], from_datetime, to_datetime)
+        refresh_rollups(model, [camera_id], from_datetime, to_datetime)
+        DataWatermark.bump(model)
+    RecordsFilter.update_visibility(instance.model, [instance.camera_id], instance.from_datetime, instance.to_datetime)
+    refresh_rollups(instance.model, [instance.camera_id], instance.from_datetime, instance.to_datetime)
+    DataWatermark.bump(instance.model)
+
+
+@receiver(post_delete, sender=RecordsFilter)
+def show_unfiltered_records(sender, instance: RecordsFilter, **kwargs):
+    # other filters may still cover part of the interval
+    RecordsFilter.update_visibility(instance.model, [instance.camera_id], instance.from_datetime, instance.to_datetime)
+    refresh_rollups(instance.model, [instance.camera_id], instance.from_datetime, instance.to_datetime)
+    DataWatermark.bump(instance.model)
+
+
+@receiver(post_save, sender=Cameras)
+@receiver(post_delete, sender=Cameras)
+def bump_cameras_watermark(sender, instance: Cameras, **kwargs):
+    # cameras created by the ingest are bulk created, without signals, and go with the bump of their records
+    DataWatermark.bump(DataWatermark.CAMERAS)
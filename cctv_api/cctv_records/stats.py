@@ -0,0 +1,139 @@
+import io
+import json
+import sys
+import time
+from collections.abc import Iterator
+from contextlib import contextmanager
+from logging import getLogger
+from typing import IO, TypeVar
+
+try:
+    import resource
+except ImportError:  # not on Windows, where the peak memory is not reported
+    resource = None
+
+logger = getLogger(__name__)
+
+T = TypeVar("T")
+
+
+class IngestStats:
+    """Wall-clock seconds spent in each stage of the ingest of one report.
+
+    decompress: Inflating the gzip/zip stream, measured where the decompressed bytes are read.
+    sniff: Reading the header and finding the report type.
+    parse: csv rows -> decoded rows, without the decompression happening meanwhile.
+    cameras: Resolving camera references to primary keys, creating the unknown cameras.
+    insert: Writing the rows (and rejected rows), without the camera resolution.
+
+    Stages are exclusive: time spent decompressing while parsing only counts as decompression. When a
+    report is decoded in another thread or process the stats of both sides are merged, so the stages can
+    add up to more than `total`, the wall-clock time seen by the writing side.
+    """
+
+    STAGES = ("decompress", "sniff", "parse", "cameras", "insert")
+
+    def __init__(self):
+        self.seconds = dict.fromkeys(self.STAGES, 0.0)
+        self.started = time.perf_counter()
+        self.finished: float | None = None
+        self._nested = 0.0
+
+    @contextmanager
+    def stage(self, name: str) -> Iterator[None]:
+        """Times a block as `name`, leaving out the time of stages timed within it."""
+        nested = self._nested
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            elapsed = time.perf_counter() - started
+            self.seconds[name] += elapsed - (self._nested - nested)
+            self._nested = nested + elapsed
+
+    def timed(self, iterator: Iterator[T], name: str) -> Iterator[T]:
+        """Yields from `iterator`, timing the production of every item as `name`."""
+        iterator = iter(iterator)
+        while True:
+            with self.stage(name):
+                item = next(iterator, StopIteration)
+            if item is StopIteration:
+                return
+            yield item  # type: ignore
+
+    def timed_stream(self, stream: IO[bytes]) -> IO[bytes]:
+        """Wraps a decompressing binary stream so the time spent reading it counts as decompression."""
+        return _TimedReader(stream, self)
+
+    def merge(self, other: "IngestStats") -> "IngestStats":
+        for name, seconds in other.seconds.items():
+            self.seconds[name] += seconds
+        return self
+
+    def finish(self) -> "IngestStats":
+        self.finished = time.perf_counter()
+        return self
+
+    def summary(self, rows: int) -> dict:
+        total = (self.finished or time.perf_counter()) - self.started
+        timings = {name: round(seconds, 4) for name, seconds in self.seconds.items()}
+        timings["write"] = round(self.seconds["cameras"] + self.seconds["insert"], 4)
+        timings["total"] = round(total, 4)
+        return {
+            "timings": timings,
+            "rows_per_second": round(rows / total) if total else None,
+            "process_peak_rss_mb": process_peak_rss_mb(),
+        }
+
+    def log(self, result: dict) -> None:
+        """Logs the outcome of a report as one structured record."""
+        record = {
+            "model": str(result.get("model", "")),
+            "rows": result.get("rows", 0),
+            "inserted": result.get("inserted", 0),
+            "conflicts": result.get("conflicts", 0),
+            "rejected": result.get("rejected", 0),
+            **self.summary(result.get("rows", 0)),
+        }
+        logger.info("ingest_stats %s", json.dumps(record), extra={"ingest_stats": record})
+
+
+def process_peak_rss_mb() -> float | None:
+    """Peak resident memory of this process since it started, in MiB; None where it cannot be read.
+
+    A high-water mark of the whole process, not of one ingest: a report can only raise it, and a worker
+    keeps the peak of the largest report it ingested.
+    """
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # kilobytes on Linux, bytes on macOS
+    return round(peak / (1024 * 1024 if sys.platform == "darwin" else 1024), 1)
+
+
+class _TimedReader(io.BufferedIOBase):
+    def __init__(self, raw: IO[bytes], stats: IngestStats):
+        self.raw = raw
+        self.stats = stats
+
+    def readable(self) -> bool:
+        return True
+
+    def read(self, size: int | None = -1) -> bytes:
+        with self.stats.stage("decompress"):
+            return self.raw.read(size)
+
+    def read1(self, size: int = -1) -> bytes:
+        with self.stats.stage("decompress"):
+            return self.raw.read1(size) if hasattr(self.raw, "read1") else self.raw.read(size)
+
+    def readinto(self, buffer) -> int:
+        with self.stats.stage("decompress"):
+            return self.raw.readinto(buffer)
+
+    def close(self) -> None:
+        self.raw.close()
+        super().close()
+
+
+__all__ = ["IngestStats", "process_peak_rss_mb"]
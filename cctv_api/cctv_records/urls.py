@@ -6,4 +6,5 @@ app_name = "cctv-records"
 
 urlpatterns = [
     path("upload_report", views.upload_report, name="upload-report"),
+    path("upload_report/jobs/<int:pk>", views.ingest_job, name="ingest-job"),
 ]
@@ -1,22 +1,50 @@
 import csv
-import gzip
+import django
+import hashlib
 import io
+import multiprocessing
+import os
+import queue
+import threading
+import uuid
+from collections import Counter, deque
+from concurrent.futures import Future, ProcessPoolExecutor, ThreadPoolExecutor
+from contextlib import contextmanager, nullcontext
+from datetime import datetime
+from datetime import timezone as dt_timezone
+from collections.abc import Callable, Iterable, Iterator
 from enum import Enum
-from itertools import groupby
+from functools import cached_property
+from itertools import chain, groupby, islice
 from logging import getLogger
+from operator import itemgetter
 from pathlib import Path
-from typing import IO, TYPE_CHECKING, Any, Literal
-from zipfile import ZipFile
+from typing import IO, TYPE_CHECKING, Any, Literal, get_args
 
-from django.db.models import Q
+from django.conf import settings
+from django.db import connection, connections, transaction
+from django.db.models import Avg, DateField, DateTimeField, Exists, F, Max, Min, OuterRef, QuerySet, Sum
+from django.db.models.functions import Trunc
+from django.utils import timezone
 from pydantic.error_wrappers import ValidationError
 
+from cctv_records.archives import iter_report_members, open_text, spool
+from cctv_records.bulkload import SQLiteBulkLoader, ingest_pragmas
 from cctv_records.models import (
+    CameraCoverage,
     Cameras,
+    DataWatermark,
+    IngestJob,
+    ModelChoices,
+    RecordsFilter,
+    RejectedRow,
+    ReportUpload,
     TF2Records,
     YOLORecords,
 )
-from cctv_records.schemas import TF2ReportRecord, YOLOReportRecord
+from cctv_records.rollups import refresh_coverage, refresh_rollups, update_coverage
+from cctv_records.schemas import DecodedRow, ReportDecoder, TF2ReportRecord, YOLOReportRecord
+from cctv_records.stats import IngestStats, process_peak_rss_mb
 
 logger = getLogger(__name__)
 
@@ -24,154 +52,1084 @@ if TYPE_CHECKING:
     from django.db.models import Aggregate
 
 
-def zip_open(zip_file: Path | IO[bytes], file_name: str) -> io.TextIOWrapper:
-    """Wrapper function for zipfiles."""
-    with ZipFile(zip_file) as zipfh:
-        logger.info(f"Trying to extract {file_name}.")
-        return io.TextIOWrapper(zipfh.open(file_name), encoding="utf8")
+ReportType = Enum("ReportType", ["TF1", "TF2", "YOLO"])
+
+# Default number of rows handed to the database per insert while streaming a report.
+DEFAULT_BATCH_SIZE = 1000
+# Decoded batches an upload may queue ahead of the database writer.
+INGEST_QUEUE_BATCHES = 4
+# rejected rows listed in the result of a report, all of them are stored as RejectedRow
+REJECTS_IN_RESULT = 20
+# (line number, csv row, error) of a row that failed validation
+RejectedLine = tuple[int, list[str], str]
+
+REPORT_SPECS: dict[ReportType, dict[str, Any]] = {
+    ReportType.TF2: {
+        "model_name": ModelChoices.TF2,
+        "parser": TF2ReportRecord,
+        "db_model": TF2Records,
+        # db field -> report column
+        "count_columns": {
+            "cars": "car",
+            "persons": "person",
+            "bicycles": "bicycle",
+            "trucks": "truck",
+            "motorcycles": "motorcycle",
+            "buses": "bus",
+        },
+    },
+    ReportType.YOLO: {
+        "model_name": ModelChoices.YOLO,
+        "parser": YOLOReportRecord,
+        "db_model": YOLORecords,
+        "count_columns": {
+            "cars": "car",
+            "pedestrians": "pedestrian",
+            "cyclists": "cyclist",
+            "motorcycles": "motorcycle",
+            "buses": "bus",
+            "lorries": "lorry",
+            "vans": "van",
+            "taxis": "taxi",
+        },
+    },
+}
+for _spec in REPORT_SPECS.values():
+    _spec["update_fields"] = [*_spec["count_columns"], "camera_ok"]
+
+
+def discover_report_type(file_handler: IO[str]) -> tuple[ReportType, list[str], Iterator[list[str]]]:
+    """Sniffs the report header and returns its type, the header and a row iterator positioned at the first data row.
+
+    Only the first chunk of the stream is buffered, so the handler does not need to be seekable.
+    """
+    head = file_handler.read(1024)
+    csv.Sniffer().sniff(head)
+    # complete the line the sniffing chunk cut through and carry on from where the stream stands
+    lines = chain(io.StringIO(head + file_handler.readline()), file_handler)
+    csv_reader = csv.reader(lines)
+    try:
+        header = next(csv_reader)
+        first_row = next(csv_reader)
+    except StopIteration:
+        raise ValueError("No data rows found in report file")
+
+    try:
+        model_name = first_row[header.index("model_name")].lower().strip()
+    except (ValueError, IndexError):
+        raise ValueError("Model name column is not present in the report file")
+
+    match model_name:
+        case "yolo":
+            logger.info("is_yolo")
+            report_type = ReportType.YOLO
+        case "tf2":
+            logger.info("is_tf2")
+            report_type = ReportType.TF2
+        case _:
+            raise ValueError(f"Report model_name {model_name} is not supported")
+
+    return report_type, header, chain([first_row], csv_reader)
+
+
+def row_error(e: Exception) -> str:
+    if isinstance(e, ValidationError):
+        return "; ".join(f"{'.'.join(map(str, err['loc']))}: {err['msg']}" for err in e.errors())
+    return str(e) or type(e).__name__
+
+
+def parse_report_rows(
+    rows: Iterable[list[str]], decoder: ReportDecoder, rejects: list[RejectedLine] | None = None
+) -> Iterator[DecodedRow]:
+    """Decodes csv rows one at a time; rows the fast path rejects are validated by the report schema.
+
+    A row that fails validation raises, unless a `rejects` list is given: the row is then appended to it
+    with its line number and error, and decoding carries on with the next row.
+    """
+    for line, row in enumerate(rows, 2):
+        try:
+            yield decoder.decode(row)
+        except ValidationError as e:
+            if rejects is None:
+                errors, model = e.args
+                logger.error("Error parsing report file and trying to load it to model %s", model)
+                raise e
+            rejects.append((line, row, row_error(e)))
+        except (ValueError, TypeError) as e:
+            if rejects is None:
+                raise
+            rejects.append((line, row, row_error(e)))
+
+
+def batched(iterable: Iterable, size: int) -> Iterator[list]:
+    """Yields lists of at most `size` consecutive items."""
+    iterator = iter(iterable)
+    while batch := list(islice(iterator, size)):
+        yield batch
+
+
+class CameraResolver:
+    """Maps report camera references to camera primary keys for the lifetime of one report.
+
+    The known cameras are loaded with a single query; references that are not known yet are created
+    together with one `bulk_create` the first time they are seen.
+    """
+
+    def __init__(self):
+        self.pks: dict[str, int] = dict(Cameras.objects.values_list("camera_id", "pk"))
+        self.created: list[str] = []
+
+    @staticmethod
+    def normalise(camera_ref: str) -> str:
+        # same normalisation Cameras.save applies, which bulk_create skips
+        return camera_ref.lower().replace(" ", "")
+
+    def __getitem__(self, camera_ref: str) -> int:
+        return self.pks[self.normalise(camera_ref)]
+
+    def resolve(self, camera_refs: Iterable[str]) -> dict[str, int]:
+        """Makes sure every reference has a camera and returns the reference to pk map."""
+        missing = {self.normalise(c) for c in camera_refs} - self.pks.keys()
+        if missing:
+            Cameras.objects.bulk_create([Cameras(camera_id=c) for c in sorted(missing)], ignore_conflicts=True)
+            self.pks.update(Cameras.objects.filter(camera_id__in=missing).values_list("camera_id", "pk"))
+            self.created.extend(sorted(missing))
+            logger.warning(f"Created cameras {sorted(missing)}")
+        return self.pks
+
+
+def read_report(
+    file_handler: IO[str],
+    batch_size: int = DEFAULT_BATCH_SIZE,
+    rejects: list[RejectedLine] | None = None,
+    stats: IngestStats | None = None,
+) -> tuple[dict[str, Any], ReportDecoder, Iterator[list[DecodedRow]]]:
+    """Reads the report header and returns the report spec, its decoder and the decoded rows in batches.
+
+    Nothing here touches the database, so reports can be decoded away from the thread that writes them.
+    Invalid rows are collected in `rejects` when it is given, see `parse_report_rows`. Sniffing and
+    parsing are timed in `stats`.
+    """
+    stats = stats or IngestStats()
+    with stats.stage("sniff"):
+        report_type, header, csv_rows = discover_report_type(file_handler)
+    try:
+        spec = REPORT_SPECS[report_type]
+    except KeyError:
+        raise ValueError(f"Report type {report_type} is not supported")
+    decoder = ReportDecoder(spec["parser"], header, spec["count_columns"])
+
+    return spec, decoder, stats.timed(batched(parse_report_rows(csv_rows, decoder, rejects), batch_size), "parse")
+
+
+class ReportWriter:
+    """Writes the decoded rows of one report to its records table.
+
+    Without `overwrite` rows that are already stored are left as they are. With `overwrite` the stored
+    rows of each batch are read back with one range query and compared in memory, and only rows that are
+    new or whose counts differ are written, so re-sending a corrected report costs writes in proportion
+    to what changed. Either way the result tells inserted, updated and unchanged rows apart.
+    """
+
+    def __init__(
+        self,
+        spec: dict[str, Any],
+        overwrite: bool = False,
+        batch_size: int = DEFAULT_BATCH_SIZE,
+        backend: str | None = None,
+        stats: IngestStats | None = None,
+    ):
+        self.model_name = spec["model_name"]
+        self.db_model = spec["db_model"]
+        self.update_fields = spec["update_fields"]
+        self.overwrite = overwrite
+        self.batch_size = batch_size
+        self.cameras = CameraResolver()
+        self.rows = 0
+        self.inserted = 0
+        self.updated = 0
+        self.unchanged = 0
+        self.conflicts = 0
+        self.rejected = 0
+        self.rejects_id: uuid.UUID | None = None
+        self.rejects_sample: list[dict] = []
+        self.touched_cameras: set[int] = set()
+        self.touched_span: tuple[datetime, datetime] | None = None
+        # per camera pk, records inserted and first and last timestamps written, for the coverage
+        self.added: dict[int, tuple[int, datetime, datetime]] = {}
+        # cameras whose inserted records are not known, whose coverage is recomputed
+        self.recount: set[int] = set()
+        self.stats = stats or IngestStats()
+
+        backend = backend or settings.INGEST_BACKEND
+        if backend == "auto":
+            backend = "sqlite" if connection.vendor == "sqlite" else "orm"
+        self.loader = SQLiteBulkLoader(self.db_model, self.update_fields, overwrite) if backend == "sqlite" else None
+
+    @contextmanager
+    def session(self, atomic: bool = True) -> Iterator["ReportWriter"]:
+        """Wraps the writes of one report: ingest PRAGMAs for the SQLite loader, and a transaction."""
+        with ingest_pragmas() if self.loader else nullcontext():
+            with transaction.atomic() if atomic else nullcontext():
+                try:
+                    yield self
+                except BaseException:
+                    # without a transaction the rows written so far stay
+                    if not atomic:
+                        self.publish()
+                    raise
+                # a report aborted with set_rollback, e.g. a failed archive member, has nothing to publish
+                if not (atomic and transaction.get_rollback()):
+                    self.publish()
+
+    def stored_rows(self, rows: list[DecodedRow], *fields: str) -> QuerySet:
+        """Stored `(camera pk, timestamp, *fields)` of the cameras of `rows` over the time span of `rows`.
+
+        A single range query on the (timestamp, camera) unique index; when `rows` hold one camera, as in
+        the grouped in-memory path, it is a range query on that camera alone.
+        """
+        cameras = self.cameras
+        camera_pks = {cameras[r[0]] for r in rows}
+        timestamps = [r[1] for r in rows]
+        stored = self.db_model.objects.filter(timestamp__range=(min(timestamps), max(timestamps)))
+        if len(camera_pks) == 1:
+            stored = stored.filter(camera_id=next(iter(camera_pks)))
+        else:
+            stored = stored.filter(camera_id__in=camera_pks)
+        return stored.values_list("camera_id", "timestamp", *fields)
+
+    def existing_keys(self, rows: list[DecodedRow]) -> set[tuple[int, datetime]]:
+        """Returns the (camera pk, timestamp) keys of `rows` that are already stored."""
+        cameras = self.cameras
+        keys = {(cameras[r[0]], r[1]) for r in rows}
+        return keys.intersection(self.stored_rows(rows))
+
+    @cached_property
+    def stored_spans(self) -> dict[int, tuple[datetime, datetime]]:
+        """First and last timestamps of the records of each camera pk, stored before the report or written since."""
+        coverage = CameraCoverage.objects.filter(model=self.model_name)
+        rows = coverage.values_list("camera_id", "first_timestamp", "last_timestamp")
+        return {camera_pk: (first, last) for camera_pk, first, last in rows}
+
+    def may_be_stored(self, rows: list[DecodedRow]) -> bool:
+        """Whether some of `rows` fall in the span of the records of their camera, so might already be stored."""
+        cameras, spans = self.cameras, self.stored_spans
+        for row in rows:
+            span = spans.get(cameras[row[0]])
+            if span and span[0] <= row[1] <= span[1]:
+                return True
+        return False
+
+    def changed_rows(self, rows: list[DecodedRow]) -> tuple[list[DecodedRow], Counter[int], int]:
+        """Splits off the rows that are new or differ from what is stored.
+
+        Rows repeating a (camera, timestamp) of the batch are superseded by the last of them, as the upsert
+        would do, and count as unchanged. Returns the changed rows, how many of them are new per camera pk,
+        and how many rows are unchanged.
+        """
+        cameras = self.cameras
+        stored = {(r[0], r[1]): r[2:] for r in self.stored_rows(rows, *self.update_fields)}
+        latest = {(cameras[r[0]], r[1]): r for r in rows}
+        changed = []
+        new: Counter[int] = Counter()
+        for (camera_pk, timestamp), row in latest.items():
+            values = stored.get((camera_pk, timestamp))
+            if values is None:
+                new[camera_pk] += 1
+                changed.append(row)
+            elif values != row[2:]:
+                changed.append(row)
+        return changed, new, len(rows) - len(changed)
+
+    @cached_property
+    def filters(self) -> dict[int, list[tuple[datetime, datetime]]]:
+        """The RecordsFilter intervals of the report model, per camera pk."""
+        filters: dict[int, list[tuple[datetime, datetime]]] = {}
+        intervals = RecordsFilter.objects.filter(model=self.model_name)
+        for camera_id, from_datetime, to_datetime in intervals.values_list("camera_id", "from_datetime", "to_datetime"):
+            filters.setdefault(camera_id, []).append((from_datetime, to_datetime))
+        return filters
+
+    def hide_filtered(self, rows: list[DecodedRow]) -> None:
+        """Flags the stored `rows` falling in a RecordsFilter interval as hidden, with one ranged update."""
+        if not self.filters:
+            return
+        cameras = self.cameras
+        start, end = min(r[1] for r in rows), max(r[1] for r in rows)
+        filtered = {
+            camera_pk
+            for camera_pk in {cameras[r[0]] for r in rows}
+            if any(f <= end and t >= start for f, t in self.filters.get(camera_pk, ()))
+        }
+        if filtered:
+            RecordsFilter.update_visibility(self.model_name, filtered, start, end)
+
+    def touch(self, rows: list[DecodedRow], inserted: Counter[int]) -> None:
+        """Notes the cameras and time span of stored rows, whose rollups are refreshed at the end of the session.
+
+        `inserted` is how many of the rows were new per camera pk, which their coverage is moved forward by.
+        """
+        cameras = self.cameras
+        spans: dict[int, tuple[datetime, datetime]] = {}
+        for row in rows:
+            camera_pk, timestamp = cameras[row[0]], row[1]
+            first, last = spans.get(camera_pk, (timestamp, timestamp))
+            spans[camera_pk] = (min(first, timestamp), max(last, timestamp))
+        self.touched_cameras.update(spans)
+        start, end = min(first for first, _ in spans.values()), max(last for _, last in spans.values())
+        if self.touched_span:
+            start, end = min(start, self.touched_span[0]), max(end, self.touched_span[1])
+        self.touched_span = (start, end)
+
+        added = self.added
+        for camera_pk, (first, last) in spans.items():
+            if camera_pk in added:
+                records, added_first, added_last = added[camera_pk]
+                first, last = min(first, added_first), max(last, added_last)
+            else:
+                records = 0
+            added[camera_pk] = (records + inserted[camera_pk], first, last)
+
+    def publish(self) -> None:
+        """Refreshes the rollups and camera coverage of the stored rows and bumps the watermark of the model."""
+        if not self.touched_cameras:
+            return
+        with self.stats.stage("insert"):
+            refresh_rollups(self.model_name, self.touched_cameras, *self.touched_span)
+            update_coverage(self.model_name, {pk: added for pk, added in self.added.items() if pk not in self.recount})
+            if self.recount:
+                refresh_coverage(self.model_name, self.recount)
+            DataWatermark.bump(self.model_name)
+        self.touched_cameras = set()
+        self.touched_span = None
+        self.added = {}
+        self.recount = set()
+
+    def to_db_records(self, rows: Iterable[DecodedRow]) -> list:
+        cameras, db_model, update_fields = self.cameras, self.db_model, self.update_fields
+        return [db_model(camera_id=cameras[r[0]], timestamp=r[1], **dict(zip(update_fields, r[2:]))) for r in rows]
+
+    def write(self, rows: list[DecodedRow]) -> None:
+        cameras = self.cameras
+        with self.stats.stage("cameras"):
+            cameras.resolve(r[0] for r in rows)
+        with self.stats.stage("insert"):
+            self._write(rows)
+
+    def _write(self, rows: list[DecodedRow]) -> None:
+        if self.overwrite:
+            changed, new, unchanged = self.changed_rows(rows)
+            if changed:
+                self._store(changed)
+                self.hide_filtered(changed)
+                self.touch(changed, new)
+            inserted = sum(new.values())
+            updated = len(changed) - inserted
+        else:
+            cameras = self.cameras
+            keys = {(cameras[r[0]], r[1]) for r in rows}
+            # the ORM cannot tell how many rows were ignored, and the loader not of which cameras, so the
+            # stored ones are looked up; with the loader only when the rows fall in what the cameras cover
+            if not self.loader or self.may_be_stored(rows):
+                keys -= self.existing_keys(rows)
+            new = Counter(camera_pk for camera_pk, _ in keys)
+            written = self._store(rows)
+            self.hide_filtered(rows)
+            self.touch(rows, new)
+            if self.loader:
+                if written != len(keys):
+                    # rows stored meanwhile by another ingest
+                    self.recount.update(new)
+                spans = self.stored_spans
+                for camera_pk, (_, first, last) in self.added.items():
+                    span = spans.get(camera_pk, (first, last))
+                    spans[camera_pk] = (min(first, span[0]), max(last, span[1]))
+            inserted = written if written is not None else len(keys)
+            updated, unchanged = 0, len(rows) - inserted
+        self.rows += len(rows)
+        self.inserted += inserted
+        self.updated += updated
+        self.unchanged += unchanged
+        self.conflicts += updated + unchanged
+        logger.debug("prossesing report: %s rows so far", self.rows)
+
+    def _store(self, rows: list[DecodedRow]) -> int | None:
+        """Inserts `rows`, upserting them with `overwrite`; returns the rows written when the backend knows."""
+        if self.loader:
+            cameras = self.cameras
+            return self.loader.write((cameras[r[0]], *r[1:]) for r in rows)
+        # if overwrite is true, it's upsert
+        self.db_model.objects.bulk_create(
+            self.to_db_records(rows),
+            batch_size=self.batch_size,
+            ignore_conflicts=not self.overwrite,
+            update_conflicts=self.overwrite,
+            update_fields=self.update_fields if self.overwrite else None,
+            unique_fields=["timestamp", "camera_id"],  # type: ignore
+        )
+        return None
+
+    def reject(self, rejects: list[RejectedLine] | None) -> None:
+        """Stores rows that failed validation, see `RejectedRow`."""
+        if not rejects:
+            return
+        self.rejects_id = self.rejects_id or uuid.uuid4()
+        buffer = io.StringIO()
+        csv_writer = csv.writer(buffer, lineterminator="")
+        records = []
+        for line, row, error in rejects:
+            buffer.seek(0)
+            buffer.truncate()
+            csv_writer.writerow(row)
+            records.append(
+                RejectedRow(
+                    rejects_id=self.rejects_id, model=self.model_name, line=line, row=buffer.getvalue(), error=error
+                )
+            )
+        with self.stats.stage("insert"):
+            RejectedRow.objects.bulk_create(records, batch_size=self.batch_size)
+        self.rejected += len(rejects)
+        room = REJECTS_IN_RESULT - len(self.rejects_sample)
+        self.rejects_sample.extend({"line": line, "error": error} for line, _, error in rejects[:room])
+        logger.warning("rejected %s rows of the report, see rejects %s", len(rejects), self.rejects_id)
+
+    def result(self) -> dict:
+        result = {
+            "status": "ok",
+            "message": "Report file was processed successfully"
+            if not self.rejected
+            else f"Report file was processed, {self.rejected} invalid rows were rejected",
+            "model": self.model_name,
+            "rows": self.rows,
+            "inserted": self.inserted,
+            "updated": self.updated,
+            "unchanged": self.unchanged,
+            "conflicts": self.conflicts,
+            "accepted": self.rows,
+            "rejected": self.rejected,
+            "new_cameras": len(self.cameras.created),
+            "have_unknown_cameras": Cameras.objects.filter(is_complete=False).exists(),
+            "pks_of_unknown_cameras": list(Cameras.objects.filter(is_complete=False).values_list("pk", flat=True)),
+            **self.stats.summary(self.rows),
+        }
+        if self.rejected:
+            result["rejects_id"] = str(self.rejects_id)
+            result["rejects"] = self.rejects_sample
+        return result
+
+    def finish(self) -> dict:
+        """Stops the clock of the report, logs its stats and returns its result."""
+        self.stats.finish()
+        result = self.result()
+        self.stats.log(result)
+        return result
+
+
+def take_rejects(rejects: list[RejectedLine] | None) -> list[RejectedLine] | None:
+    """The rows rejected so far, leaving `rejects` empty for the decoder to collect the next ones."""
+    if not rejects:
+        return None
+    taken = rejects[:]
+    rejects.clear()
+    return taken
 
 
 def process_uploaded_report(
-    file_handler: io.TextIOWrapper,
+    file_handler: IO[str],
     overwrite: bool = False,
+    streaming: bool = False,
+    batch_size: int = DEFAULT_BATCH_SIZE,
+    atomic: bool = True,
+    progress: Callable[["ReportWriter"], None] | None = None,
+    tolerant: bool = False,
+    stats: IngestStats | None = None,
 ) -> dict:
     """Processes an uploaded report file and adds the data to the database.
 
     file_handler: A file handler to the report file.
+    overwrite: Update the counts of records that already exist instead of skipping them.
+    streaming: Decompress, parse, validate and insert the report in batches of `batch_size` rows,
+        keeping memory flat regardless of the report size. The whole report is written in one
+        transaction so a row that fails validation still leaves the database untouched.
+    atomic: With `streaming`, set to False to commit every batch on its own instead, e.g. so that
+        progress is visible to other connections. A failed report can then be partially written.
+    progress: Called with the writer after every written batch.
+    tolerant: Write the valid rows of a report that has invalid ones instead of failing it. Invalid rows
+        are stored as `RejectedRow` and counted in the result, which lists the first of them.
+    stats: Collects the time spent in each stage, e.g. to include the decompression of the stream. The
+        stage timings, rows/s and peak memory are logged and returned with the result.
     """
 
-    reportType = Enum("report_type", ["TF1", "TF2", "YOLO"])
     logger.info(f"overwrite: {overwrite}")
 
-    # if overwrite is true, it's upsert
-    ignore_conflicts = not overwrite
-    update_conflicts = overwrite
+    rejects: list[RejectedLine] | None = [] if tolerant else None
+    stats = stats or IngestStats()
+    spec, decoder, batches = read_report(file_handler, batch_size, rejects, stats)
+    writer = ReportWriter(spec, overwrite=overwrite, batch_size=batch_size, stats=stats)
 
-    def discover_report_type(file_handler) -> reportType:
-        dialect = csv.Sniffer().sniff(file_handler.read(1024))
-        file_handler.seek(0)
-        spamreader = csv.DictReader(file_handler, dialect=dialect)
-        try:
-            dict_from_csv = dict(next(spamreader))
-            file_handler.seek(0)
-        except StopIteration:
-            raise ValueError("No data rows found in report file")
+    if streaming:
+        with writer.session(atomic=atomic):
+            for batch in batches:
+                writer.write(batch)
+                writer.reject(take_rejects(rejects))
+                if progress:
+                    progress(writer)
+            writer.reject(take_rejects(rejects))
+    else:
+        rows = list(chain.from_iterable(batches))
+        logger.info("prossesing report: %s rows", len(rows))
 
-        try:
-            model_name = dict_from_csv["model_name"].lower().strip()
-        except KeyError:
-            raise ValueError("Model name column is not present in the report file")
-
-        match model_name:
-            case "yolo":
-                logger.info("is_yolo")
-                return reportType.YOLO
-            case "tf2":
-                logger.info("is_tf2")
-                return reportType.TF2
-            case _:
-                raise ValueError(f"Report model_name {model_name} is not supported")
-
-    report_type = discover_report_type(file_handler)
-    csv_reader = csv.DictReader(file_handler)
-    match report_type:
-        case reportType.TF2:
-            csv_line_parser_model = TF2ReportRecord
-            db_model = TF2Records
-            update_fields = [
-                "cars",
-                "persons",
-                "bicycles",
-                "trucks",
-                "motorcycles",
-                "buses",
-                "camera_ok",
-            ]
-        case reportType.YOLO:
-            csv_line_parser_model = YOLOReportRecord
-            db_model = YOLORecords
-            update_fields = [
-                "cars",
-                "pedestrians",
-                "cyclists",
-                "motorcycles",
-                "buses",
-                "lorries",
-                "vans",
-                "taxis",
-                "camera_ok",
-            ]
-        case _:
-            raise ValueError(f"Report type {report_type} is not supported")
+        with stats.stage("cameras"):
+            writer.cameras.resolve(r[0] for r in rows)
+        # sorts by the group_name found in the filename
+        rows.sort(key=itemgetter(0))
+        with writer.session():
+            for _, group_elem_iteretor in groupby(rows, itemgetter(0)):
+                writer.write(list(group_elem_iteretor))
+            writer.reject(rejects)
+    if decoder.fallback_rows:
+        logger.info("prossesing report: %s rows needed full validation", decoder.fallback_rows)
+    return writer.finish()
 
-    parsed_rows = []
-    for row in csv_reader:
-        try:
-            row = {k: None if v == "None" else v for k, v in row.items()}
-            parsed_row = csv_line_parser_model(**row)  # type: ignore
-            parsed_rows.append(parsed_row)
-        except ValidationError as e:
-            errors, model = e.args
-            logger.error("Error parsing report file and trying to load it to model %s", model)
-            raise e
-    len_parsed_rows = len(parsed_rows)
-    logger.info("prossesing report: %s rows", len_parsed_rows)
-
-    # sorts by the group_name found in the filename
-    parsed_rows.sort(key=lambda e: e.camera_id)
-    for camera_id, group_elem_iteretor in groupby(parsed_rows, lambda e: e.camera_id):
-        camera_records = list(map(lambda e: e.to_db_record(camera_id=camera_id), group_elem_iteretor))
-        db_model.objects.bulk_create(
-            camera_records,
-            batch_size=1000,
-            ignore_conflicts=ignore_conflicts,
-            update_conflicts=update_conflicts,
-            update_fields=update_fields if overwrite else None,
-            unique_fields=["timestamp", "camera_id"],  # type: ignore
-        )
-    logger.info("prossesing report: %s rows", len_parsed_rows)
+
+def report_digest(f: IO[bytes]) -> str:
+    """Returns the sha256 of a report file's content, leaving the file at its start."""
+    digest = hashlib.sha256()
+    for chunk in iter(lambda: f.read(1 << 20), b""):
+        digest.update(chunk)
+    f.seek(0)
+    return digest.hexdigest()
+
+
+def already_ingested(content_hash: str, overwrite: bool = False) -> dict | None:
+    """Returns the result of the earlier ingest of the same content, or None if it has to be ingested.
+
+    Content that is in the ledger is only ingested again when `overwrite` is set.
+    """
+    if overwrite:
+        return None
+    upload = ReportUpload.objects.filter(content_hash=content_hash).first()
+    if upload is None:
+        return None
+    ReportUpload.objects.filter(pk=upload.pk).update(times_skipped=F("times_skipped") + 1)
+    logger.info("skipping report %s, it was ingested on %s", upload.file_name, upload.ingested_at)
     return {
         "status": "ok",
-        "message": "Report file was processed successfully",
+        "message": "Report file was already ingested",
+        "skipped": True,
+        "content_hash": content_hash,
+        "model": upload.model,
+        "rows": upload.rows,
+        "inserted": 0,
+        "conflicts": 0,
+        "ingested_at": upload.ingested_at,
+    }
+
+
+def record_ingested(content_hash: str, file_name: str, result: dict) -> dict:
+    """Adds a successfully ingested report to the ledger and returns its result."""
+    ReportUpload.objects.update_or_create(
+        content_hash=content_hash,
+        defaults={
+            "file_name": file_name,
+            "model": result["model"],
+            "rows": result["rows"],
+            "inserted": result["inserted"],
+            "conflicts": result["conflicts"],
+            "ingested_at": timezone.now(),
+        },
+    )
+    result.update(skipped=False, content_hash=content_hash)
+    return result
+
+
+def combine_member_stats(results: list[dict]) -> dict:
+    """Adds up the stage timings of the reports of an archive."""
+    names = results[0]["timings"] if results else ()
+    timings = {name: round(sum(r["timings"][name] for r in results), 4) for name in names}
+    rows, total = sum(r["rows"] for r in results), timings.get("total")
+    return {
+        "timings": timings,
+        "rows_per_second": round(rows / total) if total else None,
+        "process_peak_rss_mb": process_peak_rss_mb(),
+    }
+
+
+def combine_member_results(members: list[tuple[str | None, dict]]) -> dict:
+    """Folds the results of the reports found in one file into the result of the file.
+
+    A gzip file holds a single report whose result is returned as is; the result of a zip archive sums
+    up its members and lists them under `members`.
+    """
+    if len(members) == 1 and members[0][0] is None:
+        return members[0][1]
+
+    succeeded = [r for _, r in members if r["status"] == "ok"]
+    failed = len(members) - len(succeeded)
+    models = {r["model"] for r in succeeded}
+    return {
+        "status": "error" if failed else "ok",
+        "message": f"{failed} of {len(members)} reports in the archive failed"
+        if failed
+        else "Archive was processed successfully",
+        "model": models.pop() if len(models) == 1 else "",
+        "rows": sum(r["rows"] for r in succeeded),
+        "inserted": sum(r["inserted"] for r in succeeded),
+        "updated": sum(r["updated"] for r in succeeded),
+        "unchanged": sum(r["unchanged"] for r in succeeded),
+        "conflicts": sum(r["conflicts"] for r in succeeded),
+        "accepted": sum(r["accepted"] for r in succeeded),
+        "rejected": sum(r["rejected"] for r in succeeded),
+        "new_cameras": sum(r["new_cameras"] for r in succeeded),
+        **combine_member_stats(succeeded),
         "have_unknown_cameras": Cameras.objects.filter(is_complete=False).exists(),
         "pks_of_unknown_cameras": list(Cameras.objects.filter(is_complete=False).values_list("pk", flat=True)),
+        "members": [dict(r, member=member) for member, r in members],
     }
 
 
 def handle_uploaded_report_file(
     f: Any,
     overwrite: bool = False,
+    streaming: bool = False,
+    batch_size: int = DEFAULT_BATCH_SIZE,
+    atomic: bool = True,
+    progress: Callable[["ReportWriter"], None] | None = None,
+    encoding: str = "utf8",
+    tolerant: bool = False,
 ):
+    """Ingests every report in a gzip or zip file, see `process_uploaded_report` for the arguments.
+
+    Each report of an archive is written on its own and a failing one is reported in its member result;
+    a failing gzip report raises as before. The file only enters the ledger when all its reports succeeded.
+    """
     logger.info(f"handle_uploaded_report_file: {f}")
-    content = f.read()
-    first_chnk = content[:12]
-    is_zip = first_chnk.hex().upper().startswith("504B0304")
-    is_gz = first_chnk.hex().upper().startswith("1F8B")
-    if is_zip:
-        logger.info("is_zip")
-        file_handler = zip_open(io.BytesIO(content), "report.csv")
-    elif is_gz:
-        logger.info("is_gz")
-        file_handler = gzip.open(io.BytesIO(content), "rt")
-    else:
-        raise ValueError("File is not a zip or gzip file")
+    file_name = getattr(f, "name", None)
+    file_name = os.path.basename(file_name) if isinstance(file_name, str) else "report"
+    f = spool(f)
+    content_hash = report_digest(f)
+    if skipped := already_ingested(content_hash, overwrite):
+        return skipped
+
+    members = []
+    for member, stream in iter_report_members(f):
+        stats = IngestStats()
+        try:
+            result = process_uploaded_report(
+                open_text(stats.timed_stream(stream), encoding),
+                overwrite=overwrite,
+                streaming=streaming,
+                batch_size=batch_size,
+                atomic=atomic,
+                progress=progress,
+                tolerant=tolerant,
+                stats=stats,
+            )
+        except Exception as e:
+            if member is None:
+                raise
+            logger.exception("Error processing report %s", member)
+            result = {"status": "error", "message": str(e)}
+        members.append((member, result))
+
+    result = combine_member_results(members)
+    if result["status"] == "ok":
+        record_ingested(content_hash, file_name, result)
+    return result
+
+
+def _put_unless_cancelled(q: queue.Queue, item: tuple, cancelled: threading.Event) -> bool:
+    while not cancelled.is_set():
+        try:
+            q.put(item, timeout=0.1)
+            return True
+        except queue.Full:
+            continue
+    return False
+
+
+def _decode_report_into(
+    f: Any,
+    q: queue.Queue,
+    cancelled: threading.Event,
+    batch_size: int,
+    encoding: str = "utf8",
+    tolerant: bool = False,
+) -> None:
+    """Worker side of `handle_uploaded_report_files`: decodes the reports of one upload and queues their batches.
+
+    Messages are ("member", (name, spec)), ("batch", (rows, rows rejected while decoding them)) and
+    ("member_done", (decoding stats, rows rejected after the last batch)) for every report, ("member_error",
+    (name, error)) when a report fails to decode, and finally ("done", None), or ("error", error) when the
+    file itself cannot be read.
+    """
+    try:
+        for member, stream in iter_report_members(f):
+            stats = IngestStats()
+            rejects: list[RejectedLine] | None = [] if tolerant else None
+            try:
+                text = open_text(stats.timed_stream(stream), encoding)
+                spec, _, batches = read_report(text, batch_size, rejects, stats)
+                if not _put_unless_cancelled(q, ("member", (member, spec)), cancelled):
+                    return
+                for batch in batches:
+                    if not _put_unless_cancelled(q, ("batch", (batch, take_rejects(rejects))), cancelled):
+                        return
+            except Exception as e:
+                if not _put_unless_cancelled(q, ("member_error", (member, e)), cancelled):
+                    return
+            else:
+                if not _put_unless_cancelled(q, ("member_done", (stats, rejects)), cancelled):
+                    return
+        _put_unless_cancelled(q, ("done", None), cancelled)
+    except Exception as e:
+        _put_unless_cancelled(q, ("error", e), cancelled)
+
+
+def _write_decoded_reports(q: queue.Queue, overwrite: bool, batch_size: int) -> dict:
+    """Writer side of `handle_uploaded_report_files`: writes the reports of one upload as they are decoded.
+
+    Returns the file result, with the decoding stats merged into the stats of each report.
+    """
+    members: list[tuple[str | None, dict]] = []
+    while True:
+        kind, payload = q.get()
+        if kind == "done":
+            break
+        elif kind == "error":
+            raise payload
+        elif kind == "member_error":
+            member, error = payload
+            if member is None:
+                raise error
+            logger.error("Error processing report %s: %s", member, error)
+            members.append((member, {"status": "error", "message": str(error)}))
+            continue
+
+        member, spec = payload
+        writer = ReportWriter(spec, overwrite=overwrite, batch_size=batch_size)
+        error = None
+        with writer.session():
+            while True:
+                kind, payload = q.get()
+                if kind == "batch":
+                    writer.write(payload[0])
+                    writer.reject(payload[1])
+                elif kind == "member_done":
+                    writer.stats.merge(payload[0])
+                    writer.reject(payload[1])
+                    break
+                elif kind == "member_error" and payload[0] is not None:
+                    # rolls back the rows of this report only
+                    error = payload[1]
+                    transaction.set_rollback(True)
+                    break
+                else:
+                    raise payload[1] if kind == "member_error" else payload
+        if error is not None:
+            logger.error("Error processing report %s: %s", member, error)
+            members.append((member, {"status": "error", "message": str(error)}))
+        else:
+            members.append((member, writer.finish()))
+
+    return combine_member_results(members)
 
-    return process_uploaded_report(file_handler, overwrite=overwrite)
+
+def handle_uploaded_report_files(
+    files: list[Any],
+    overwrite: bool = False,
+    batch_size: int = DEFAULT_BATCH_SIZE,
+    max_workers: int | None = None,
+    tolerant: bool = False,
+) -> list[dict]:
+    """Ingests several uploaded reports, decoding them concurrently and writing them one at a time.
+
+    Every upload is decompressed and decoded in a worker thread that hands its batches over a small
+    bounded queue, so memory stays flat. The calling thread owns the database connection and writes
+    the reports in upload order, each in its own transaction, while the remaining uploads are decoded.
+    A failing report does not stop the others; its result carries the error instead. Reports whose
+    content is already in the ledger are skipped unless `overwrite` is set. With `tolerant`, invalid rows
+    are rejected instead of failing their report, see `process_uploaded_report`.
+
+    Returns one result per file with the file name, and the stage timings of `IngestStats` unless it
+    was skipped. The result of a zip archive lists the results of its reports under `members`.
+    """
+    max_workers = max_workers or settings.INGEST_WORKERS
+    results = []
+    with ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="report-decoder") as pool:
+        jobs = []
+        try:
+            for f in files:
+                content_hash = report_digest(f)
+                q: queue.Queue = queue.Queue(maxsize=INGEST_QUEUE_BATCHES)
+                cancelled = threading.Event()
+                skipped = already_ingested(content_hash, overwrite)
+                if not skipped:
+                    pool.submit(_decode_report_into, f, q, cancelled, batch_size, tolerant=tolerant)
+                jobs.append((f, content_hash, skipped, q, cancelled))
+
+            for f, content_hash, skipped, q, cancelled in jobs:
+                logger.info("processing file: %s", f)
+                if skipped:
+                    results.append(dict(skipped, file=f.name))
+                    continue
+                try:
+                    result = _write_decoded_reports(q, overwrite, batch_size)
+                    if result["status"] == "ok":
+                        record_ingested(content_hash, f.name, result)
+                except Exception as e:
+                    cancelled.set()
+                    logger.exception("Error processing file %s", f)
+                    result = {"status": "error", "message": str(e)}
+                result["file"] = f.name
+                results.append(result)
+        finally:
+            # decoders nobody reads from any more would block on their full queue, and the pool waits for them
+            for *_, cancelled in jobs:
+                cancelled.set()
+    return results
+
+
+class _PicklableErrors:
+    """Wraps the queue a worker process decodes into, sending errors as ValueError with their message.
+
+    Not every exception can be pickled.
+    """
+
+    def __init__(self, q: queue.Queue):
+        self.q = q
+
+    def put(self, item: tuple, timeout: float | None = None) -> None:
+        kind, payload = item
+        if kind == "error":
+            payload = ValueError(str(payload))
+        elif kind == "member_error":
+            payload = (payload[0], ValueError(str(payload[1])))
+        self.q.put((kind, payload), timeout=timeout)
+
+
+def _decode_report_file(
+    path: Path, q: queue.Queue, cancelled: threading.Event, batch_size: int, encoding: str, tolerant: bool
+) -> None:
+    """Process pool side of `ingest_report_paths`: decodes a report file into the messages of `_decode_report_into`.
+
+    `q` and `cancelled` are proxies of a multiprocessing manager: batches reach the writing process as they
+    are decoded, and the decoder waits while `q` is full.
+    """
+    with open(path, "rb") as f:
+        _decode_report_into(f, _PicklableErrors(q), cancelled, batch_size, encoding, tolerant)
+
+
+class _DecodedFile:
+    """The messages of a file decoded by `_decode_report_file`, read as they arrive.
+
+    Raises the error of the worker process should it stop before sending them all, e.g. when it was killed.
+    """
+
+    def __init__(self, q: queue.Queue, future: Future):
+        self.q = q
+        self.future = future
+
+    def get(self) -> tuple:
+        while True:
+            try:
+                return self.q.get(timeout=1)
+            except queue.Empty:
+                if not self.future.done():
+                    continue
+            self.future.result()
+            # every message was sent before the worker returned
+            try:
+                return self.q.get_nowait()
+            except queue.Empty:
+                raise RuntimeError("the report was not decoded to the end") from None
+
+
+def ingest_report_paths(
+    paths: list[Path],
+    overwrite: bool = False,
+    batch_size: int = DEFAULT_BATCH_SIZE,
+    workers: int | None = None,
+    encoding: str = "utf8",
+    tolerant: bool = False,
+) -> Iterator[dict]:
+    """Ingests report files from disk, decoding them in a process pool and writing them from this process.
+
+    Meant for backfills: up to `workers` files (default: one per CPU) are decoded at the same time in
+    worker processes, while this process is the only one writing to the database, one file at a time
+    and in the order of `paths`. Decoded batches are streamed back over bounded queues, so memory stays
+    flat however large the files are: at most twice `workers` files are in flight, each with up to
+    INGEST_QUEUE_BATCHES batches waiting to be written. With a single worker the files are streamed in this
+    process instead. A file with the same content as an earlier one of the run is only written when that
+    one failed, or with `overwrite`.
+
+    Yields the result of each file as it is written, with the file name and, unless the file was skipped,
+    its stage timings. With several workers, decoding happens ahead of writing: the decoding stages are
+    timed in the worker processes and can add up to more than the `total` seen by the writer.
+    """
+    workers = workers or os.cpu_count() or 1
+    if workers == 1:
+        for path in paths:
+            yield _ingest_report_path(path, overwrite, batch_size, encoding, tolerant)
+        return
+
+    in_flight: deque[tuple[Path, str, dict | None, _DecodedFile | None, Any]] = deque()
+
+    def write_next() -> dict:
+        path, content_hash, skipped, decoded, cancelled = in_flight.popleft()
+        if decoded is None and not skipped:
+            # the same content as an earlier file of the run, in the ledger by now unless that one failed
+            return _ingest_report_path(path, overwrite, batch_size, encoding, tolerant)
+        if skipped:
+            return dict(skipped, file=path.name)
+        try:
+            result = _write_decoded_reports(decoded, overwrite, batch_size)
+            if result["status"] == "ok":
+                record_ingested(content_hash, path.name, result)
+        except Exception as e:
+            cancelled.set()
+            logger.exception("Error processing file %s", path)
+            result = {"status": "error", "message": str(e)}
+        result["file"] = path.name
+        return result
+
+    # forked workers must not inherit the database connection of this process
+    connections.close_all()
+    pool = ProcessPoolExecutor(max_workers=workers, initializer=django.setup)
+    with multiprocessing.Manager() as manager, pool:
+        seen: set[str] = set()
+        try:
+            for path in paths:
+                with path.open("rb") as f:
+                    content_hash = report_digest(f)
+                skipped = already_ingested(content_hash, overwrite)
+                decoded = cancelled = None
+                if not skipped and content_hash not in seen:
+                    q, cancelled = manager.Queue(maxsize=INGEST_QUEUE_BATCHES), manager.Event()
+                    future = pool.submit(_decode_report_file, path, q, cancelled, batch_size, encoding, tolerant)
+                    decoded = _DecodedFile(q, future)
+                seen.add(content_hash)
+                in_flight.append((path, content_hash, skipped, decoded, cancelled))
+                while len(in_flight) > 2 * workers:
+                    yield write_next()
+            while in_flight:
+                yield write_next()
+        finally:
+            # decoders nobody reads from any more would block on their full queue, and the pool waits for them
+            for *_, cancelled in in_flight:
+                if cancelled is not None:
+                    cancelled.set()
+
+
+def _ingest_report_path(path: Path, overwrite: bool, batch_size: int, encoding: str, tolerant: bool) -> dict:
+    """Streams a report file from disk in this process, see `ingest_report_paths`."""
+    try:
+        with path.open("rb") as f:
+            result = handle_uploaded_report_file(
+                f,
+                overwrite=overwrite,
+                streaming=True,
+                batch_size=batch_size,
+                encoding=encoding,
+                tolerant=tolerant,
+            )
+    except Exception as e:
+        logger.exception("Error processing file %s", path)
+        result = {"status": "error", "message": str(e)}
+    result["file"] = path.name
+    return result
+
+
+def run_ingest_job(job: IngestJob, batch_size: int = DEFAULT_BATCH_SIZE) -> IngestJob:
+    """Ingests the reports stored with a claimed job, keeping its progress up to date.
+
+    Batches are committed as they are written so the status endpoint can follow the job; re-running a
+    failed job is safe because rows that are already stored are reported as conflicts. Reports that are
+    already in the ledger finish straight away.
+    """
+    progress_by_report: dict[ReportWriter, tuple[int, int, int]] = {}
+
+    def update_progress(writer: ReportWriter) -> None:
+        progress_by_report[writer] = (writer.rows, writer.inserted, writer.conflicts)
+        job.rows_parsed, job.rows_inserted, job.conflicts = map(sum, zip(*progress_by_report.values()))
+        job.save(update_fields=["rows_parsed", "rows_inserted", "conflicts"])
+
+    try:
+        with job.file.open("rb") as f:
+            result = handle_uploaded_report_file(
+                f,
+                overwrite=job.overwrite,
+                streaming=True,
+                batch_size=batch_size,
+                atomic=False,
+                progress=update_progress,
+                tolerant=job.tolerant,
+            )
+        if result.get("skipped"):
+            job.rows_parsed = result["rows"]
+        else:
+            job.rows_rejected = result["rejected"]
+        if result["status"] != "ok":
+            raise ValueError(
+                "; ".join(f"{m['member']}: {m['message']}" for m in result["members"] if m["status"] != "ok")
+            )
+    except Exception as e:
+        logger.exception("Ingest job %s failed", job.pk)
+        job.status = IngestJob.Status.FAILED
+        job.error = str(e)
+    else:
+        job.status = IngestJob.Status.DONE
+        job.file.delete(save=False)
+    job.finished_at = timezone.now()
+    job.save()
+    return job
 
 
 aggregation_time_unitsType = Literal["week", "day", "year", "quarter", "hour", "month"]
 aggregation_methodType = Literal["sum", "average", "max", "min"]
 
+AGGREGATION_UNITS: tuple[aggregation_time_unitsType, ...] = get_args(aggregation_time_unitsType)
+AGGREGATION_METHODS: dict[aggregation_methodType, type["Aggregate"]] = {
+    "sum": Sum,
+    "average": Avg,
+    "max": Max,
+    "min": Min,
+}
+
+
+def aggregate_records(
+    records: QuerySet,
+    unit: aggregation_time_unitsType,
+    method: aggregation_methodType,
+    field: str,
+) -> QuerySet:
+    """Buckets `records` by `unit` of their timestamp and aggregates `field` over each bucket in the database.
+
+    Returns `{"date": start of the bucket (UTC), "value": aggregate}` rows in date order, the start being
+    a date for buckets of a day or longer; buckets without records are left out and records without a
+    count do not count.
+    """
+    assert unit in AGGREGATION_UNITS
+    assert field in records.model.count_fields()
+    output_field = DateTimeField() if unit == "hour" else DateField()
+    return (
+        records.order_by()
+        .annotate(date=Trunc("timestamp", unit, output_field=output_field, tzinfo=dt_timezone.utc))
+        .values("date")
+        .annotate(value=AGGREGATION_METHODS[method](field))
+        .order_by("date")
+    )
+
 
 def get_cameras_that_have_records(
     are_complete: bool = True,
 ):
-    """Get a qs with the cameras that have records. Optionally filter by completeness."""
+    """Get a qs with the cameras that have records. Optionally filter by completeness.
 
-    sub1 = YOLORecords.objects.order_by("camera_id").values("camera_id").distinct().values_list("camera_id")
-    sub2 = TF2Records.objects.order_by("camera_id").values("camera_id").distinct().values_list("camera_id")
+    Looks the cameras up in their CameraCoverage rather than in the records tables.
+    """
 
-    qs = Cameras.objects.filter(Q(id__in=sub1) | Q(id__in=sub2))
+    qs = Cameras.objects.filter(Exists(CameraCoverage.objects.filter(camera=OuterRef("pk"))))
 
     if are_complete:
         qs = qs.filter(is_complete=True)
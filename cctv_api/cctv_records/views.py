@@ -2,12 +2,15 @@ import logging
 
 from django.conf import settings
 from django.http import HttpRequest, JsonResponse
-from django.shortcuts import render
+from django.shortcuts import get_object_or_404, render
+from django.urls import reverse
 from django.views.decorators.csrf import csrf_exempt
+from django.views.decorators.http import require_GET
 from rest_framework import status
 
 from .forms import UploadReportForm
-from .utils import handle_uploaded_report_file
+from .models import Cameras, IngestJob
+from .utils import handle_uploaded_report_files
 
 logger = logging.getLogger("cctv.views")
 
@@ -17,6 +20,7 @@ def upload_report(request: HttpRequest):
     if request.method == "POST":
         pin_number = request.POST.get("pin-code")
         overwrite = request.POST.get("overwrite", False) == "t"
+        tolerant = request.POST.get("tolerant", False) == "t"
         if pin_number != settings.UPLOAD_REPORT_PIN:
             return JsonResponse(
                 status=status.HTTP_401_UNAUTHORIZED,
@@ -24,15 +28,60 @@ def upload_report(request: HttpRequest):
             )
         form = UploadReportForm(request.POST, request.FILES)
         logger.info(request.FILES)
-        r_data = {}
-        for f in request.FILES.values():
-            logger.info("processing file: %s", f)
-            r = handle_uploaded_report_file(f, overwrite=overwrite)
-            r_data.update(r)
+        files = [f for key in request.FILES for f in request.FILES.getlist(key)]
+        if request.POST.get("queue", False) == "t":
+            jobs = [
+                IngestJob.objects.create(file=f, file_name=f.name, overwrite=overwrite, tolerant=tolerant)
+                for f in files
+            ]
+            return JsonResponse(
+                status=status.HTTP_202_ACCEPTED,
+                data={
+                    "status": "queued",
+                    "message": "Report files were queued for ingestion",
+                    "jobs": [job_status(request, job) for job in jobs],
+                },
+            )
+        results = handle_uploaded_report_files(files, overwrite=overwrite, tolerant=tolerant)
+        failed = [r for r in results if r["status"] != "ok"]
         return JsonResponse(
-            status=status.HTTP_200_OK,
-            data=r_data,
+            status=status.HTTP_400_BAD_REQUEST if failed else status.HTTP_200_OK,
+            data={
+                "status": "error" if failed else "ok",
+                "message": f"{len(failed)} of {len(results)} report files failed"
+                if failed
+                else "Report files were processed successfully",
+                "have_unknown_cameras": Cameras.objects.filter(is_complete=False).exists(),
+                "pks_of_unknown_cameras": list(Cameras.objects.filter(is_complete=False).values_list("pk", flat=True)),
+                "files": results,
+            },
         )
 
     form = UploadReportForm()
     return render(request, "upload_report.html", {"form": form})
+
+
+def job_status(request: HttpRequest, job: IngestJob) -> dict:
+    return {
+        "id": job.pk,
+        "file": job.file_name,
+        "status": job.status,
+        "overwrite": job.overwrite,
+        "tolerant": job.tolerant,
+        "rows_parsed": job.rows_parsed,
+        "rows_inserted": job.rows_inserted,
+        "rows_rejected": job.rows_rejected,
+        "conflicts": job.conflicts,
+        "duration": job.duration,
+        "error": job.error,
+        "created_at": job.created_at,
+        "started_at": job.started_at,
+        "finished_at": job.finished_at,
+        "status_url": request.build_absolute_uri(reverse("cctv-records:ingest-job", kwargs={"pk": job.pk})),
+    }
+
+
+@require_GET
+def ingest_job(request: HttpRequest, pk: int):
+    job = get_object_or_404(IngestJob, pk=pk)
+    return JsonResponse(status=status.HTTP_200_OK, data=job_status(request, job))
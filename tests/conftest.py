@@ -1,6 +1,12 @@
 import pytest
 
 
+@pytest.fixture(autouse=True)
+def response_cache(settings, tmp_path):
+    """A response cache of its own for every test, as the data versions of separate tests coincide."""
+    settings.RESPONSE_CACHE_PATH = str(tmp_path / "response_cache.sqlite3")
+
+
 @pytest.fixture()
 def camera_model():
     """Return the Camera model class."""
@@ -52,6 +58,7 @@ def api_client():
 @pytest.fixture
 def provision_db(camera_model, tf2records_model, yolorecords_model):
     """Provision the test database with fake data"""
+    from cctv_records.rollups import refresh_coverage
 
     c_enabled = camera_model.objects.create(
         camera_id="c_enabled",
@@ -75,3 +82,6 @@ def provision_db(camera_model, tf2records_model, yolorecords_model):
                 camera=c,
                 timestamp=f"2024-01-01T12:00:0{i}Z",
             )
+    # records written outside of reports are covered by hand
+    refresh_coverage("tf2")
+    refresh_coverage("yolo")
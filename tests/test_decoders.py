@@ -0,0 +1,53 @@
+import csv
+import gzip
+from pathlib import Path
+
+import pytest
+from pydantic.error_wrappers import ValidationError
+
+TEST_FILES = Path(__file__).parent / "test_mgmt_cmds" / "test_files"
+
+
+def read_report(path):
+    with gzip.open(path, "rt") as stream:
+        rows = list(csv.reader(stream))
+    return rows[0], rows[1:]
+
+
+@pytest.mark.parametrize("report_type", ["TF2", "YOLO"])
+def test_fast_path_matches_pydantic(report_type):
+    from cctv_records.schemas import ReportDecoder
+    from cctv_records.utils import REPORT_SPECS, ReportType
+
+    spec = REPORT_SPECS[ReportType[report_type]]
+    header, rows = read_report(TEST_FILES / f"cctv-report-v2-{report_type.lower()}-20251029.csv.gz")
+    decoder = ReportDecoder(spec["parser"], header, spec["count_columns"])
+
+    for row in rows:
+        assert decoder.decode(row) == decoder.from_record(decoder.validate(row))
+    assert decoder.fast_rows == len(rows)
+    assert decoder.fallback_rows == 0
+
+
+def test_rejected_rows_fall_back_to_pydantic():
+    from cctv_records.schemas import ReportDecoder
+    from cctv_records.utils import REPORT_SPECS, ReportType
+
+    spec = REPORT_SPECS[ReportType.TF2]
+    header, _ = read_report(TEST_FILES / "cctv-report-v2-tf2-20251029.csv.gz")
+    decoder = ReportDecoder(spec["parser"], header, spec["count_columns"])
+
+    # epoch timestamps are only understood by pydantic
+    row = ["1761729789", "1761729027", " A33 ", "tf2", "1", "2", "0", "0", "0", "0", "None"]
+    camera_ref, timestamp, *counts, camera_ok = decoder.decode(row)
+    assert (camera_ref, timestamp.isoformat(), counts, camera_ok) == (
+        "a33",
+        "2025-10-29T09:10:27+00:00",
+        [1, 2, 0, 0, 0, 0],
+        None,
+    )
+    assert decoder.fallback_rows == 1
+
+    with pytest.raises(ValidationError):
+        decoder.decode(["2025-10-29 09:23:09+00:00", "2025-10-29 09:10:27+00:00", "A33", "tf2", "None"])
+    assert decoder.fallback_rows == 2
@@ -0,0 +1,360 @@
+import gzip
+import io
+from pathlib import Path
+
+import pytest
+from pydantic.error_wrappers import ValidationError
+
+TEST_FILES = Path(__file__).parent / "test_mgmt_cmds" / "test_files"
+TF2_REPORT = TEST_FILES / "cctv-report-v2-tf2-20251029.csv.gz"
+YOLO_REPORT = TEST_FILES / "cctv-report-v2-yolo-20251029.csv.gz"
+
+
+class NonSeekableStream(io.TextIOWrapper):
+    """A text stream that can only be read forward, like a socket or a pipe."""
+
+    def seekable(self):
+        return False
+
+    def seek(self, *args, **kwargs):
+        raise io.UnsupportedOperation("seek")
+
+
+@pytest.mark.parametrize("report_path", [TF2_REPORT, YOLO_REPORT])
+@pytest.mark.django_db
+def test_streaming_matches_in_memory_ingest(report_path, tf2records_model, yolorecords_model):
+    from cctv_records.utils import process_uploaded_report
+
+    model = tf2records_model if "tf2" in report_path.name else yolorecords_model
+
+    with gzip.open(report_path, "rt") as stream:
+        result = process_uploaded_report(stream)
+    in_memory = sorted(model.objects.values_list("camera__camera_id", "timestamp", "cars", "camera_ok"))
+    model.objects.all().delete()
+
+    with NonSeekableStream(gzip.open(report_path, "rb")) as stream:
+        streamed_result = process_uploaded_report(stream, streaming=True, batch_size=100)
+    streamed = sorted(model.objects.values_list("camera__camera_id", "timestamp", "cars", "camera_ok"))
+
+    assert streamed_result["rows"] == result["rows"] == 4127
+    assert streamed == in_memory
+
+
+@pytest.mark.django_db
+def test_streaming_ingest_is_all_or_nothing(tf2records_model):
+    from cctv_records.utils import process_uploaded_report
+
+    with gzip.open(TF2_REPORT, "rt") as stream:
+        lines = stream.readlines()
+    lines.append("2025-10-29 09:23:09+00:00,not-a-date,A33,tf2,0,0,0,0,0,0,1\n")
+
+    with pytest.raises(ValidationError):
+        process_uploaded_report(io.StringIO("".join(lines)), streaming=True, batch_size=100)
+    assert tf2records_model.objects.count() == 0
+
+
+@pytest.mark.django_db
+def test_cameras_are_resolved_once_per_report(camera_model, django_assert_max_num_queries):
+    from cctv_records.utils import process_uploaded_report
+
+    camera_model.objects.create(camera_id="a33", label="Known Camera")
+    with gzip.open(TF2_REPORT, "rt") as stream:
+        report_cameras = {line.split(",")[2].lower() for line in list(stream)[1:]}
+
+    with gzip.open(TF2_REPORT, "rt") as stream, django_assert_max_num_queries(100):
+        result = process_uploaded_report(stream, streaming=True, batch_size=1000)
+
+    assert result["new_cameras"] == len(report_cameras) - 1
+    assert set(camera_model.objects.values_list("camera_id", flat=True)) == report_cameras
+    assert camera_model.objects.get(camera_id="a33").label == "Known Camera"
+
+
+@pytest.mark.parametrize("backend", ["orm", "sqlite"])
+@pytest.mark.django_db
+def test_ingest_backends(backend, settings, yolorecords_model):
+    from cctv_records.utils import process_uploaded_report
+
+    settings.INGEST_BACKEND = backend
+    with gzip.open(YOLO_REPORT, "rt") as stream:
+        result = process_uploaded_report(stream, streaming=True)
+    assert (result["inserted"], result["conflicts"]) == (4127, 0)
+    assert yolorecords_model.objects.count() == 4127
+    record = yolorecords_model.objects.get(camera__camera_id="a33", timestamp="2025-10-29T09:10:27Z")
+    assert (record.model_name, record.cars, record.camera_ok) == ("yolo", 0, False)
+
+    yolorecords_model.objects.filter(pk=record.pk).update(cars=99)
+    with gzip.open(YOLO_REPORT, "rt") as stream:
+        result = process_uploaded_report(stream, streaming=True)
+    assert (result["inserted"], result["conflicts"]) == (0, 4127)
+    assert yolorecords_model.objects.get(pk=record.pk).cars == 99
+
+    with gzip.open(YOLO_REPORT, "rt") as stream:
+        result = process_uploaded_report(stream, streaming=True, overwrite=True)
+    assert (result["inserted"], result["conflicts"]) == (0, 4127)
+    assert yolorecords_model.objects.get(pk=record.pk).cars == 0
+    assert yolorecords_model.objects.count() == 4127
+
+
+@pytest.mark.django_db
+def test_ingest_pragmas_are_restored():
+    from django.db import connection
+
+    from cctv_records.bulkload import ingest_pragmas
+
+    def cache_size():
+        with connection.cursor() as cursor:
+            cursor.execute("PRAGMA cache_size")
+            return cursor.fetchone()[0]
+
+    before = cache_size()
+    with ingest_pragmas({"cache_size": -12345}):
+        assert cache_size() == -12345
+    assert cache_size() == before
+
+
+def report_archive(*members):
+    """A zip archive built from `(member name, content)` pairs."""
+    import zipfile
+
+    buffer = io.BytesIO()
+    with zipfile.ZipFile(buffer, "w", zipfile.ZIP_DEFLATED) as archive:
+        for name, content in members:
+            archive.writestr(name, content)
+    buffer.seek(0)
+    return buffer
+
+
+class NonSeekableBytes(io.BufferedReader):
+    def seekable(self):
+        return False
+
+    def seek(self, *args, **kwargs):
+        raise io.UnsupportedOperation("seek")
+
+
+@pytest.mark.django_db
+def test_archive_members_are_ingested(settings, tf2records_model, yolorecords_model):
+    from cctv_records.models import ReportUpload
+    from cctv_records.utils import handle_uploaded_report_file
+
+    settings.INGEST_SPOOL_MEMORY = 1024  # spools the archive to disk
+    archive = report_archive(
+        ("reports/b-yolo.csv.gz", YOLO_REPORT.read_bytes()),
+        ("reports/a-tf2.csv", gzip.decompress(TF2_REPORT.read_bytes())),
+        ("__MACOSX/reports/._a-tf2.csv", b"resource fork"),
+        ("reports/notes.txt", b"not a report"),
+    )
+    result = handle_uploaded_report_file(NonSeekableBytes(io.BytesIO(archive.getvalue())), streaming=True)
+
+    assert result["status"] == "ok"
+    assert [m["member"] for m in result["members"]] == ["reports/a-tf2.csv", "reports/b-yolo.csv.gz"]
+    assert [m["model"] for m in result["members"]] == ["tf2", "yolo"]
+    assert result["rows"] == 2 * 4127
+    assert result["inserted"] == tf2records_model.objects.count() + yolorecords_model.objects.count()
+    assert ReportUpload.objects.get().model == ""
+
+    archive.seek(0)
+    assert handle_uploaded_report_file(archive)["skipped"] is True
+
+
+@pytest.mark.django_db
+def test_failing_archive_member_is_reported(tf2records_model):
+    from cctv_records.models import ReportUpload
+    from cctv_records.utils import handle_uploaded_report_file
+
+    header = gzip.decompress(TF2_REPORT.read_bytes()).split(b"\n", 1)[0]
+    archive = report_archive(
+        ("a.csv.gz", TF2_REPORT.read_bytes()),
+        ("b.csv", header + b"\nbroken,row\n"),
+    )
+    result = handle_uploaded_report_file(archive)
+
+    assert result["status"] == "error"
+    ok, broken = result["members"]
+    assert ok["status"] == "ok" and ok["rows"] == 4127
+    assert broken["member"] == "b.csv" and broken["status"] == "error"
+    assert tf2records_model.objects.count() == ok["inserted"]
+    assert not ReportUpload.objects.exists()
+
+
+@pytest.mark.django_db
+def test_failed_upload_cancels_its_decoders(monkeypatch):
+    import threading
+    import time
+
+    from cctv_records import utils
+
+    # the decoder of the first upload fills its queue while the digest of the second one fails
+    decoders = []
+
+    def decode_report_into(f, q, cancelled, *args, **kwargs):
+        decoders.append(cancelled)
+        decode_report(f, q, cancelled, *args, **kwargs)
+
+    def report_digest(f):
+        if f.name == str(YOLO_REPORT):
+            raise OSError("upload lost")
+        return digest(f)
+
+    decode_report, digest = utils._decode_report_into, utils.report_digest
+    monkeypatch.setattr(utils, "_decode_report_into", decode_report_into)
+    monkeypatch.setattr(utils, "report_digest", report_digest)
+    # unblocks the decoders, should they be left waiting
+    watchdog = threading.Timer(10, lambda: [cancelled.set() for cancelled in decoders])
+    watchdog.start()
+    started = time.monotonic()
+    try:
+        with TF2_REPORT.open("rb") as tf2, YOLO_REPORT.open("rb") as yolo, pytest.raises(OSError, match="upload lost"):
+            utils.handle_uploaded_report_files([tf2, yolo], batch_size=10)
+    finally:
+        watchdog.cancel()
+    assert len(decoders) == 1
+    assert time.monotonic() - started < 5
+
+
+def corrupted_report(report_path):
+    """The report with three invalid rows, returned with the (line, row) of each of them."""
+    lines = gzip.decompress(report_path.read_bytes()).decode().splitlines()
+    bad = {
+        5: lines[4].replace(",tf2,", ",tf2,,,"),  # too many columns
+        10: "2025-10-29 09:23:09+00:00,not a date,A33,tf2,0,0,0,0,0,0,1",
+        100: lines[99].rsplit(",", 2)[0] + ",many,1",  # count is not a number
+    }
+    for line, row in bad.items():
+        lines[line - 1] = row
+    return "\n".join(lines) + "\n", bad
+
+
+@pytest.mark.parametrize("streaming", [True, False])
+@pytest.mark.django_db
+def test_tolerant_ingest_rejects_invalid_rows(streaming, tf2records_model):
+    from cctv_records.models import RejectedRow
+    from cctv_records.utils import process_uploaded_report
+
+    content, bad = corrupted_report(TF2_REPORT)
+    with pytest.raises(ValueError):
+        process_uploaded_report(io.StringIO(content), streaming=streaming)
+    assert not tf2records_model.objects.exists()
+
+    # rejected rows are stored with the batch they were found in, not held until the end of the report
+    stored_rejects = []
+
+    def progress(writer):
+        stored_rejects.append((writer.rows, RejectedRow.objects.count()))
+
+    result = process_uploaded_report(
+        io.StringIO(content), streaming=streaming, batch_size=5, tolerant=True, progress=progress
+    )
+    if streaming:
+        assert stored_rejects[:2] == [(5, 1), (10, 2)]
+    assert result["status"] == "ok"
+    assert (result["accepted"], result["rejected"]) == (4127 - 3, 3)
+    assert [r["line"] for r in result["rejects"]] == sorted(bad)
+    assert "image_capt" in result["rejects"][1]["error"]
+    assert tf2records_model.objects.count() == result["inserted"]
+
+    rejected = RejectedRow.objects.filter(rejects_id=result["rejects_id"])
+    assert {r.line: r.row for r in rejected} == bad
+
+
+@pytest.mark.django_db
+def test_ingest_stats_are_reported_and_logged(caplog):
+    from cctv_records.utils import handle_uploaded_report_file
+
+    with caplog.at_level("INFO", logger="cctv_records.stats"), TF2_REPORT.open("rb") as f:
+        result = handle_uploaded_report_file(f, streaming=True)
+
+    timings = result["timings"]
+    assert set(timings) == {"decompress", "sniff", "parse", "cameras", "insert", "write", "total"}
+    assert all(timings[stage] > 0 for stage in ("decompress", "parse", "cameras", "insert"))
+    assert sum(timings[stage] for stage in ("decompress", "sniff", "parse", "cameras", "insert")) <= timings["total"]
+    assert result["rows_per_second"] > 0
+    assert result["process_peak_rss_mb"] > 0
+
+    (record,) = [r for r in caplog.records if hasattr(r, "ingest_stats")]
+    assert record.ingest_stats["rows"] == 4127
+    assert record.ingest_stats["timings"] == timings
+
+
+def test_process_peak_memory_without_resource(monkeypatch):
+    from cctv_records import stats
+
+    # as on Windows, where the resource module does not exist
+    monkeypatch.setattr(stats, "resource", None)
+    assert stats.IngestStats().summary(0)["process_peak_rss_mb"] is None
+
+
+@pytest.mark.parametrize("backend", ["orm", "sqlite"])
+@pytest.mark.parametrize("streaming", [True, False])
+@pytest.mark.django_db
+def test_overwrite_only_writes_changed_rows(backend, streaming, settings, monkeypatch, tf2records_model):
+    from django.db import connection
+
+    from cctv_records.utils import ReportWriter, process_uploaded_report
+
+    settings.INGEST_BACKEND = backend
+    # only the writes of records are counted, the rollups and the watermark are written apart
+    monkeypatch.setattr(ReportWriter, "publish", lambda self: None)
+    header, *lines = gzip.decompress(TF2_REPORT.read_bytes()).decode().splitlines()
+    process_uploaded_report(io.StringIO("\n".join([header, *lines])), streaming=streaming)
+    stored = tf2records_model.objects.count()
+
+    # a corrected report: 10 rows with other counts and 5 captures that were missing
+    originals = [line for line in lines if ",tf2,0," in line][:10]
+    corrected = [line.replace(",tf2,0,", ",tf2,42,", 1) for line in originals]
+    missing = [f"2025-10-30 0{i}:00:00+00:00,2025-10-30 0{i}:00:00+00:00,A33,tf2,1,2,3,4,5,6,0" for i in range(5)]
+    report = "\n".join([header, *corrected, *missing, *(line for line in lines if line not in set(originals))])
+    with connection.cursor() as cursor:
+        cursor.execute("SELECT total_changes()")
+        changes_before = cursor.fetchone()[0]
+
+    result = process_uploaded_report(io.StringIO(report), overwrite=True, streaming=streaming, batch_size=500)
+
+    with connection.cursor() as cursor:
+        cursor.execute("SELECT total_changes()")
+        assert cursor.fetchone()[0] - changes_before == 15
+    assert (result["inserted"], result["updated"]) == (5, 10)
+    assert result["unchanged"] == result["rows"] - 15
+    assert result["conflicts"] == result["updated"] + result["unchanged"]
+    assert tf2records_model.objects.count() == stored + 5
+    assert tf2records_model.objects.filter(cars=42).count() == 10
+
+
+@pytest.mark.parametrize("backend", ["orm", "sqlite"])
+@pytest.mark.django_db
+def test_overwrite_counts_a_repeated_row_once(backend, settings, tf2records_model):
+    from cctv_records.models import CameraCoverage
+    from cctv_records.utils import process_uploaded_report
+
+    settings.INGEST_BACKEND = backend
+    header, *lines = gzip.decompress(TF2_REPORT.read_bytes()).decode().splitlines()
+    rows = [line for line in lines if ",tf2,0," in line][:50]
+    # the last of the repeated rows wins, as in the upsert
+    repeated = rows[10].replace(",tf2,0,", ",tf2,42,", 1)
+    result = process_uploaded_report(io.StringIO("\n".join([header, *rows, repeated])), overwrite=True)
+
+    assert (result["rows"], result["inserted"], result["updated"], result["unchanged"]) == (51, 50, 0, 1)
+    assert tf2records_model.objects.count() == 50
+    assert tf2records_model.objects.filter(cars=42).count() == 1
+    assert sum(CameraCoverage.objects.filter(model="tf2").values_list("records", flat=True)) == 50
+
+
+@pytest.mark.parametrize("backend", ["orm", "sqlite"])
+@pytest.mark.django_db
+def test_ingest_hides_rows_in_filtered_intervals(
+    backend, settings, camera_model, records_filter_model, tf2records_model
+):
+    from cctv_records.utils import process_uploaded_report
+
+    settings.INGEST_BACKEND = backend
+    camera = camera_model.objects.create(camera_id="a33", label="Known Camera")
+    records_filter_model.objects.create(
+        camera=camera, model="tf2", from_datetime="2025-10-29T00:00:00Z", to_datetime="2025-10-29T12:00:00Z"
+    )
+    with gzip.open(TF2_REPORT, "rt") as stream:
+        process_uploaded_report(stream, streaming=True, batch_size=100)
+
+    hidden = tf2records_model.objects.filter(is_hidden=True)
+    filtered = tf2records_model.objects.filter(camera=camera, timestamp__lte="2025-10-29T12:00:00Z")
+    assert hidden.count() == filtered.count() > 0
+    assert set(hidden) == set(filtered)
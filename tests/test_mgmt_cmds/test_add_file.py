@@ -3,6 +3,8 @@ from django.apps import apps
 from io import StringIO
 
 from django.core.management import call_command
+from django.core.management.base import CommandError
+from pathlib import Path
 
 
 @pytest.mark.parametrize(
@@ -26,3 +28,78 @@ def test_add_csv_file(file_path, model):
 
     call_command("add_csv_file", file_path, stdout=out)
     assert model.objects.count() == total_count
+
+
+@pytest.mark.django_db
+def test_add_csv_file_skips_ingested_content(tmp_path):
+    from cctv_records.models import ReportUpload
+
+    file_path = "tests/test_mgmt_cmds/test_files/cctv-report-v2-tf2-20251029.csv.gz"
+    out = StringIO()
+    call_command("add_csv_file", file_path, stdout=out)
+    upload = ReportUpload.objects.get()
+    assert upload.rows == 4127
+    assert upload.model == "tf2"
+
+    # same content under another name
+    renamed = tmp_path / "renamed.csv.gz"
+    renamed.write_bytes(open(file_path, "rb").read())
+    out = StringIO()
+    call_command("add_csv_file", str(renamed), stdout=out)
+    assert "already ingested" in out.getvalue()
+    upload.refresh_from_db()
+    assert upload.times_skipped == 1
+
+    out = StringIO()
+    call_command("add_csv_file", str(renamed), "--overwrite", stdout=out)
+    assert "imported successfully" in out.getvalue()
+    upload.refresh_from_db()
+    assert upload.file_name == "renamed.csv.gz"
+    assert upload.conflicts == 4127 - upload.inserted
+
+
+@pytest.mark.django_db
+def test_add_csv_file_backfills_directories_in_parallel(tmp_path, tf2records_model, yolorecords_model):
+    import shutil
+    import zipfile
+
+    from cctv_records.models import ReportUpload
+
+    test_files = Path("tests/test_mgmt_cmds/test_files")
+    archive = tmp_path / "2025" / "reports.zip"
+    archive.parent.mkdir()
+    with zipfile.ZipFile(archive, "w") as zf:
+        zf.write(test_files / "cctv-report-v2-yolo-20251029.csv.gz", "cctv-report-v2-yolo-20251029.csv.gz")
+    shutil.copy(test_files / "cctv-report-v2-tf2-20251029.csv.gz", tmp_path)
+    (tmp_path / "cctv-report-v2-tf2-20251030.csv.gz").write_bytes(b"not a report")
+
+    out, err = StringIO(), StringIO()
+    with pytest.raises(CommandError, match="1 of 3 files failed"):
+        call_command("add_csv_file", str(tmp_path), "--workers", "2", stdout=out, stderr=err)
+    assert "[1/3] reports.zip: 4127 rows" in out.getvalue()
+    assert "rows/s" in out.getvalue()
+    assert "cctv-report-v2-tf2-20251030.csv.gz" in err.getvalue()
+    assert tf2records_model.objects.exists() and yolorecords_model.objects.exists()
+    assert ReportUpload.objects.count() == 2
+
+    out = StringIO()
+    call_command("add_csv_file", str(tmp_path / "*" / "*.zip"), str(tmp_path / "*tf2-20251029*"), stdout=out)
+    assert out.getvalue().count("already ingested") == 2
+
+
+@pytest.mark.django_db
+def test_add_csv_file_ingests_repeated_content_once(tmp_path, tf2records_model):
+    import shutil
+
+    from cctv_records.models import ReportUpload
+
+    report = Path("tests/test_mgmt_cmds/test_files/cctv-report-v2-tf2-20251029.csv.gz")
+    shutil.copy(report, tmp_path / "a.csv.gz")
+    shutil.copy(report, tmp_path / "b.csv.gz")
+
+    out = StringIO()
+    call_command("add_csv_file", str(tmp_path), "--workers", "2", stdout=out)
+    assert "[1/2] a.csv.gz: 4127 rows, 4127 inserted" in out.getvalue()
+    assert "[2/2] b.csv.gz: file was already ingested" in out.getvalue()
+    assert tf2records_model.objects.count() == 4127
+    assert ReportUpload.objects.get().times_skipped == 1
@@ -0,0 +1,25 @@
+import pendulum
+import pytest
+from django.core.management import call_command
+
+
+@pytest.mark.django_db
+def test_rebuild_rollups_command(camera_model, tf2records_model, yolorecords_model):
+    from cctv_records.models import DailyRollup, HourlyRollup
+
+    camera = camera_model.create_camera(camera_id="q-11", longitude=0, latitude=0)
+    # records written outside of reports have no rollups until they are rebuilt
+    for hour in range(4):
+        timestamp = pendulum.datetime(2023, 1, 1, hour)
+        tf2records_model.objects.create(camera=camera, timestamp=timestamp, cars=hour)
+        yolorecords_model.objects.create(camera=camera, timestamp=timestamp)
+    assert not HourlyRollup.objects.exists()
+
+    call_command("rebuild_rollups", "--model", "tf2")
+    assert list(HourlyRollup.objects.values_list("model", "cars_sum")) == [("tf2", hour) for hour in range(4)]
+    assert list(DailyRollup.objects.values_list("model", "records", "cars_sum", "cars_max")) == [("tf2", 4, 6, 3)]
+
+    tf2records_model.objects.filter(timestamp__hour=3).delete()
+    call_command("rebuild_rollups")
+    assert DailyRollup.objects.get(model="tf2").cars_sum == 3
+    assert DailyRollup.objects.get(model="yolo").records == 4
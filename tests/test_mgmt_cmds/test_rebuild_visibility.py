@@ -0,0 +1,32 @@
+import pendulum
+import pytest
+from django.core.management import call_command
+
+
+@pytest.mark.django_db
+def test_rebuild_visibility_command(camera_model, tf2records_model, yolorecords_model, records_filter_model):
+    camera = camera_model.create_camera(camera_id="q-11", longitude=0, latitude=0)
+    for hour in range(4):
+        timestamp = pendulum.datetime(2023, 1, 1, hour)
+        tf2records_model.objects.create(camera=camera, timestamp=timestamp)
+        yolorecords_model.objects.create(camera=camera, timestamp=timestamp)
+    # bulk_create and queryset updates send no signals, leaving the flag out of date
+    records_filter_model.objects.bulk_create(
+        [
+            records_filter_model(
+                camera=camera,
+                model="tf2",
+                from_datetime=pendulum.datetime(2023, 1, 1, 1),
+                to_datetime=pendulum.datetime(2023, 1, 1, 2),
+            )
+        ]
+    )
+    yolorecords_model.objects.update(is_hidden=True)
+
+    call_command("rebuild_visibility", "--model", "tf2")
+    assert tf2records_model.objects.filter(is_hidden=True).count() == 2
+    assert yolorecords_model.objects.filter(is_hidden=True).count() == 4
+
+    call_command("rebuild_visibility")
+    assert tf2records_model.objects.filter(is_hidden=True).count() == 2
+    assert yolorecords_model.objects.filter(is_hidden=True).count() == 0
@@ -0,0 +1,25 @@
+import io
+
+import pytest
+from django.core.management import CommandError, call_command
+
+
+def test_response_cache_command(settings):
+    from cctv_api.cache import get_response_cache
+
+    cache = get_response_cache()
+    cache.set("a", b"{}")
+    cache.get("a")
+    cache.get("b")
+
+    stdout = io.StringIO()
+    call_command("response_cache", stdout=stdout)
+    assert "1 responses" in stdout.getvalue()
+    assert "1 hits, 1 misses (50.0% hit rate), 0 evictions" in stdout.getvalue()
+
+    call_command("response_cache", "--clear", stdout=io.StringIO())
+    assert cache.stats()["entries"] == 0
+
+    settings.RESPONSE_CACHE_PATH = ""
+    with pytest.raises(CommandError):
+        call_command("response_cache")
@@ -0,0 +1,61 @@
+import os
+import shutil
+from io import StringIO
+from pathlib import Path
+
+import pytest
+from django.core.management import call_command
+
+TEST_FILES = Path(__file__).parent / "test_files"
+
+
+def watch(directory, *args):
+    out, err = StringIO(), StringIO()
+    call_command("watch_reports", str(directory), "--once", "--settle", "0", *args, stdout=out, stderr=err)
+    return out.getvalue(), err.getvalue()
+
+
+@pytest.mark.django_db
+def test_watch_reports_checkpoints_ingested_files(tmp_path, tf2records_model, yolorecords_model):
+    from cctv_records.models import WatchedReport
+
+    shutil.copy(TEST_FILES / "cctv-report-v2-yolo-20251029.csv.gz", tmp_path)
+    shutil.copy(TEST_FILES / "cctv-report-v2-tf2-20251029.csv.gz", tmp_path)
+    (tmp_path / "notes.txt").write_text("not a report")
+
+    out, _ = watch(tmp_path)
+    # in name order
+    assert out.index("cctv-report-v2-tf2") < out.index("cctv-report-v2-yolo")
+    assert list(WatchedReport.objects.values_list("name", "status", "rows")) == [
+        ("cctv-report-v2-tf2-20251029.csv.gz", "done", 4127),
+        ("cctv-report-v2-yolo-20251029.csv.gz", "done", 4127),
+    ]
+    counts = tf2records_model.objects.count(), yolorecords_model.objects.count()
+
+    # a restart only picks up new files
+    out, _ = watch(tmp_path)
+    assert "Ingesting" not in out
+
+    broken = tmp_path / "cctv-report-v2-tf2-20251030.csv.gz"
+    broken.write_bytes(b"not a report")
+    out, err = watch(tmp_path)
+    assert out.count("Ingesting") == 1
+    assert "cctv-report-v2-tf2-20251030.csv.gz" in err
+    assert WatchedReport.objects.get(name=broken.name).status == "failed"
+    assert (tf2records_model.objects.count(), yolorecords_model.objects.count()) == counts
+
+    # failed files are retried once they change
+    out, _ = watch(tmp_path)
+    assert "Ingesting" not in out
+    shutil.copy(TEST_FILES / "cctv-report-v2-tf2-20251029.csv.gz", broken)
+    os.utime(broken, (1, 1))
+    out, _ = watch(tmp_path)
+    assert "already ingested" in out
+    assert WatchedReport.objects.get(name=broken.name).status == "done"
+
+
+@pytest.mark.django_db
+def test_watch_reports_waits_for_files_to_settle(tmp_path):
+    shutil.copy(TEST_FILES / "cctv-report-v2-tf2-20251029.csv.gz", tmp_path)
+    out, _ = watch(tmp_path, "--settle", "3600")
+    assert "Ingesting" not in out
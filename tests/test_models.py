@@ -44,7 +44,58 @@ def test_get_cameras_that_have_records(camera_model, tf2records_model, yolorecor
     yolorecords_model.objects.create(camera=cam1, timestamp=dt_from_isostring("2023-01-02T00:00:00Z"))
     assert camera_model.objects.count() == 2
 
+    from cctv_records.rollups import refresh_coverage
     from cctv_records.utils import get_cameras_that_have_records
 
+    # records written outside of reports are covered by hand
+    refresh_coverage("tf2")
+    refresh_coverage("yolo")
     cams = get_cameras_that_have_records()
     assert cams.count() == 1
+
+
+@pytest.mark.django_db
+def test_record_filters_maintain_is_hidden(camera_model, tf2records_model, records_filter_model):
+    camera = camera_model.create_camera(camera_id="q-11", longitude=0, latitude=0)
+    other = camera_model.create_camera(camera_id="q-12", longitude=0, latitude=0)
+    for day in range(1, 8):
+        for cam in (camera, other):
+            tf2records_model.objects.create(camera=cam, timestamp=dt_from_isostring(f"2023-01-0{day}T00:00:00Z"))
+
+    def hidden_days():
+        hidden = tf2records_model.objects.filter(is_hidden=True)
+        assert not hidden.exclude(camera=camera).exists()
+        return sorted(t.day for t in hidden.values_list("timestamp", flat=True))
+
+    first = records_filter_model.objects.create(
+        camera=camera,
+        model="tf2",
+        from_datetime=dt_from_isostring("2023-01-02T00:00:00Z"),
+        to_datetime=dt_from_isostring("2023-01-04T00:00:00Z"),
+    )
+    second = records_filter_model.objects.create(
+        camera=camera,
+        model="tf2",
+        from_datetime=dt_from_isostring("2023-01-04T00:00:00Z"),
+        to_datetime=dt_from_isostring("2023-01-05T00:00:00Z"),
+    )
+    # filters of another model do not hide tf2 records
+    records_filter_model.objects.create(
+        camera=camera,
+        model="yolo",
+        from_datetime=dt_from_isostring("2023-01-01T00:00:00Z"),
+        to_datetime=dt_from_isostring("2023-01-07T00:00:00Z"),
+    )
+    assert hidden_days() == [2, 3, 4, 5]
+
+    # the overlapping filter keeps the 4th hidden
+    first.delete()
+    assert hidden_days() == [4, 5]
+
+    second.from_datetime = dt_from_isostring("2023-01-06T00:00:00Z")
+    second.to_datetime = dt_from_isostring("2023-01-07T00:00:00Z")
+    second.save()
+    assert hidden_days() == [6, 7]
+
+    second.delete()
+    assert hidden_days() == []
@@ -0,0 +1,83 @@
+"""EXPLAIN QUERY PLAN of the records endpoints for every combination of their filters.
+
+Fails when a plan reads a records table row by row (`SCAN tf2_records` without an index), or, once the
+query is filtered, scans the whole of one of its indexes (`SCAN tf2_records USING INDEX ...`) instead of
+searching it. A query or index change that brings back full scans is caught before it reaches a table of
+millions of rows.
+"""
+
+import itertools
+import re
+
+import pytest
+from django.db import connection
+from django.test import Client
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+FILTERS = {
+    "camera_id": None,  # the pk of c_enabled, see provision_db
+    "date_after": "2024-01-01",
+    "date_before": "2024-01-02",
+    "camera_ok": "true",
+}
+# the columns of the filters
+COLUMNS = {"camera_id": "camera_id", "date_after": "timestamp", "date_before": "timestamp", "camera_ok": "camera_ok"}
+PAGINATION = [{}, {"pagination": "cursor", "page_size": 2}]
+SCAN = re.compile(r"^SCAN (tf2|yolo)_records(?: USING (?:COVERING )?INDEX (\w+))?$")
+
+
+def filter_combinations():
+    for n in range(len(FILTERS) + 1):
+        yield from itertools.combinations(FILTERS, n)
+
+
+def query_plans(sql: str) -> list[str]:
+    with connection.cursor() as cursor:
+        cursor.execute(f"EXPLAIN QUERY PLAN {sql}")
+        return [row[3] for row in cursor.fetchall()]
+
+
+def index_condition(name: str) -> str:
+    """The WHERE clause of a partial index, empty for a full one."""
+    with connection.cursor() as cursor:
+        cursor.execute("SELECT sql FROM sqlite_master WHERE type = 'index' AND name = %s", [name])
+        sql = cursor.fetchone()[0]
+    return sql.partition(" WHERE ")[2]
+
+
+def full_scan(plan: str, filters: tuple[str, ...]) -> bool:
+    """Whether `plan` reads the whole table, or with `filters` the whole of an index that is not limited to them."""
+    scan = SCAN.match(plan)
+    if not scan:
+        return False
+    if not scan[2]:
+        return True
+    # an index partial on a filter holds just the rows it selects
+    return bool(filters) and not any(f'"{COLUMNS[name]}"' in index_condition(scan[2]) for name in filters)
+
+
+@pytest.mark.skipif(connection.vendor != "sqlite", reason="EXPLAIN QUERY PLAN is SQLite syntax")
+@pytest.mark.parametrize("pagination", PAGINATION, ids=["page", "cursor"])
+@pytest.mark.parametrize("filters", list(filter_combinations()), ids="+".join)
+@pytest.mark.parametrize("model", ["tf2", "yolo"])
+@pytest.mark.django_db
+def test_records_queries_use_indexes(model, filters, pagination, provision_db, camera_model):
+    params = {name: FILTERS[name] for name in filters} | pagination
+    if "camera_id" in params:
+        params["camera_id"] = camera_model.objects.get(camera_id="c_enabled").pk
+
+    client = Client()
+    url = reverse(f"cctv-api:{model}:records-list")
+    with CaptureQueriesContext(connection) as queries:
+        response = client.get(url, params)
+        assert response.status_code == 200
+        # the following page, with the seek predicate of the cursor
+        if response.json()["next"]:
+            assert client.get(response.json()["next"]).status_code == 200
+
+    explained = [q["sql"] for q in queries if f"{model}_records" in q["sql"]]
+    assert explained
+    for sql in explained:
+        plans = query_plans(sql)
+        assert not any(full_scan(plan, filters) for plan in plans), f"{sql}\n" + "\n".join(plans)
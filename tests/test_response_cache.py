@@ -0,0 +1,77 @@
+import pytest
+
+
+@pytest.fixture
+def cache(tmp_path):
+    from cctv_api.cache import ResponseCache
+
+    return ResponseCache(tmp_path / "cache" / "responses.sqlite3", max_bytes=100)
+
+
+def test_response_cache_evicts_least_recently_used(cache, monkeypatch):
+    from types import SimpleNamespace
+
+    clock = iter(range(100))
+    monkeypatch.setattr("cctv_api.cache.time", SimpleNamespace(time=lambda: next(clock) * 10))
+
+    assert cache.get("a") is None
+    cache.set("a", b"a" * 40)
+    cache.set("b", b"b" * 40)
+    assert cache.get("a") == b"a" * 40
+    # b is the least recently used
+    cache.set("c", b"c" * 40)
+    assert cache.get("b") is None
+    assert cache.get("c") == b"c" * 40
+    # too large to be cached at all
+    cache.set("d", b"d" * 101)
+    assert cache.get("d") is None
+
+    assert cache.stats() == {
+        "hits": 2,
+        "misses": 3,
+        "evictions": 1,
+        "bytes": 80,
+        "entries": 2,
+        "hit_rate": 0.4,
+    }
+    cache.clear()
+    assert cache.get("a") is None
+    assert cache.stats()["bytes"] == 0
+
+
+def test_response_cache_survives_a_locked_file(cache, caplog):
+    import sqlite3
+    import time
+
+    cache.set("a", b"a" * 40)
+    # another worker holding the write lock
+    other = sqlite3.connect(cache.path, isolation_level=None)
+    other.execute("BEGIN IMMEDIATE")
+    started = time.monotonic()
+    assert cache.get("a") == b"a" * 40
+    assert cache.get("b") is None
+    cache.set("b", b"b" * 40)
+    assert cache.stats()["hits"] == 1
+    assert time.monotonic() - started < 1
+    assert "response cache store failed" in caplog.text
+
+    other.rollback()
+    # the counts of the lookups made while it was locked are written once it is free
+    assert cache.stats()["entries"] == 1
+    assert dict(cache.connection.execute("SELECT name, value FROM counters")) == {
+        "hits": 1,
+        "misses": 1,
+        "evictions": 0,
+        "bytes": 40,
+    }
+    assert cache.get("b") is None
+
+
+def test_response_cache_key_normalises_the_query():
+    from cctv_api.cache import response_cache_key
+
+    key = response_cache_key("http://testserver/yolo/records/", {"page": ["1"], "camera_id": ["3", "1"]}, "json", "v1")
+    same = {"camera_id": ["1", "3"], "date_after": [""], "page": ["1"]}
+    assert response_cache_key("http://testserver/yolo/records/", same, "json", "v1") == key
+    assert response_cache_key("http://testserver/yolo/records/", same, "json", "v2") != key
+    assert response_cache_key("http://testserver/tf2/records/", same, "json", "v1") != key
@@ -0,0 +1,113 @@
+import gzip
+import io
+from pathlib import Path
+
+import pytest
+
+TF2_REPORT = Path(__file__).parent / "test_mgmt_cmds" / "test_files" / "cctv-report-v2-tf2-20251029.csv.gz"
+
+
+def series_from_records(unit, method, field):
+    from cctv_records.models import TF2Records
+    from cctv_records.utils import aggregate_records
+
+    return list(aggregate_records(TF2Records.objects.filter(is_hidden=False), unit, method, field))
+
+
+def series_from_rollups(unit, method, field):
+    from cctv_records.rollups import aggregate_rollups, rollups_for
+
+    return list(aggregate_rollups(rollups_for(unit).objects.filter(model="tf2"), unit, method, field))
+
+
+def assert_rollups_match_records():
+    from cctv_records.utils import AGGREGATION_METHODS, AGGREGATION_UNITS
+
+    for unit in AGGREGATION_UNITS:
+        for method in AGGREGATION_METHODS:
+            for field in ["cars", "persons"]:
+                expected = series_from_records(unit, method, field)
+                assert series_from_rollups(unit, method, field) == [
+                    {**row, "value": pytest.approx(row["value"])} for row in expected
+                ], (unit, method, field)
+
+
+@pytest.mark.parametrize("backend", ["orm", "sqlite"])
+@pytest.mark.django_db
+def test_ingest_maintains_rollups(backend, settings, tf2records_model):
+    from cctv_records.models import DailyRollup, HourlyRollup
+    from cctv_records.utils import process_uploaded_report
+
+    settings.INGEST_BACKEND = backend
+    header, *lines = gzip.decompress(TF2_REPORT.read_bytes()).decode().splitlines()
+    process_uploaded_report(io.StringIO("\n".join([header, *lines])), streaming=True, batch_size=500)
+    assert HourlyRollup.objects.filter(model="tf2").exists()
+    assert_rollups_match_records()
+
+    # a corrected report, with other counts and late captures of the next day
+    corrected = [line.replace(",tf2,0,", ",tf2,42,", 1) for line in lines if ",tf2,0," in line][:10]
+    late = [f"2025-10-30 0{i}:00:00+00:00,2025-10-30 0{i}:00:00+00:00,A33,tf2,1,2,3,4,5,6,0" for i in range(5)]
+    process_uploaded_report(io.StringIO("\n".join([header, *corrected, *late])), overwrite=True)
+    assert DailyRollup.objects.filter(model="tf2", bucket="2025-10-30T00:00:00Z").get().records == 5
+    assert_rollups_match_records()
+
+
+@pytest.mark.django_db
+def test_filters_refresh_rollups(camera_model, records_filter_model, tf2records_model):
+    from cctv_records.models import DailyRollup
+    from cctv_records.utils import process_uploaded_report
+
+    with gzip.open(TF2_REPORT, "rt") as stream:
+        process_uploaded_report(stream)
+    camera = camera_model.objects.get(camera_id="A33")
+    rollup = DailyRollup.objects.filter(camera=camera, model="tf2")
+    records_before = rollup.get().records
+
+    records_filter = records_filter_model.objects.create(
+        camera=camera, model="tf2", from_datetime="2025-10-29T00:00:00Z", to_datetime="2025-10-29T12:00:00Z"
+    )
+    assert rollup.get().records == records_before - tf2records_model.objects.filter(is_hidden=True).count()
+    assert_rollups_match_records()
+
+    records_filter.delete()
+    assert rollup.get().records == records_before
+
+
+@pytest.mark.parametrize("backend", ["orm", "sqlite"])
+@pytest.mark.django_db
+def test_ingest_maintains_camera_coverage(backend, settings, camera_model, tf2records_model):
+    from django.db import connection
+    from django.db.models import Count, Max, Min
+    from django.test.utils import CaptureQueriesContext
+
+    from cctv_records.models import CameraCoverage
+    from cctv_records.utils import process_uploaded_report
+
+    def coverage():
+        return sorted(CameraCoverage.objects.values_list("camera_id", "records", "first_timestamp", "last_timestamp"))
+
+    def from_records():
+        rows = tf2records_model.objects.values("camera_id").annotate(Count("pk"), Min("timestamp"), Max("timestamp"))
+        return sorted(tuple(row.values()) for row in rows)
+
+    settings.INGEST_BACKEND = backend
+    header, *lines = gzip.decompress(TF2_REPORT.read_bytes()).decode().splitlines()
+    process_uploaded_report(io.StringIO("\n".join([header, *lines])))
+    assert coverage() == from_records()
+    assert set(CameraCoverage.objects.values_list("model", flat=True)) == {"tf2"}
+
+    # late rows of a camera among rows already stored for others: the coverage is moved forward, not recounted
+    late = [f"2025-10-30 0{i}:00:00+00:00,2025-10-30 0{i}:00:00+00:00,A33,tf2,1,2,3,4,5,6,0" for i in range(5)]
+    with CaptureQueriesContext(connection) as queries:
+        process_uploaded_report(io.StringIO("\n".join([header, *lines[:50], *late])))
+    assert coverage() == from_records()
+    assert CameraCoverage.objects.get(camera__camera_id="a33").last_timestamp.isoformat() == "2025-10-30T04:00:00+00:00"
+    assert not [q["sql"] for q in queries if 'MIN("tf2_records"."timestamp")' in q["sql"]]
+
+    # overwritten and new rows, some of them repeated in the report
+    corrected = [line.replace(",tf2,0,", ",tf2,42,", 1) for line in lines[:50]]
+    early = [f"2025-10-28 0{i}:00:00+00:00,2025-10-28 0{i}:00:00+00:00,A33,tf2,1,2,3,4,5,6,0" for i in range(5)]
+    report = [header, *corrected, *early, *early[:2], *corrected[:3]]
+    process_uploaded_report(io.StringIO("\n".join(report)), overwrite=True)
+    assert coverage() == from_records()
+    assert sum(CameraCoverage.objects.values_list("records", flat=True)) == tf2records_model.objects.count()
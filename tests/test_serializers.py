@@ -42,3 +42,39 @@ def test_yolo_serialiser(yolorecords_model, rf):
     assert "timestamp" in serializer.data
     assert "camera_detail" in serializer.data
     assert not serializer.data.__contains__("camera_ref")
+
+
+@pytest.mark.parametrize("model", ["tf2", "yolo"])
+@pytest.mark.django_db
+def test_records_values_serializer_matches_model_serializer(
+    model, camera_model, tf2records_model, yolorecords_model, rf, django_assert_num_queries
+):
+    import json
+
+    from django.test import Client
+    from django.urls import reverse
+    from rest_framework.request import Request
+
+    from cctv_api.serializers.tf2 import TF2RecordSerialzer
+    from cctv_api.serializers.yolo import YOLORecordSerialzer
+
+    records_model = tf2records_model if model == "tf2" else yolorecords_model
+    serializer_class = TF2RecordSerialzer if model == "tf2" else YOLORecordSerialzer
+    camera = camera_model.objects.create(camera_id="b_enabled", label="Another Camera", is_complete=True)
+    for i, camera_ok in enumerate([True, False, None]):
+        records_model.objects.create(
+            camera=camera, timestamp=f"2024-01-01T13:00:0{i}+01:00", camera_ok=camera_ok, cars=i
+        )
+
+    url = reverse(f"cctv-api:{model}:records-list")
+    # the watermarks, the page, the count and the camera filter choices
+    with django_assert_num_queries(3):
+        response = Client().get(url, {"page_size": 100})
+    results = response.json()["results"]
+    assert len(results) == 8
+
+    request = Request(rf.get(url))
+    queryset = records_model.objects.filter(camera__is_complete=True)
+    expected = serializer_class(queryset, many=True, context={"request": request}).data
+    assert results == json.loads(json.dumps(expected))
+    assert list(results[0]) == list(expected[0])
@@ -0,0 +1,68 @@
+import pytest
+from django.test import Client
+from django.urls import reverse
+
+
+@pytest.fixture
+def counted_camera(camera_model, tf2records_model):
+    """A camera with 3 records an hour, with 1, 2 and 3 cars, from 2024-02-01 22:00 to 2024-02-02 01:40."""
+    from cctv_records.rollups import refresh_rollups
+
+    camera = camera_model.objects.create(camera_id="b_enabled", label="Counted Camera", is_complete=True)
+    for hour in ["2024-02-01T22", "2024-02-01T23", "2024-02-02T00", "2024-02-02T01"]:
+        for minute, cars in [(0, 1), (20, 2), (40, 3)]:
+            tf2records_model.objects.create(camera=camera, timestamp=f"{hour}:{minute:02}:00Z", cars=cars, persons=1)
+    # records written outside of reports are rolled up by hand
+    refresh_rollups("tf2")
+    return camera
+
+
+def aggregate(model, params):
+    response = Client().get(reverse(f"cctv-api:{model}:records-aggregate"), params)
+    return response.status_code, response.json()
+
+
+@pytest.mark.django_db
+def test_aggregate_by_day(counted_camera, records_filter_model, django_assert_max_num_queries):
+    params = {"camera_id": counted_camera.pk, "unit": "day", "method": "sum", "field": "cars"}
+    # the watermarks, the camera filter choices and the aggregate
+    with django_assert_max_num_queries(3):
+        status, series = aggregate("tf2", params)
+    assert status == 200
+    assert series == [{"date": "2024-02-01", "value": 12.0}, {"date": "2024-02-02", "value": 12.0}]
+
+    # filtered records are left out
+    records_filter_model.objects.create(
+        camera=counted_camera, model="tf2", from_datetime="2024-02-02T01:00:00Z", to_datetime="2024-02-02T02:00:00Z"
+    )
+    assert aggregate("tf2", params)[1][1] == {"date": "2024-02-02", "value": 6.0}
+    assert aggregate("tf2", {**params, "date_after": "2024-02-02"})[1] == [{"date": "2024-02-02", "value": 6.0}]
+
+
+@pytest.mark.django_db
+def test_aggregate_by_hour(counted_camera):
+    status, series = aggregate("tf2", {"camera_id": counted_camera.pk, "unit": "hour", "method": "average"})
+    assert status == 200
+    assert series == [
+        {"date": f"{hour}:00:00Z", "value": 2.0}
+        for hour in ["2024-02-01T22", "2024-02-01T23", "2024-02-02T00", "2024-02-02T01"]
+    ]
+    # the records of provision_db carry no counts
+    _, series = aggregate("tf2", {"unit": "month", "method": "max", "field": "persons"})
+    assert series == [{"date": "2024-01-01", "value": None}, {"date": "2024-02-01", "value": 1.0}]
+
+
+@pytest.mark.parametrize(
+    "model, params, error",
+    [
+        ("tf2", {"unit": "minute"}, "unit"),
+        ("tf2", {"method": "median"}, "method"),
+        ("yolo", {"field": "persons"}, "field"),
+        ("yolo", {"field": "is_hidden"}, "field"),
+    ],
+)
+@pytest.mark.django_db
+def test_aggregate_invalid_params(model, params, error):
+    status, errors = aggregate(model, params)
+    assert status == 400
+    assert list(errors) == [error]
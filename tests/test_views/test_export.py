@@ -0,0 +1,114 @@
+import csv
+import gzip
+import io
+import json
+
+import brotli
+import pytest
+from django.test import Client
+from django.urls import reverse
+
+
+def listed_records(model, params):
+    response = Client().get(reverse(f"cctv-api:{model}:records-list"), {**params, "page_size": 1000})
+    assert response.status_code == 200
+    return response.json()["results"]
+
+
+def export(model, params, **headers):
+    response = Client().get(reverse(f"cctv-api:{model}:records-export"), params, **headers)
+    assert response.status_code == 200
+    assert response.streaming
+    return response, b"".join(response.streaming_content)
+
+
+@pytest.mark.parametrize("model", ["tf2", "yolo"])
+@pytest.mark.django_db
+def test_export_csv_matches_list(model, camera_model, records_filter_model):
+    camera = camera_model.objects.get(camera_id="c_enabled")
+    records_filter_model.objects.create(
+        camera=camera, model=model, from_datetime="2024-01-01T12:00:01Z", to_datetime="2024-01-01T12:00:01Z"
+    )
+    params = {"camera_id": camera.pk, "date_after": "2024-01-01", "camera_ok": "unknown"}
+
+    response, content = export(model, params)
+    assert response["Content-Type"] == "text/csv; charset=utf-8"
+    assert response["Content-Disposition"] == f'attachment; filename="{model}_records.csv"'
+    assert "Content-Encoding" not in response
+
+    expected = listed_records(model, params)
+    rows = list(csv.DictReader(io.StringIO(content.decode())))
+    assert len(rows) == len(expected) == 4
+    assert rows == [{k: "" if v is None else str(v) for k, v in record.items()} for record in expected]
+
+
+@pytest.mark.parametrize(
+    "accept_encoding, decompress",
+    [("gzip, deflate", gzip.decompress), ("gzip;q=0.5, br", brotli.decompress), ("br;q=0, identity", None)],
+)
+@pytest.mark.django_db
+def test_export_ndjson_compression(accept_encoding, decompress):
+    response, content = export("yolo", {"format": "ndjson"}, HTTP_ACCEPT_ENCODING=accept_encoding)
+    assert response["Content-Type"] == "application/x-ndjson; charset=utf-8"
+    assert response.get("Content-Encoding") == {gzip.decompress: "gzip", brotli.decompress: "br"}.get(decompress)
+    assert "Accept-Encoding" in response["Vary"]
+
+    lines = (decompress(content) if decompress else content).decode().splitlines()
+    assert [json.loads(line) for line in lines] == listed_records("yolo", {})
+
+
+@pytest.mark.django_db
+def test_export_invalid_filter():
+    response = Client().get(reverse("cctv-api:tf2:records-export"), {"camera_id": 999})
+    assert response.status_code == 400
+    assert response["Content-Type"] == "application/json"
+    assert "camera_id" in response.json()
+
+
+@pytest.mark.django_db
+def test_export_streams_over_asgi(monkeypatch):
+    from asgiref.sync import async_to_sync
+    from django.core.handlers.asgi import ASGIHandler
+
+    from cctv_api.serializers.records import RecordValuesSerializer
+    from cctv_api.views.api.records import RecordsExportMixin
+
+    monkeypatch.setattr(RecordsExportMixin, "export_chunk_size", 2)
+    serialized = []
+    serialize = RecordValuesSerializer.serialize
+
+    def counted_serialize(self, rows):
+        serialized.append(len(rows))
+        return serialize(self, rows)
+
+    monkeypatch.setattr(RecordValuesSerializer, "serialize", counted_serialize)
+
+    messages = []
+
+    async def receive():
+        return {"type": "http.request", "body": b"", "more_body": False}
+
+    async def send(message):
+        # with the number of chunks serialized by the time the message is sent
+        messages.append((message, len(serialized)))
+
+    scope = {
+        "type": "http",
+        "asgi": {"version": "3.0"},
+        "http_version": "1.1",
+        "method": "GET",
+        "scheme": "http",
+        "path": reverse("cctv-api:yolo:records-export"),
+        "query_string": b"format=ndjson",
+        "root_path": "",
+        "headers": [(b"host", b"testserver")],
+        "client": ("127.0.0.1", 5000),
+        "server": ("testserver", 80),
+    }
+    async_to_sync(ASGIHandler())(scope, receive, send)
+
+    assert messages[0][0]["status"] == 200
+    bodies = [(message["body"], chunks) for message, chunks in messages[1:] if message.get("body")]
+    # a chunk is sent as soon as it is serialized, not once the whole export is
+    assert [chunks for _, chunks in bodies] == [1, 2, 3]
+    assert len(b"".join(body for body, _ in bodies).splitlines()) == sum(serialized) == 5
@@ -15,6 +15,30 @@ def test_general_cameras(camera_model):
     assert response.json().__len__() == 1
 
 
+@pytest.mark.django_db
+def test_general_cameras_coverage(camera_model):
+    from django.db import connection
+    from django.test.utils import CaptureQueriesContext
+
+    url = reverse("cctv-api:general:cameras-list")
+    # the watermarks, the cameras and their coverage, without a look at the records
+    with CaptureQueriesContext(connection) as queries:
+        response = client.get(url)
+    assert len(queries) == 3
+    assert not any("_records" in query["sql"] for query in queries)
+
+    coverage = response.json()[0]["coverage"]
+    assert coverage == [
+        {
+            "model": model,
+            "records": 5,
+            "first_timestamp": "2024-01-01T12:00:00Z",
+            "last_timestamp": "2024-01-01T12:00:04Z",
+        }
+        for model in ["tf2", "yolo"]
+    ]
+
+
 @pytest.mark.django_db
 def test_general_camera_detail(camera_model):
     camera = camera_model.objects.filter(camera_id="c_enabled").first()
@@ -38,3 +62,43 @@ def test_general_camera_detail(camera_model):
     assert response.status_code == 404
     data = response.json()
     assert data["detail"] == "No Cameras matches the given query."
+
+
+@pytest.mark.django_db
+def test_general_version(camera_model, records_filter_model, django_assert_num_queries):
+    url = reverse("cctv-api:general:version")
+    response = client.get(url)
+    assert response.status_code == 200
+    version = response.json()["version"]
+    assert version.startswith("tf2.0-yolo.0-cameras.")
+    assert response.json()["latest_data_update"] is not None
+
+    # nothing changed: a 304 after reading the watermarks alone
+    with django_assert_num_queries(1):
+        response = client.get(url, HTTP_IF_NONE_MATCH=response["ETag"])
+    assert response.status_code == 304
+
+    camera = camera_model.objects.get(camera_id="c_enabled")
+    records_filter_model.objects.create(
+        camera=camera, model="tf2", from_datetime="2024-01-01T12:00:00Z", to_datetime="2024-01-01T12:00:02Z"
+    )
+    response = client.get(url, HTTP_IF_NONE_MATCH=response["ETag"])
+    assert response.status_code == 200
+    assert response.json()["version"] == version.replace("tf2.0", "tf2.1")
+
+
+@pytest.mark.django_db
+def test_general_cameras_conditional(camera_model, django_assert_num_queries):
+    url = reverse("cctv-api:general:cameras-list")
+    response = client.get(url)
+    last_modified = response["Last-Modified"]
+
+    with django_assert_num_queries(1):
+        assert client.get(url, HTTP_IF_MODIFIED_SINCE=last_modified).status_code == 304
+    with django_assert_num_queries(1):
+        assert client.get(url, HTTP_IF_NONE_MATCH=response["ETag"]).status_code == 304
+    # another representation of the same data
+    assert client.get(url, HTTP_IF_NONE_MATCH=response["ETag"], HTTP_ACCEPT="text/html").status_code == 200
+
+    camera_model.objects.filter(camera_id="c_disabled").get().save()
+    assert client.get(url, HTTP_IF_NONE_MATCH=response["ETag"]).status_code == 200
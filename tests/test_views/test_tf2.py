@@ -14,3 +14,47 @@ def test_tf2_records_list_view():
     data = response.json()
     results = data.get("results", [])
     assert len(results) == 5
+
+
+@pytest.mark.django_db
+def test_tf2_records_hide_filtered_intervals(camera_model, records_filter_model, settings):
+    from datetime import datetime, timedelta, timezone
+
+    from django.db import connection
+    from django.test.utils import CaptureQueriesContext
+
+    # the queries themselves are looked at
+    settings.RESPONSE_CACHE_PATH = ""
+    camera = camera_model.objects.get(camera_id="c_enabled")
+    start = datetime(2024, 1, 1, 12, tzinfo=timezone.utc)
+    url = reverse("cctv-api:tf2:records-list")
+
+    def fetch():
+        with CaptureQueriesContext(connection) as queries:
+            response = Client().get(url)
+        assert response.status_code == 200
+        return [r["timestamp"] for r in response.json()["results"]], max(len(q["sql"]) for q in queries)
+
+    # both ends of an interval are hidden, overlapping intervals need no merging
+    records_filter_model.objects.create(camera=camera, model="tf2", from_datetime=start, to_datetime=start)
+    records_filter_model.objects.create(
+        camera=camera, model="tf2", from_datetime=start + timedelta(seconds=2), to_datetime=start + timedelta(seconds=3)
+    )
+    records_filter_model.objects.create(
+        camera=camera, model="tf2", from_datetime=start + timedelta(seconds=3), to_datetime=start + timedelta(seconds=3)
+    )
+    # filters of the other model do not apply
+    records_filter_model.objects.create(camera=camera, model="yolo", from_datetime=start, to_datetime=start)
+    timestamps, sql_size = fetch()
+    assert timestamps == ["2024-01-01T12:00:04Z", "2024-01-01T12:00:01Z"]
+
+    records_filter_model.objects.bulk_create(
+        records_filter_model(
+            camera=camera,
+            model="tf2",
+            from_datetime=start + timedelta(days=i),
+            to_datetime=start + timedelta(days=i, hours=1),
+        )
+        for i in range(1, 300)
+    )
+    assert fetch() == (timestamps, sql_size)
@@ -29,3 +29,162 @@ def test_upload_report_view(upload_file):
 
     response = client.post(url, data={"file": upload_file, "pin-code": "123"})
     assert response.status_code == 200
+    assert response.json()["files"][0]["skipped"] is False
+
+    upload_file.seek(0)
+    response = client.post(url, data={"file": upload_file, "pin-code": "123"})
+    assert response.status_code == 200
+    (result,) = response.json()["files"]
+    assert result["skipped"] is True
+    assert result["rows"] == 4127
+
+    upload_file.seek(0)
+    response = client.post(url, data={"file": upload_file, "pin-code": "123", "overwrite": "t"})
+    assert response.json()["files"][0]["skipped"] is False
+
+
+@pytest.mark.django_db
+def test_upload_report_view_multiple_files(tf2records_model, yolorecords_model):
+    from pathlib import Path
+    from io import BytesIO
+
+    test_files = Path(__file__).parent / "test_files"
+    tf2_report = (test_files / "cctv-report-v2-tf2-20251029.csv.gz").open("rb")
+    yolo_report = (test_files / "cctv-report-v2-yolo-20251029.csv.gz").open("rb")
+    tf2_before, yolo_before = tf2records_model.objects.count(), yolorecords_model.objects.count()
+
+    url = reverse("cctv-records:upload-report")
+    response = client.post(url, data={"file": [tf2_report, yolo_report], "pin-code": "123"})
+    assert response.status_code == 200
+    data = response.json()
+    assert [r["file"] for r in data["files"]] == [
+        "cctv-report-v2-tf2-20251029.csv.gz",
+        "cctv-report-v2-yolo-20251029.csv.gz",
+    ]
+    assert all(r["status"] == "ok" and r["rows"] == 4127 for r in data["files"])
+    assert set(data["files"][0]["timings"]) == {"decompress", "sniff", "parse", "cameras", "insert", "write", "total"}
+    assert data["files"][0]["rows_per_second"] > 0
+    assert tf2records_model.objects.count() > tf2_before
+    assert yolorecords_model.objects.count() > yolo_before
+
+    not_a_report = BytesIO(b"not a report")
+    not_a_report.name = "broken.csv.gz"
+    yolo_report.seek(0)
+    response = client.post(url, data={"file": [not_a_report, yolo_report], "pin-code": "123"})
+    assert response.status_code == 400
+    broken, ok = response.json()["files"]
+    assert broken["status"] == "error"
+    assert ok["status"] == "ok"
+
+
+@pytest.mark.django_db
+def test_queued_upload_report(upload_file, settings, tmp_path, tf2records_model):
+    from django.core.management import call_command
+
+    settings.INGEST_SPOOL_DIR = tmp_path
+    before = tf2records_model.objects.count()
+
+    response = client.post(
+        reverse("cctv-records:upload-report"), data={"file": upload_file, "pin-code": "123", "queue": "t"}
+    )
+    assert response.status_code == 202
+    (job,) = response.json()["jobs"]
+    assert job["status"] == "queued"
+    assert list(tmp_path.rglob("*.csv.gz"))
+    assert tf2records_model.objects.count() == before
+
+    call_command("process_ingest_jobs", "--once")
+
+    job = client.get(job["status_url"]).json()
+    assert job["status"] == "done"
+    assert job["rows_parsed"] == 4127
+    assert job["rows_inserted"] + job["conflicts"] == 4127
+    assert job["rows_inserted"] == tf2records_model.objects.count() - before
+    assert job["duration"] >= 0
+    assert not list(tmp_path.rglob("*.csv.gz"))
+
+
+@pytest.mark.django_db
+def test_upload_report_archive(tf2records_model, yolorecords_model):
+    import zipfile
+    from io import BytesIO
+    from pathlib import Path
+
+    test_files = Path(__file__).parent / "test_files"
+    archive = BytesIO()
+    with zipfile.ZipFile(archive, "w") as zf:
+        zf.write(test_files / "cctv-report-v2-tf2-20251029.csv.gz", "cctv-report-v2-tf2-20251029.csv.gz")
+        zf.write(test_files / "cctv-report-v2-yolo-20251029.csv.gz", "cctv-report-v2-yolo-20251029.csv.gz")
+        zf.writestr("cctv-report-v2-zz-broken.csv", "camera_ref,image_capt\nbroken,row\n")
+    archive.seek(0)
+    archive.name = "reports.zip"
+
+    url = reverse("cctv-records:upload-report")
+    response = client.post(url, data={"file": archive, "pin-code": "123"})
+    assert response.status_code == 400
+    (result,) = response.json()["files"]
+    assert result["file"] == "reports.zip"
+    assert [m["status"] for m in result["members"]] == ["ok", "ok", "error"]
+    assert result["rows"] == 2 * 4127
+    assert tf2records_model.objects.exists() and yolorecords_model.objects.exists()
+
+
+@pytest.mark.django_db
+def test_upload_report_archive_member_failing_partway(tf2records_model, yolorecords_model):
+    import gzip
+    import zipfile
+    from io import BytesIO
+    from pathlib import Path
+
+    from cctv_records.models import DataWatermark, HourlyRollup
+
+    test_files = Path(__file__).parent / "test_files"
+    lines = gzip.decompress((test_files / "cctv-report-v2-yolo-20251029.csv.gz").read_bytes()).splitlines()
+    # several batches of the member are written before it fails
+    lines[4000] = b"2025-10-29 09:23:09+00:00,yesterday,A33,yolo,0,0,0,0,0,0,1"
+    archive = BytesIO()
+    with zipfile.ZipFile(archive, "w") as zf:
+        zf.write(test_files / "cctv-report-v2-tf2-20251029.csv.gz", "cctv-report-v2-tf2-20251029.csv.gz")
+        zf.writestr("cctv-report-v2-yolo-20251029.csv.gz", gzip.compress(b"\n".join(lines)))
+    archive.seek(0)
+    archive.name = "reports.zip"
+    tf2_before, yolo_before = tf2records_model.objects.count(), yolorecords_model.objects.count()
+
+    response = client.post(reverse("cctv-records:upload-report"), data={"file": archive, "pin-code": "123"})
+    assert response.status_code == 400
+    (result,) = response.json()["files"]
+    assert [m["status"] for m in result["members"]] == ["ok", "error"]
+    # the failed member leaves nothing behind, neither records nor rollups nor a new data version
+    assert tf2records_model.objects.count() == tf2_before + 4127
+    assert yolorecords_model.objects.count() == yolo_before
+    assert not HourlyRollup.objects.filter(model="yolo").exists()
+    assert not DataWatermark.objects.filter(name="yolo").exists()
+
+
+@pytest.mark.django_db
+def test_upload_report_tolerant(tf2records_model):
+    import gzip
+    from io import BytesIO
+    from pathlib import Path
+
+    from cctv_records.models import RejectedRow
+
+    report = Path(__file__).parent / "test_files" / "cctv-report-v2-tf2-20251029.csv.gz"
+    lines = gzip.decompress(report.read_bytes()).splitlines()
+    lines[3] = b"2025-10-29 09:23:09+00:00,yesterday,A33,tf2,0,0,0,0,0,0,1"
+    upload = BytesIO(gzip.compress(b"\n".join(lines)))
+    upload.name = "partly-broken.csv.gz"
+
+    url = reverse("cctv-records:upload-report")
+    before = tf2records_model.objects.count()
+    response = client.post(url, data={"file": upload, "pin-code": "123"})
+    assert response.status_code == 400
+    assert tf2records_model.objects.count() == before
+
+    upload.seek(0)
+    response = client.post(url, data={"file": upload, "pin-code": "123", "tolerant": "t"})
+    assert response.status_code == 200
+    (result,) = response.json()["files"]
+    assert (result["accepted"], result["rejected"]) == (4126, 1)
+    assert result["rejects"][0]["line"] == 4
+    assert RejectedRow.objects.get(rejects_id=result["rejects_id"]).line == 4
@@ -14,3 +14,112 @@ def test_yolo_records_list_view():
     data = response.json()
     results = data.get("results", [])
     assert len(results) == 5
+
+
+@pytest.mark.django_db
+def test_yolo_records_cursor_pagination(camera_model, yolorecords_model):
+    from django.db import connection
+    from django.test.utils import CaptureQueriesContext
+
+    # a second camera sorting before c_enabled, with records tied on the timestamp
+    camera = camera_model.objects.create(camera_id="b_enabled", label="Another Camera", is_complete=True)
+    for i in range(0, 5, 2):
+        yolorecords_model.objects.create(camera=camera, timestamp=f"2024-01-01T12:00:0{i}Z")
+
+    client = Client()
+    url = reverse("cctv-api:yolo:records-list")
+    by_page = client.get(url, {"page_size": 100}).json()["results"]
+    assert len(by_page) == 8
+
+    walked = []
+    response = client.get(url, {"pagination": "cursor", "page_size": 3})
+    while True:
+        assert response.status_code == 200
+        data = response.json()
+        assert "count" not in data
+        walked.extend(data["results"])
+        if data["next"] is None:
+            break
+        assert "c_enabled" not in data["next"] and "b_enabled" not in data["next"]
+        with CaptureQueriesContext(connection) as queries:
+            response = client.get(data["next"])
+        assert not any("COUNT(" in q["sql"] for q in queries)
+    assert walked == by_page
+
+    assert client.get(url, {"cursor": "not-a-cursor"}).status_code == 404
+
+
+@pytest.mark.django_db
+def test_yolo_records_conditional(django_assert_num_queries):
+    import gzip
+    from pathlib import Path
+
+    from cctv_records.utils import process_uploaded_report
+
+    reports = Path(__file__).parent.parent / "test_mgmt_cmds" / "test_files"
+    client = Client()
+    url = reverse("cctv-api:yolo:records-list")
+    etag = client.get(url)["ETag"]
+    # the records tables are not queried
+    with django_assert_num_queries(1):
+        assert client.get(url, HTTP_IF_NONE_MATCH=etag).status_code == 304
+
+    # only ingesting yolo records changes them
+    with gzip.open(reports / "cctv-report-v2-tf2-20251029.csv.gz", "rt") as stream:
+        process_uploaded_report(stream)
+    assert client.get(url, HTTP_IF_NONE_MATCH=etag).status_code == 304
+    with gzip.open(reports / "cctv-report-v2-yolo-20251029.csv.gz", "rt") as stream:
+        process_uploaded_report(stream)
+    assert client.get(url, HTTP_IF_NONE_MATCH=etag).status_code == 200
+
+
+@pytest.mark.django_db
+def test_yolo_records_conditional_error():
+    client = Client()
+    url = reverse("cctv-api:yolo:records-list")
+    bad_cursor = {"pagination": "cursor", "cursor": "bm90IGEgY3Vyc29y"}
+    response = client.get(url, bad_cursor)
+    assert response.status_code == 404
+    assert "ETag" not in response and "Last-Modified" not in response
+
+    # the ETag of a valid page does not validate it
+    etag = client.get(url, {"pagination": "cursor"})["ETag"]
+    assert client.get(url, bad_cursor, HTTP_IF_NONE_MATCH=etag).status_code == 404
+
+
+@pytest.mark.django_db
+def test_yolo_records_response_cache(camera_model, records_filter_model, django_assert_num_queries):
+    from cctv_api.cache import get_response_cache
+
+    client = Client()
+    url = reverse("cctv-api:yolo:records-list")
+    response = client.get(url, {"page": 1, "page_size": 3})
+    assert response["X-Cache"] == "MISS"
+    # the same query in another order: the watermarks alone are read
+    with django_assert_num_queries(1):
+        cached = client.get(url, {"page_size": 3, "date_after": "", "page": 1})
+    assert cached["X-Cache"] == "HIT"
+    assert cached.json() == response.json()
+    assert cached["Content-Type"] == response["Content-Type"]
+
+    # a new filter bumps the version of the data
+    records_filter_model.objects.create(
+        camera=camera_model.objects.get(camera_id="c_enabled"),
+        model="yolo",
+        from_datetime="2024-01-01T12:00:04Z",
+        to_datetime="2024-01-01T12:00:04Z",
+    )
+    response = client.get(url, {"page": 1, "page_size": 3})
+    assert response["X-Cache"] == "MISS"
+    assert response.json()["count"] == 4
+    assert {"hits": 1, "misses": 2}.items() <= get_response_cache().stats().items()
+
+
+@pytest.mark.django_db
+def test_yolo_records_response_cache_fault(settings, tmp_path):
+    # a directory cannot be opened as the SQLite file of the cache
+    settings.RESPONSE_CACHE_PATH = str(tmp_path)
+    url = reverse("cctv-api:yolo:records-list")
+    response = Client().get(url, {"page": 1, "page_size": 3})
+    assert response.status_code == 200
+    assert response.json()["count"] == 5